@@ -0,0 +1,136 @@
+"""
+# bench_asr.py
+# brief: compares speech recognition backends (see src/AsrBackend) on the same media:
+#        model load + the first transcription, warm transcription time and real-time
+#        factor (RTF = transcription time / media duration, less is faster).
+#        Transcripts are compared with the first backend by word error rate, so speed-up
+#        of quantized engine can be weighed against its accuracy.
+#        With --vad only speech found by voice activity detector is transcribed (RTF is
+#        still relative to the whole media).
+#        Transcripts are not cached (TranscriptStore is not used).
+# usage: python -m benchmarks.bench_asr media.mp4 [--model base] [--vad]
+#                                      [--backends whisper ct2_int8]
+"""
+
+import argparse
+import re
+import time
+
+from src.utils.asr_utils import ASR_BACKENDS, get_asr_backend
+from src.utils.ffmpeg_utils import decode_audio, get_media_duration
+from src.utils.TranscriptStore import ASR_SAMPLE_RATE
+from src.utils.VoiceActivityDetector import (SpeechTimeline,
+                                             voice_activity_detector)
+
+
+def measure(func, *args, **kwargs):
+    started_at = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - started_at
+
+
+def get_words(transcript):
+    return re.findall(r"\w+", transcript["text"].lower())
+
+
+def get_word_error_rate(reference, hypothesis):
+    # levenshtein distance between word sequences / length of reference.
+    if len(reference) == 0:
+        return 0.0 if len(hypothesis) == 0 else 1.0
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hypothesis, 1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (ref_word != hyp_word),
+                )
+            )
+        previous = current
+    return previous[-1] / len(reference)
+
+
+def get_words_count(transcript):
+    return sum(len(segment.get("words", [])) for segment in transcript["segments"])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("media", help="audio or video with speech")
+    parser.add_argument("--model", default="base", help="size of whisper model")
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        default=list(ASR_BACKENDS.keys()),
+        choices=list(ASR_BACKENDS.keys()),
+    )
+    parser.add_argument("--repeats", type=int, default=2, help="warm transcriptions")
+    parser.add_argument("--language", default=None)
+    parser.add_argument(
+        "--no_word_timestamps",
+        action="store_true",
+        help="segments only (extractor requests word timestamps)",
+    )
+    parser.add_argument(
+        "--vad", action="store_true", help="transcribe only speech found by VAD"
+    )
+    args = parser.parse_args()
+
+    duration = get_media_duration(args.media)
+    if duration == None:
+        print(f"can not read duration of {args.media}")
+        return
+    print(f"media: {args.media}, duration={duration:.1f}s, model={args.model}")
+
+    audio = args.media
+    timeline = None
+    if args.vad:
+        samples = decode_audio(args.media, ASR_SAMPLE_RATE)
+        intervals, vad_time = measure(
+            voice_activity_detector.detect, samples, ASR_SAMPLE_RATE
+        )
+        timeline = SpeechTimeline(intervals)
+        audio = timeline.get_speech_audio(samples, ASR_SAMPLE_RATE)
+        print(
+            f"VAD: {timeline.get_speech_duration():.1f}s of speech in "
+            f"{len(intervals)} intervals, detected in {vad_time:.2f}s"
+        )
+    print()
+
+    print(
+        f"{'backend':<28} {'load+first':>11} {'warm':>9} {'RTF':>7} "
+        f"{'segments':>9} {'words':>7} {'WER':>7}"
+    )
+    reference = None
+    for name in args.backends:
+        backend = get_asr_backend(name, args.model)
+        options = {
+            "language": args.language,
+            "word_timestamps": args.no_word_timestamps == False,
+        }
+        transcript, first_time = measure(backend.transcribe, audio, **options)
+        warm_times = []
+        for _ in range(args.repeats):
+            transcript, elapsed = measure(backend.transcribe, audio, **options)
+            warm_times.append(elapsed)
+        warm_time = min(warm_times) if len(warm_times) > 0 else first_time
+
+        if timeline != None:
+            transcript = timeline.map_transcript(transcript)
+        words = get_words(transcript)
+        if reference == None:
+            reference = words
+            wer = "ref"
+        else:
+            wer = f"{get_word_error_rate(reference, words):.3f}"
+        print(
+            f"{backend.get_model_id():<28} {first_time:>10.2f}s {warm_time:>8.2f}s "
+            f"{warm_time / duration:>7.3f} {len(transcript['segments']):>9} "
+            f"{get_words_count(transcript):>7} {wer:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+# bench_remove_duplicates.py
+# brief: micro-benchmark of removing overlapping highlights on synthetic segment lists.
+#        Compares remove_overlapping_segments with the previous pairwise implementation
+#        and checks that both select the same segments.
+# usage: python -m benchmarks.bench_remove_duplicates
+"""
+
+import argparse
+import random
+import time
+
+from src.utils.segments_utils import (calculate_overlap,
+                                      remove_overlapping_segments)
+
+
+def pairwise_remove_duplicates(scored_segments, overlap_threshold=0.5):
+    # previous implementation: every candidate is compared with every kept segment.
+    unique_segments = []
+    for current in scored_segments:
+        is_duplicate = False
+        for existing in unique_segments:
+            if calculate_overlap(current, existing) > overlap_threshold:
+                is_duplicate = True
+                break
+        if not is_duplicate:
+            unique_segments.append(current)
+    return unique_segments
+
+
+def generate_segments(count, seed=0):
+    # whisper-like segments: mostly consecutive, 2-15 seconds long, random scores.
+    rnd = random.Random(seed)
+    segments = []
+    position = 0.0
+    for _ in range(count):
+        start = max(0.0, position - rnd.uniform(0, 3))
+        end = start + rnd.uniform(2, 15)
+        position = end
+        segments.append({"start": start, "end": end, "score": rnd.random()})
+    segments.sort(key=lambda x: x["score"], reverse=True)
+    return segments
+
+
+def measure(func, *args):
+    started_at = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started_at
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10000, 25000, 50000, 100000]
+    )
+    parser.add_argument("--max_highlights", type=int, default=5)
+    parser.add_argument(
+        "--pairwise_limit",
+        type=int,
+        default=10000,
+        help="max size, for which slow pairwise implementation is measured",
+    )
+    args = parser.parse_args()
+
+    print(f"{'segments':>10} {'indexed top-k':>14} {'indexed all':>12} {'pairwise':>10}")
+    for size in args.sizes:
+        segments = generate_segments(size)
+        top_k, top_k_time = measure(
+            remove_overlapping_segments, segments, 0.5, args.max_highlights
+        )
+        all_unique, all_time = measure(remove_overlapping_segments, segments, 0.5)
+        assert all_unique[: args.max_highlights] == top_k
+
+        pairwise_time = "skipped"
+        if size <= args.pairwise_limit:
+            expected, elapsed = measure(pairwise_remove_duplicates, segments, 0.5)
+            assert expected == all_unique, "indexed selection differs from pairwise"
+            pairwise_time = f"{elapsed:.3f}s"
+        print(f"{size:>10} {top_k_time:>13.4f}s {all_time:>11.3f}s {pairwise_time:>10}")
+
+
+if __name__ == "__main__":
+    main()
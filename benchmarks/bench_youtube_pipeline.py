@@ -0,0 +1,214 @@
+"""
+# bench_youtube_pipeline.py
+# brief: benchmark of youtube content definition and download against offline fake
+#        youtube (see benchmarks/fake_youtube.py): media is served by local HTTP server
+#        with configurable latency and bandwidth.
+#        Reports:
+#        - listing latency of YoutubeContentDownloadDefiner (cold and cached listing);
+#        - download throughput of video and audio streams (MB/s);
+#        - mux time of downloaded streams and end-to-end time of streaming mux;
+#        - end-to-end time of YoutubeContentDownloader (the first and repeated
+#          download).
+#        Everything (caches, logs, downloads) is written into temporary directory.
+# usage: python -m benchmarks.bench_youtube_pipeline [--latency_ms 50]
+#                                                   [--bandwidth_mbps 20]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MB = 1024 * 1024
+
+
+def measure(func, *args):
+    started_at = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started_at
+
+
+def bench_listing(backend, repeats):
+    from benchmarks.fake_youtube import CHANNEL_URL
+    from src.ContentDownloadDefiner.YoutubeContentDownloadDefiner import \
+        YoutubeContentDownloadDefiner
+    from src.entities.AccountType import AccountType
+    from src.entities.ContentType import ContentType
+    from src.entities.Source import Source
+    from src.entities.SourceType import SourceType
+    from src.ManagableAccount.ManagableAccount import ManagableAccount
+    from src.utils.DownloadedContentStore import downloaded_content_store
+
+    class BenchAccount(ManagableAccount):
+        def upload(self, content_to_upload):
+            return False
+
+    account = BenchAccount(
+        "bench", "", "", None, None, AccountType.TIKTOK, None, ["bench"], []
+    )
+    source = Source(
+        "bench",
+        "",
+        CHANNEL_URL,
+        SourceType.YOUTUBE_CHANNEL.value,
+        ContentType.YOUTUBE_VIDEO_INTERVIEW.value,
+    )
+    definer = YoutubeContentDownloadDefiner(channel_cls=backend.channel_cls)
+
+    print(f"{'listing':<34} {'time':>9} {'requests':>9}")
+    rows = [("cold", 1), ("cached", repeats)]
+    for name, count in rows:
+        for _ in range(count):
+            requests_before = backend.metadata_requests_count
+            content, elapsed = measure(
+                definer.define_content_to_download, source, account
+            )
+            requests = backend.metadata_requests_count - requests_before
+        print(f"{name:<34} {elapsed:>8.3f}s {requests:>9}")
+
+    # the newest videos are downloaded => listing goes deeper.
+    for downloaded in (5, 9):
+        for url in backend.get_video_urls()[:downloaded]:
+            downloaded_content_store.add(account, url)
+        requests_before = backend.metadata_requests_count
+        content, elapsed = measure(definer.define_content_to_download, source, account)
+        requests = backend.metadata_requests_count - requests_before
+        label = f"cached, {downloaded} newest downloaded"
+        print(f"{label:<34} {elapsed:>8.3f}s {requests:>9}")
+    return account, content
+
+
+def bench_streams(backend, workdir, synthetic):
+    from src.ContentDownloader.RangedStreamDownloader import (
+        RangedStreamDownloader, StreamToDownload)
+    from src.ContentDownloader.StreamingMuxer import StreamingMuxer
+    from src.utils.DiskUsageMonitor import DiskUsageMonitor
+    from src.utils.ffmpeg_utils import mux_audio_video
+
+    video = backend.streams[0]
+    audio = backend.streams[-1]
+    total_bytes = video.filesize + audio.filesize
+    downloader = RangedStreamDownloader()
+
+    print(f"\n{'streams':<34} {'time':>9} {'MB/s':>9} {'peak disk':>10}")
+    files_dir = os.path.join(workdir, "files")
+    os.makedirs(files_dir)
+    with DiskUsageMonitor(files_dir) as monitor:
+        streams = [
+            StreamToDownload(
+                video.url, os.path.join(files_dir, "video.mp4"), video.filesize
+            ),
+            StreamToDownload(
+                audio.url, os.path.join(files_dir, "audio.mp4"), audio.filesize
+            ),
+        ]
+        (video_path, audio_path), download_time = measure(
+            downloader.download_streams, streams
+        )
+        mux_time = None
+        if synthetic == False:
+            _, mux_time = measure(
+                mux_audio_video,
+                video_path,
+                audio_path,
+                os.path.join(files_dir, "muxed.mp4"),
+            )
+    print(
+        f"{'download ' + video.resolution + ' + audio':<34} {download_time:>8.3f}s "
+        f"{total_bytes / MB / download_time:>9.2f} {monitor.peak_bytes / MB:>9.1f}M"
+    )
+    if mux_time == None:
+        print(f"{'mux':<34} {'skipped (synthetic media)':>20}")
+        return
+    print(f"{'mux':<34} {mux_time:>8.3f}s")
+    print(f"{'download + mux':<34} {download_time + mux_time:>8.3f}s")
+
+    streaming_dir = os.path.join(workdir, "streaming")
+    os.makedirs(streaming_dir)
+    with DiskUsageMonitor(streaming_dir) as monitor:
+        _, streaming_time = measure(
+            StreamingMuxer(downloader).download_and_mux,
+            StreamToDownload(
+                video.url, os.path.join(streaming_dir, "video.fifo"), video.filesize
+            ),
+            StreamToDownload(
+                audio.url, os.path.join(streaming_dir, "audio.fifo"), audio.filesize
+            ),
+            os.path.join(streaming_dir, "muxed.mp4"),
+        )
+    print(
+        f"{'streaming download + mux':<34} {streaming_time:>8.3f}s "
+        f"{total_bytes / MB / streaming_time:>9.2f} {monitor.peak_bytes / MB:>9.1f}M"
+    )
+
+
+def bench_downloader(backend, workdir, content):
+    from src.ContentDownloader.YoutubeContentDownloader import \
+        YoutubeContentDownloader
+
+    downloader = YoutubeContentDownloader(youtube_cls=backend.youtube_cls)
+    print(f"\n{'YoutubeContentDownloader':<34} {'time':>9} {'result':>9}")
+    for name in ("first download", "repeated download"):
+        download_path = os.path.join(workdir, name.replace(" ", "_"))
+        os.makedirs(download_path)
+        res, elapsed = measure(downloader.downloadContent, content, download_path)
+        print(f"{name:<34} {elapsed:>8.3f}s {'ok' if res != None else 'failed':>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency_ms", type=float, default=50)
+    parser.add_argument(
+        "--bandwidth_mbps",
+        type=float,
+        default=20,
+        help="MB/s of every connection to fake server, 0 - unlimited",
+    )
+    parser.add_argument("--videos", type=int, default=30)
+    parser.add_argument(
+        "--duration", type=int, default=20, help="seconds of fake video"
+    )
+    parser.add_argument("--cached_repeats", type=int, default=3)
+    parser.add_argument(
+        "--synthetic",
+        action="store_true",
+        help="serve random bytes instead of ffmpeg-generated media (mux is skipped)",
+    )
+    parser.add_argument("--keep", action="store_true", help="keep temporary directory")
+    args = parser.parse_args()
+
+    # relative paths of config (caches, logs, tmp) point into temporary directory.
+    workdir = tempfile.mkdtemp(prefix="bench_youtube_")
+    sys.path.insert(0, REPO_ROOT)
+    os.chdir(workdir)
+
+    from benchmarks.fake_youtube import FakeYoutubeBackend
+
+    backend = FakeYoutubeBackend(
+        os.path.join(workdir, "media"),
+        latency=args.latency_ms / 1000,
+        bandwidth=int(args.bandwidth_mbps * MB),
+        synthetic=args.synthetic,
+    )
+    backend.start(args.videos, args.duration)
+    print(
+        f"fake youtube: {args.videos} videos, latency={args.latency_ms}ms, "
+        f"bandwidth={args.bandwidth_mbps}MB/s per connection, workdir={workdir}\n"
+    )
+    try:
+        _, content = bench_listing(backend, args.cached_repeats)
+        bench_streams(backend, workdir, args.synthetic)
+        if args.synthetic == False:
+            bench_downloader(backend, workdir, content)
+    finally:
+        backend.stop()
+        os.chdir(REPO_ROOT)
+        if args.keep == False:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+"""
+# fake_youtube.py
+# brief: offline stand-in for the part of pytubefix (Channel, YouTube, Stream), which is
+#        used by YoutubeContentDownloadDefiner and YoutubeContentDownloader.
+#        Media of fake videos is generated by ffmpeg (or random bytes with synthetic=True)
+#        and served by local HTTP server with configurable latency and bandwidth, so
+#        listing and downloading can be measured without youtube.
+# usage:
+#        backend = FakeYoutubeBackend(media_dir, latency=0.05, bandwidth=50 * MB)
+#        backend.start(videos_count=30, duration=20)
+#        definer = YoutubeContentDownloadDefiner(channel_cls=backend.channel_cls)
+#        downloader = YoutubeContentDownloader(youtube_cls=backend.youtube_cls)
+"""
+
+import os
+import re
+import subprocess
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MB = 1024 * 1024
+SEND_BLOCK_SIZE = 64 * 1024
+CHANNEL_URL = "https://www.youtube.com/@fake_channel"
+
+# (itag, resolution, width, height, video codec, bitrate) of generated video streams.
+VIDEO_FORMATS = [
+    (137, "1080p", 1920, 1080, "avc1.640028", 4_000_000),
+    (136, "720p", 1280, 720, "avc1.4d401f", 2_000_000),
+    (135, "480p", 854, 480, "avc1.4d401e", 1_000_000),
+]
+AUDIO_FORMAT = (140, "mp4a.40.2", 128_000)
+
+
+def generate_media(media_dir: str, duration: int, synthetic: bool = False):
+    """
+    Generates fragmented mp4 (DASH-like, with segment index) video streams of every
+    VIDEO_FORMATS resolution and audio stream.
+
+    Parameters:
+    - synthetic (bool): random bytes of the same size instead of real media (no ffmpeg needed,
+                        downloads can be measured, muxing can not).
+
+    Returns:
+    - dict: itag -> file name.
+    """
+    os.makedirs(media_dir, exist_ok=True)
+    files = {}
+    dash_flags = ["-movflags", "frag_keyframe+empty_moov+default_base_moof+global_sidx"]
+    for itag, _, width, height, _, bitrate in VIDEO_FORMATS:
+        name = f"video_{itag}.mp4"
+        path = os.path.join(media_dir, name)
+        if synthetic:
+            with open(path, "wb") as file:
+                file.write(os.urandom(duration * bitrate // 8))
+        else:
+            subprocess.run(
+                ["ffmpeg", "-y", "-loglevel", "error", "-f", "lavfi", "-i"]
+                + [f"testsrc=size={width}x{height}:rate=30", "-t", str(duration)]
+                + ["-c:v", "libx264", "-b:v", str(bitrate), "-g", "60"]
+                + dash_flags
+                + [path],
+                check=True,
+            )
+        files[itag] = name
+
+    itag, _, bitrate = AUDIO_FORMAT
+    name = f"audio_{itag}.mp4"
+    path = os.path.join(media_dir, name)
+    if synthetic:
+        with open(path, "wb") as file:
+            file.write(os.urandom(duration * bitrate // 8))
+    else:
+        subprocess.run(
+            ["ffmpeg", "-y", "-loglevel", "error", "-f", "lavfi", "-i"]
+            + ["sine=frequency=440:sample_rate=44100", "-t", str(duration)]
+            + ["-c:a", "aac", "-b:a", str(bitrate)]
+            + dash_flags
+            + [path],
+            check=True,
+        )
+    files[itag] = name
+    return files
+
+
+class FakeMediaServer:
+    # HTTP server with range requests, every request waits latency seconds and every
+    # connection is limited by bandwidth bytes/s (0 - unlimited).
+    def __init__(self, media_dir: str, latency: float = 0.0, bandwidth: int = 0):
+        self.media_dir = media_dir
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.requests_count = 0
+        self.__server = None
+
+    def __get_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def __get_range(self, filesize):
+                match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+                if match == None:
+                    return 0, filesize - 1, False
+                first = int(match.group(1))
+                last = int(match.group(2)) if match.group(2) else filesize - 1
+                return first, min(last, filesize - 1), True
+
+            def __send_headers(self):
+                server.requests_count += 1
+                time.sleep(server.latency)
+                path = os.path.join(server.media_dir, os.path.basename(self.path))
+                if os.path.isfile(path) == False:
+                    self.send_error(404)
+                    return None
+                filesize = os.path.getsize(path)
+                first, last, is_range = self.__get_range(filesize)
+                if first >= filesize:
+                    self.send_error(416)
+                    return None
+                self.send_response(206 if is_range else 200)
+                self.send_header("Content-Type", "video/mp4")
+                self.send_header("Content-Length", str(last - first + 1))
+                if is_range:
+                    self.send_header("Content-Range", f"bytes {first}-{last}/{filesize}")
+                self.end_headers()
+                return path, first, last
+
+            def do_HEAD(self):
+                self.__send_headers()
+
+            def do_GET(self):
+                res = self.__send_headers()
+                if res == None:
+                    return
+                path, first, last = res
+                with open(path, "rb") as file:
+                    file.seek(first)
+                    left = last - first + 1
+                    while left > 0:
+                        block = file.read(min(SEND_BLOCK_SIZE, left))
+                        try:
+                            self.wfile.write(block)
+                        except (BrokenPipeError, ConnectionResetError):
+                            return
+                        left -= len(block)
+                        if server.bandwidth > 0:
+                            time.sleep(len(block) / server.bandwidth)
+
+        return Handler
+
+    def start(self):
+        self.__server = ThreadingHTTPServer(("127.0.0.1", 0), self.__get_handler())
+        self.__server.daemon_threads = True
+        thread = threading.Thread(
+            target=self.__server.serve_forever, name="fake-media-server", daemon=True
+        )
+        thread.start()
+
+    def stop(self):
+        self.__server.shutdown()
+        self.__server.server_close()
+
+    def get_url(self, name: str) -> str:
+        return f"http://127.0.0.1:{self.__server.server_port}/{name}"
+
+
+class FakeStream:
+    def __init__(
+        self,
+        url,
+        itag,
+        filesize,
+        resolution=None,
+        width=None,
+        height=None,
+        fps=None,
+        video_codec=None,
+        audio_codec=None,
+        bitrate=None,
+    ):
+        self.url = url
+        self.itag = itag
+        self.filesize = filesize
+        self.resolution = resolution
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.video_codec = video_codec
+        self.audio_codec = audio_codec
+        self.bitrate = bitrate
+        self.is_otf = False
+        self.is_progressive = False
+        self.includes_audio_track = audio_codec != None
+        self.includes_video_track = video_codec != None
+        self.subtype = "mp4"
+
+    def __repr__(self):
+        return f"FakeStream(itag={self.itag!r}, resolution={self.resolution!r})"
+
+
+class FakeStreamQuery:
+    # the part of pytubefix StreamQuery, which is used by downloader.
+    def __init__(self, streams):
+        self.streams = list(streams)
+
+    def filter(
+        self,
+        res=None,
+        file_extension=None,
+        progressive=None,
+        only_audio=False,
+        only_video=False,
+    ):
+        streams = self.streams
+        if res != None:
+            streams = [stream for stream in streams if stream.resolution == res]
+        if file_extension != None:
+            streams = [stream for stream in streams if stream.subtype == file_extension]
+        if progressive != None:
+            streams = [s for s in streams if s.is_progressive == progressive]
+        if only_audio:
+            streams = [s for s in streams if s.includes_video_track == False]
+        if only_video:
+            streams = [s for s in streams if s.includes_audio_track == False]
+        return FakeStreamQuery(streams)
+
+    def order_by(self, attribute):
+        def key(stream):
+            value = getattr(stream, attribute)
+            if attribute == "resolution":
+                return int(value[:-1]) if value else 0
+            return value
+
+        return FakeStreamQuery(
+            sorted((s for s in self.streams if getattr(s, attribute) != None), key=key)
+        )
+
+    def desc(self):
+        return FakeStreamQuery(reversed(self.streams))
+
+    def first(self):
+        return self.streams[0] if len(self.streams) > 0 else None
+
+    def get_by_itag(self, itag):
+        for stream in self.streams:
+            if stream.itag == itag:
+                return stream
+        return None
+
+    def __iter__(self):
+        return iter(self.streams)
+
+    def __len__(self):
+        return len(self.streams)
+
+
+class FakeYoutubeBackend:
+    def __init__(
+        self,
+        media_dir: str,
+        latency: float = 0.0,
+        bandwidth: int = 0,
+        synthetic: bool = False,
+    ):
+        # latency - seconds of every request (media and metadata).
+        # bandwidth - bytes/s of every media connection, 0 - unlimited.
+        self.media_dir = media_dir
+        self.latency = latency
+        self.synthetic = synthetic
+        self.server = FakeMediaServer(media_dir, latency, bandwidth)
+        self.videos = {}  # watch url -> (title, publish date)
+        self.streams = []
+        self.metadata_requests_count = 0
+        self.channel_cls = self.__create_channel_cls()
+        self.youtube_cls = self.__create_youtube_cls()
+
+    def start(self, videos_count: int = 30, duration: int = 20):
+        files = generate_media(self.media_dir, duration, self.synthetic)
+        self.server.start()
+        self.streams = [
+            FakeStream(
+                self.server.get_url(files[itag]),
+                itag,
+                os.path.getsize(os.path.join(self.media_dir, files[itag])),
+                resolution,
+                width,
+                height,
+                30,
+                video_codec,
+                bitrate=bitrate,
+            )
+            for itag, resolution, width, height, video_codec, bitrate in VIDEO_FORMATS
+        ]
+        itag, audio_codec, bitrate = AUDIO_FORMAT
+        self.streams.append(
+            FakeStream(
+                self.server.get_url(files[itag]),
+                itag,
+                os.path.getsize(os.path.join(self.media_dir, files[itag])),
+                audio_codec=audio_codec,
+                bitrate=bitrate,
+            )
+        )
+        # every fake video has the same media, the newest video first.
+        newest = datetime(2026, 10, 1)
+        for idx in range(videos_count):
+            url = f"https://www.youtube.com/watch?v=fake{idx:06d}"
+            self.videos[url] = (f"Fake video {idx}", newest - timedelta(days=idx))
+
+    def stop(self):
+        self.server.stop()
+
+    def get_video_urls(self):
+        return list(self.videos.keys())
+
+    def metadata_request(self):
+        self.metadata_requests_count += 1
+        time.sleep(self.latency)
+
+    def __create_youtube_cls(self):
+        backend = self
+
+        class FakeYouTube:
+            def __init__(self, url, *args, **kwargs):
+                if url not in backend.videos:
+                    raise ValueError(f"video is unavailable: {url}")
+                self.watch_url = url
+                self.video_id = url.split("v=")[-1]
+                self.title, self.publish_date = backend.videos[url]
+                self.__streams = None
+
+            def check_availability(self):
+                backend.metadata_request()
+
+            @property
+            def streams(self):
+                if self.__streams == None:
+                    backend.metadata_request()
+                    self.__streams = FakeStreamQuery(backend.streams)
+                return self.__streams
+
+        return FakeYouTube
+
+    def __create_channel_cls(self):
+        backend = self
+
+        class FakeChannel:
+            def __init__(self, url, *args, **kwargs):
+                self.channel_url = url
+
+            @property
+            def videos(self):
+                backend.metadata_request()  # the first page of channel
+                return [backend.youtube_cls(url) for url in backend.videos]
+
+            @property
+            def live(self):
+                backend.metadata_request()
+                return []
+
+        return FakeChannel
@@ -8,6 +8,7 @@ HEADLESS_MODE = False
 RM_UPLOADED_CONTENT_DEBUG_FLAG = True
 LOG_PATH = "./logs"
 TMP_DIR_PATH = "./tmp"  # path for saving temporary files.
+JOB_WORKSPACES_PATH = f"{TMP_DIR_PATH}/jobs"  # every job (download, filter, etc.) has its own directory here
 MANAGABLE_ACCOUNT_DATA_PATH = "./accounts_data"
 TIKTOK_COOKIES_PATH = "creds/cookies.txt"
 CONTENT_DIR_NAME = "contentToUpload"
@@ -17,6 +18,7 @@ CONTENT_TO_UPLOAD_CONFIG_FILENAME = "contentToUploadConfig.json"
 TIKTOK_TAGS_PATH = "./configurations/tiktok_tags_map.json"
 HIGHLIGHT_NAME = "highlight"
 DOWNLOADED_CONTENT_CACHE_PATH = "downloadedContentCache.json"
+DOWNLOADED_CONTENT_DB_PATH = f"{MANAGABLE_ACCOUNT_DATA_PATH}/downloadedContent.sqlite3"  # urls downloaded for every account, old json caches are migrated here
 MANAGABLE_ACCOUNTS_CONFIG_PATH = "configurations/managable_accounts.json"
 SOURCES_CONFIG_PATH = "./configurations/sources.json"
 NOT_PROCESSED_RAW_DOWNLOADED_CONTENT_FILE_NAME = "notProcessedDownloadedContent.json"
@@ -24,3 +26,116 @@ SENTIMENTAL_TAINED_MODEL_PATH = "./trained_models/fine_tuned_xlm_roberta"  # use
 
 MAX_NUM_OF_HIGHLIGHTS = 5 # max number of highlights can be extracted from video
 MAX_DEPTH_OF_VIDEO_SEARCH = 10  # the maximum num of the latest videos will be proceed while downloading from youtube
+
+# Download scenario pipeline: sources of account go through download -> extract -> filter -> publish
+# stages. Each stage has its own pool of workers. 1 worker for every stage => sources are processed one by one
+# in the calling thread, exactly as without pipeline.
+# Otherwise stages run concurrently and extract/filter stages run in worker processes, which live as long
+# as the application. Every worker process loads its own models (whisper, sentiment analyzer) and has its own
+# model registry, so MODEL_REGISTRY_MEMORY_BUDGET_MB applies to every process: set it to RAM budget / number
+# of processes.
+DOWNLOAD_PIPELINE_DOWNLOAD_WORKERS = 1  # >1 - download of the next source overlaps with extraction of the current one
+DOWNLOAD_PIPELINE_EXTRACT_WORKERS = 1  # number of worker processes, if pipeline is not sequential
+DOWNLOAD_PIPELINE_FILTER_WORKERS = 1  # number of worker processes, if pipeline is not sequential
+DOWNLOAD_PIPELINE_QUEUE_SIZE = 2  # max number of sources waiting between two stages
+
+UPLOAD_WORKERS = 1  # number of accounts, which can be handled in parallel when schedule is used
+SCHEDULER_STATE_PATH = "./accounts_data/schedulerState.json"  # last fire time of every scheduled upload
+SCHEDULE_MISSED_SLOTS_POLICY = "run_once"  # what to do with slots missed during downtime: skip | run_once | run_all
+
+# Prefetch: when schedule is used, content for accounts is prepared in background as soon as number of
+# ready content items drops below account`s low watermark ("low_watermark" in managable_accounts.json,
+# by default - number of slots in PREFETCH_SCHEDULE_CYCLES schedule cycles).
+PREFETCH_ENABLED = True
+PREFETCH_WORKERS = 1  # number of accounts, which content can be prefetched in parallel
+PREFETCH_SCHEDULE_CYCLES = 1
+PREFETCH_CHECK_INTERVAL = 300  # seconds between backlog checks
+PREFETCH_RETRY_INTERVAL = 3600  # seconds to wait before retrying account, which sources had no new content
+
+# Models (whisper, sentiment analyzer) are loaded once per process and shared. Not used models are
+# evicted (the least recently used first) when total size of loaded models exceeds this budget.
+MODEL_REGISTRY_MEMORY_BUDGET_MB = 6144
+TRANSCRIPT_STORE_PATH = "./cache/transcripts"  # transcripts of downloaded content, reused by extractors and caption filters
+# Transcripts, which were not used for TTL, are removed. When size of store still exceeds the limit,
+# the least recently used transcripts are removed first.
+TRANSCRIPT_STORE_TTL_DAYS = 30
+TRANSCRIPT_STORE_MAX_SIZE_MB = 512
+# Caption filters take captions of highlight from transcript of its source made by highlights extractor, so
+# speech recognition is not run again. If whisper model of filter is set explicitly, source transcript is used only
+# if it was made by this model or by one of accepted models (ids of TranscriptStore, f.e. "large-v3",
+# "medium-ct2_int8", "medium-vad"), otherwise highlight is transcribed again.
+CAPTIONS_ACCEPTED_TRANSCRIPT_MODELS = []
+CAPTIONS_WHISPER_MODEL = "medium"  # whisper model of caption filters for highlights without source transcript
+SENTIMENT_BATCH_SIZE = 32  # number of transcript segments scored by sentiment analyzer at once
+MAX_KEYFRAME_SNAP_SECONDS = 3  # highlight start can be moved back to keyframe by this value to cut it without re-encoding
+MAX_REENCODED_KEYFRAME_SNAP_SECONDS = 8  # the same, when highlight is re-encoded by filters afterwards, farther keyframe => accurate cut
+HIGHLIGHT_RENDER_WORKERS = 4  # number of highlights of one source rendered in parallel (ffmpeg processes), limited by number of CPUs
+
+# Youtube streams are downloaded in parallel byte-range chunks (video and audio at the same time).
+DOWNLOAD_CHUNK_SIZE_MB = 8
+DOWNLOAD_CHUNK_WORKERS = 8  # number of parallel connections per downloaded content
+DOWNLOAD_REQUEST_TIMEOUT = 30  # seconds
+DOWNLOAD_CHUNK_RETRIES = 3
+# Partially downloaded youtube streams are kept here with manifest of completed ranges, so interrupted
+# download is continued on the next try. Checkpoints, which were not touched for TTL, are removed.
+DOWNLOAD_CHECKPOINTS_PATH = f"{TMP_DIR_PATH}/downloads"
+DOWNLOAD_CHECKPOINT_TTL_HOURS = 72
+# Audio-first mode for interviews: only audio stream is downloaded, highlights are chosen from it and
+# only video fragments covering the chosen highlights are fetched afterwards.
+YOUTUBE_AUDIO_FIRST_MODE = False
+CHANNEL_LISTING_CACHE_PATH = "./cache/channel_listings"  # the latest items of youtube channels
+CHANNEL_LISTING_CACHE_TTL = 1800  # seconds, within which channel is not listed again
+CHANNEL_LISTING_CHECK_WORKERS = 4  # number of channel items, which availability is checked at once
+# Highlights of source content are extracted once and shared by all accounts subscribed to the source.
+SOURCE_REGISTRY_PATH = "./cache/source_highlights"
+SOURCE_REGISTRY_TTL_HOURS = 72  # highlights, which were not taken by all subscribers, are removed after this time
+SOURCE_REGISTRY_CLAIM_TIMEOUT = 6 * 3600  # seconds, after which content being processed can be claimed by another account
+# All network I/O (downloads, channel listings, uploads) goes through one governor: global bandwidth
+# limit, max number of simultaneous transfers per host and per proxy. Uploads for schedule slots have
+# the highest priority, background prefetch downloads are paused while uploads are running.
+NETWORK_MAX_BYTES_PER_SEC = 0  # 0 - unlimited
+NETWORK_MAX_CONNECTIONS_PER_HOST = 8
+NETWORK_MAX_CONNECTIONS_PER_PROXY = 2
+NETWORK_STATS_LOG_INTERVAL = 60  # seconds between logs of network utilization
+# Downloaded and muxed media is kept in content-addressed store and reused by re-runs, other accounts
+# and other extractors. Media, which is not used by running jobs, is evicted (the least recently used
+# first) when size of store exceeds the limit.
+MEDIA_STORE_PATH = "./cache/media"
+MEDIA_STORE_MAX_SIZE_GB = 20
+MEDIA_STORE_VERIFY_ON_READ = False  # check sha256 of media on every reuse, otherwise only if its size or mtime changed
+# Streaming mux: video and audio streams are downloaded straight into ffmpeg through pipes, so only the
+# muxed video is written on disk. Interrupted streaming download starts from scratch, if it fails,
+# streams are downloaded into files (resumable) and muxed afterwards. So streaming is used only for small
+# videos, bigger ones are always downloaded into files, which can be resumed.
+DOWNLOAD_STREAMING_MUX = False
+DOWNLOAD_STREAMING_MUX_MAX_SIZE_MB = 256  # max size of video + audio streams downloaded with streaming mux
+DOWNLOAD_STREAMING_WINDOW_CHUNKS = 4  # downloaded chunks of one stream kept in memory while ffmpeg is busy
+# Output profile of account ("output_profile" in managable_accounts.json): the smallest youtube video stream,
+# which gives output of this size without upscaling, is downloaded. fit_mode: fit | crop.
+DEFAULT_OUTPUT_PROFILE = {
+    "width": 1080,
+    "height": 1920,
+    "fps": 30,
+    "codecs": ["avc1"],  # avc1 (h264) can be cut with stream copy and uploaded as is, others are re-encoded
+    "max_bitrate": None,
+    "fit_mode": "fit",
+}
+# Speech recognition backend of highlights extractor: "whisper" - openai-whisper (default),
+# "ct2_int8" - faster-whisper (CTranslate2, int8-quantized model on CPU, pip install faster-whisper).
+# Backend is chosen by "asr_backend" of account (managable_accounts.json), then by content type.
+DEFAULT_ASR_BACKEND = "whisper"
+ASR_BACKEND_BY_CONTENT_TYPE = {}  # content type -> backend, f.e. {"YOUTUBE_VIDEO_INTERVIEW": "ct2_int8"}
+ASR_CT2_COMPUTE_TYPE = "int8"
+ASR_CT2_CPU_THREADS = 0  # 0 - CTranslate2 default (OMP_NUM_THREADS or 4)
+ASR_CT2_BEAM_SIZE = 1  # 1 - greedy decoding, as openai-whisper transcribe() does by default
+# Voice activity detection before transcription: audio of source is decoded once, only speech intervals
+# are transcribed (intros, music, ads and long silences are skipped), timestamps are mapped back to source.
+VAD_ENABLED = True
+VAD_FRAME_MS = 30
+VAD_ENERGY_MARGIN_DB = 12  # frame is speech if its energy is above noise floor of audio by margin
+VAD_MIN_ENERGY_DB = -50  # dBFS, quieter frames are never speech
+VAD_MIN_ENERGY_STD_DB = 4.0  # energy of stationary sound (music, hum) varies less within a second than speech, 0 - disabled
+VAD_MIN_SPEECH_SECONDS = 0.3  # shorter sounds are dropped
+VAD_MIN_SILENCE_SECONDS = 1.0  # shorter pauses are kept inside speech interval
+VAD_PADDING_SECONDS = 0.3  # added around every speech interval, so word edges are not cut
+VAD_MIN_SKIPPED_RATIO = 0.1  # if less part of audio is not speech, the whole audio is transcribed
@@ -5,29 +5,36 @@
 """
 
 import argparse
-import queue
-import threading
-import time
-
-import schedule
 
 from configurations.config import (CACHE_DIR_NAME, CONTENT_DIR_NAME,
                                    CONTENT_TO_UPLOAD_CONFIG_FILENAME,
                                    DEBUG_START_ONLY_DOWNLOAD_SCENARIO,
                                    LOG_PATH, MANAGABLE_ACCOUNT_DATA_PATH,
                                    MANAGABLE_ACCOUNTS_CONFIG_PATH,
-                                   TMP_DIR_PATH, USE_SHEDULE)
+                                   PREFETCH_CHECK_INTERVAL, PREFETCH_ENABLED,
+                                   PREFETCH_RETRY_INTERVAL, PREFETCH_WORKERS,
+                                   SCHEDULE_MISSED_SLOTS_POLICY,
+                                   SCHEDULER_STATE_PATH, TMP_DIR_PATH,
+                                   UPLOAD_WORKERS, USE_SHEDULE)
 from src.ManagableAccount.ManagableAccount import ManagableAccount
 from src.scenarios.scenario_download import download_screnario
 from src.scenarios.scenario_upload import upload_scenario
-from src.utils.fs_utils import (remove_directory, remove_files_from_folder,
-                                remove_recursive)
+from src.utils.AccountWorkerPool import AccountWorkerPool
+from src.utils.ContentPrefetcher import ContentPrefetcher
+from src.utils.fs_utils import remove_directory, remove_recursive
+from src.utils.HeapScheduler import HeapScheduler
 from src.utils.helpers import (check_if_there_is_content_to_upload,
                                construct_managable_accounts,
                                create_default_dir_stucture)
 from src.utils.Logger import logger
 
-request_to_upload_queue = queue.Queue()
+# Executes uploading requests. Requests of the same account are executed one by one,
+# requests of different accounts are executed in parallel.
+upload_worker_pool = AccountWorkerPool(UPLOAD_WORKERS, name="upload-worker")
+
+# Prepares content for accounts in background, so uploads never wait for download.
+# Created in execute if prefetch is enabled.
+content_prefetcher = None
 
 
 def clean():
@@ -49,15 +56,20 @@ def clean_cache():
     remove_recursive(f"{CONTENT_DIR_NAME}")
 
 
-def handle_managable_account(account: ManagableAccount):
+def handle_managable_account(account: ManagableAccount, download_if_empty=True):
     result = False
     try:
         # No available content to upload => download new content and prepare for uploading.
         if check_if_there_is_content_to_upload(account) == False:
-            logger.info(
-                f"There is no new content to upload in {account.name} account => start downloading raw content"
-            )
-            download_screnario(account)
+            if download_if_empty:
+                logger.info(
+                    f"There is no new content to upload in {account.name} account => start downloading raw content"
+                )
+                download_screnario(account)
+            else:
+                logger.warning(
+                    f"There is no prefetched content to upload in {account.name} account"
+                )
 
         # if upload scenario enabled in config.
         result = True
@@ -65,55 +77,70 @@ def handle_managable_account(account: ManagableAccount):
             result = upload_scenario(account)
     except Exception as e:
         logger.error(f"Critical error: something went wrong in the script: {e}")
-        remove_files_from_folder(TMP_DIR_PATH)
     return result
 
 
-def process_uploading_request_thread():
-    logger.info("process_uploading_request_thread started")
-    while True:
-        account = request_to_upload_queue.get()  # Waits for data to become available
-        logger.info(f"Received request to upload content in account='{account.name}'")
-        result = handle_managable_account(account)
-        if result == False:
-            print(f"Failed to upload content in {account.name}")
-        logger.info(
-            f"Result on uploading content into account='{account.name}' result={result}"
-        )
-        request_to_upload_queue.task_done()  # Signal that the task is complete
+def process_uploading_request(account):
+    logger.info(f"Received request to upload content in account='{account.name}'")
+    # with prefetcher content is prepared in background => upload only ready content.
+    result = handle_managable_account(
+        account, download_if_empty=content_prefetcher == None
+    )
+    if result == False:
+        print(f"Failed to upload content in {account.name}")
+    logger.info(
+        f"Result on uploading content into account='{account.name}' result={result}"
+    )
+    if content_prefetcher != None:
+        content_prefetcher.wakeup()
 
 
 def schedule_uploading_job(account):
     logger.info(f"Create request to upload content in account {account}")
-    request_to_upload_queue.put(account)
+    upload_worker_pool.submit(account, process_uploading_request, name="upload")
 
 
 def execute(managable_accounts):
+    global content_prefetcher
     logger.info(f"Schedule is used={USE_SHEDULE}")
 
     if USE_SHEDULE is True:
 
-        # Start detached thread, which reads accounts data from queue and
-        # upload new content to account, which was read from the queue.
-        consumer_thread = threading.Thread(
-            target=process_uploading_request_thread, daemon=True
-        )
-        consumer_thread.start()
+        # Start detached worker threads, which upload new content to accounts
+        # scheduled for uploading.
+        upload_worker_pool.start()
         #
 
+        # Start prefetcher, which keeps enough ready content for the next schedule slots.
+        if PREFETCH_ENABLED:
+            content_prefetcher = ContentPrefetcher(
+                managable_accounts,
+                download_screnario,
+                PREFETCH_WORKERS,
+                PREFETCH_CHECK_INTERVAL,
+                PREFETCH_RETRY_INTERVAL,
+            )
+            content_prefetcher.start()
+
         # configure scheduler for posting content in each account.
         # shedule can be configured in managable_accounts.json
+        scheduler = HeapScheduler(SCHEDULER_STATE_PATH, SCHEDULE_MISSED_SLOTS_POLICY)
         for account in managable_accounts:
+            if account.schedule == None:
+                logger.warning(f"Account {account.name} has no schedule => skip it")
+                continue
             days = account.schedule.every_days
             for time_i in account.schedule.time:
-                schedule.every(days).day.at(time_i).do(
-                    schedule_uploading_job, account=account
+                scheduler.add_job(
+                    f"{account.accountType.value}/{account.name}@{time_i}",
+                    days,
+                    time_i,
+                    schedule_uploading_job,
+                    account,
                 )
 
         # run sheduler infinitely. In scheduled time it will trigger schedule_uploading_job function.
-        while True:
-            schedule.run_pending()
-            time.sleep(5)  # sleep for 5 seconds
+        scheduler.run_forever()
     else:
         # uploading content without scheduler - used for development goals.
         for account in managable_accounts:
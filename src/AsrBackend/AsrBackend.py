@@ -0,0 +1,35 @@
+"""
+# AsrBackend.py
+# date: 18.10.2026
+# brief: interface of speech recognition (ASR) engine used to transcribe content.
+#        Every backend returns transcript in the format of openai-whisper transcribe():
+#        {"text", "language", "segments": [{"start", "end", "text", "words"}]},
+#        where "words" ([{"word", "start", "end"}]) are present only with
+#        word_timestamps, so extractors and caption filters do not depend on the engine.
+"""
+
+from abc import ABC, abstractmethod
+
+
+class AsrBackend(ABC):
+    name = None  # name of backend in configuration (see get_asr_backend)
+
+    def __init__(self, model_name: str):
+        # model_name - size of whisper model (tiny, base, small, medium, large-v3, ...).
+        self.model_name = model_name
+
+    def get_model_id(self) -> str:
+        # identifier of model and engine,
+        # transcripts made by different engines are stored separately.
+        return f"{self.model_name}-{self.name}"
+
+    @abstractmethod
+    def transcribe(self, audio, language=None, word_timestamps=False) -> dict:
+        # audio - path of media file or mono float32 samples with 16kHz sample rate.
+        pass
+
+    def __str__(self):
+        return f"{self.__class__.__name__}(model_name={self.model_name})"
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(model_name={self.model_name!r})"
@@ -0,0 +1,81 @@
+"""
+# CTranslate2AsrBackend.py
+# date: 18.10.2026
+# brief: speech recognition by faster-whisper: whisper model converted into CTranslate2
+#        format and quantized into int8, runs on CPU several times faster than
+#        openai-whisper with fp32 and takes ~4 times less memory.
+#        Result is converted into the format of openai-whisper transcribe().
+#        Requires: pip install faster-whisper
+"""
+
+from configurations.config import (ASR_CT2_BEAM_SIZE, ASR_CT2_COMPUTE_TYPE,
+                                   ASR_CT2_CPU_THREADS)
+
+from src.AsrBackend.AsrBackend import AsrBackend
+from src.utils.ModelRegistry import use_ct2_whisper_model
+
+
+class CTranslate2AsrBackend(AsrBackend):
+    name = "ct2_int8"
+
+    def __init__(
+        self,
+        model_name: str,
+        compute_type: str = ASR_CT2_COMPUTE_TYPE,
+        cpu_threads: int = ASR_CT2_CPU_THREADS,
+        beam_size: int = ASR_CT2_BEAM_SIZE,
+    ):
+        super().__init__(model_name)
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.beam_size = beam_size
+
+    def get_model_id(self) -> str:
+        return f"{self.model_name}-ct2_{self.compute_type}"
+
+    @staticmethod
+    def __to_result(segments, info):
+        result_segments = []
+        for segment in segments:
+            tmp_segment = {
+                "start": segment.start,
+                "end": segment.end,
+                "text": segment.text,
+            }
+            if segment.words != None:
+                tmp_segment["words"] = [
+                    {"word": word.word, "start": word.start, "end": word.end}
+                    for word in segment.words
+                ]
+            result_segments.append(tmp_segment)
+        return {
+            "text": "".join(segment["text"] for segment in result_segments),
+            "language": info.language,
+            "segments": result_segments,
+        }
+
+    def transcribe(self, audio, language=None, word_timestamps=False) -> dict:
+        with use_ct2_whisper_model(
+            self.model_name, self.compute_type, self.cpu_threads
+        ) as model:
+            segments, info = model.transcribe(
+                audio,
+                language=language,
+                word_timestamps=word_timestamps,
+                beam_size=self.beam_size,
+            )
+            # segments is a generator, audio is transcribed while it is consumed.
+            return self.__to_result(list(segments), info)
+
+    def __str__(self):
+        return (
+            f"CTranslate2AsrBackend(model_name={self.model_name}, "
+            f"compute_type={self.compute_type})"
+        )
+
+    def __repr__(self):
+        return (
+            f"CTranslate2AsrBackend(model_name={self.model_name!r}, "
+            f"compute_type={self.compute_type!r}, cpu_threads={self.cpu_threads!r}, "
+            f"beam_size={self.beam_size!r})"
+        )
@@ -0,0 +1,24 @@
+"""
+# WhisperAsrBackend.py
+# date: 18.10.2026
+# brief: speech recognition by openai-whisper (pytorch), fp16 on gpu and fp32 on cpu.
+#        Default backend.
+"""
+
+from src.AsrBackend.AsrBackend import AsrBackend
+from src.utils.ModelRegistry import use_whisper_model
+
+
+class WhisperAsrBackend(AsrBackend):
+    name = "whisper"
+
+    def get_model_id(self) -> str:
+        # transcripts of whisper are stored by model name only
+        # (as before other backends appeared).
+        return self.model_name
+
+    def transcribe(self, audio, language=None, word_timestamps=False) -> dict:
+        with use_whisper_model(self.model_name) as model:
+            return model.transcribe(
+                audio, language=language, word_timestamps=word_timestamps
+            )
@@ -1,5 +1,9 @@
-from configurations.config import (CACHE_DIR_NAME,
-                                   DOWNLOADED_CONTENT_CACHE_PATH,
+import heapq
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from configurations.config import (CHANNEL_LISTING_CHECK_WORKERS,
                                    MAX_DEPTH_OF_VIDEO_SEARCH)
 from pytubefix import Channel
 
@@ -9,12 +13,18 @@ from src.entities.ContentToDownload import ContentToDownload
 from src.entities.Source import Source
 from src.entities.SourceType import SourceType
 from src.ManagableAccount.ManagableAccount import ManagableAccount
-from src.utils.fs_utils import create_file_if_not_exists, read_json
+from src.utils.ChannelListingCache import channel_listing_cache
+from src.utils.DownloadedContentStore import downloaded_content_store
 from src.utils.Logger import logger
+from src.utils.NetworkGovernor import get_host, network_governor
 
 
 class YoutubeContentDownloadDefiner(ContentDownloadDefiner):
 
+    def __init__(self, channel_cls=Channel):
+        # channel_cls - class of youtube channel (pytubefix Channel or its stand-in in benchmarks).
+        self.channel_cls = channel_cls
+
     # internal class, that represents metadata for youtube video
     class YoutubeItem:
         def __init__(self, title, url, publish_date):
@@ -28,62 +38,178 @@ class YoutubeContentDownloadDefiner(ContentDownloadDefiner):
         def __repr__(self):
             return f"{self.title}"
 
-    def __get_links_to_channel_videos(self, channel_url, content_type, max_results):
+    def __to_cached_item(self, item):
+        publish_date = item.publish_date
+        return {
+            "title": item.title,
+            "url": item.url,
+            "publish_date": publish_date.isoformat() if publish_date != None else None,
+        }
+
+    def __from_cached_item(self, cached_item):
+        publish_date = cached_item["publish_date"]
+        if publish_date != None:
+            publish_date = datetime.fromisoformat(publish_date)
+        return self.YoutubeItem(cached_item["title"], cached_item["url"], publish_date)
+
+    def __fetch_item(self, item, priority):
+        # metadata of every item is a separate request => items are fetched concurrently.
+        try:
+            with network_governor.transfer(get_host(item.watch_url), priority=priority):
+                item.check_availability()  # raises an exception if video is unavailable
+                return self.YoutubeItem(item.title, item.watch_url, item.publish_date)
+        except Exception as e:
+            logger.info(
+                f"Video item is unavailable | possibly it is not uploaded but planned to be uploaded: {e}"
+            )
+        return None
+
+    def __iter_new_channel_items(
+        self, content, max_results, skip_urls, known_urls, newest_publish_date
+    ):
+        # yields batches of items, which are newer than the newest known item,
+        # the newest first.
+        # skip_urls - items, which were already yielded from cache.
+        priority = network_governor.get_priority()  # of the caller, not of pool threads
+        with ThreadPoolExecutor(
+            max_workers=CHANNEL_LISTING_CHECK_WORKERS,
+            thread_name_prefix="channel-listing",
+        ) as executor:
+            items = iter(content[:max_results])
+            is_finished = False
+            while is_finished == False:
+                batch = []
+                for item in items:
+                    if item.watch_url in skip_urls:
+                        continue
+                    # channel content is ordered from the newest => the rest is known.
+                    if item.watch_url in known_urls:
+                        is_finished = True
+                        break
+                    batch.append(item)
+                    if len(batch) == CHANNEL_LISTING_CHECK_WORKERS:
+                        break
+                if len(batch) == 0:
+                    return
+                new_items = []
+                for youtube_item in executor.map(
+                    self.__fetch_item, batch, [priority] * len(batch)
+                ):
+                    if youtube_item == None:
+                        continue
+                    publish_date = youtube_item.publish_date
+                    if (
+                        newest_publish_date != None
+                        and publish_date != None
+                        and publish_date.isoformat() <= newest_publish_date
+                    ):
+                        is_finished = True
+                        break
+                    new_items.append(youtube_item)
+                yield new_items
+
+    def __iter_links_to_channel_videos(self, channel, content_type, max_results):
         # There are two types of content can be retrieved from youtube channel.
         # 1. video - normal uploaded video.
         # 2. live - live steam. basically it is the same as normal uploaded video but
         #    there is a different api for getting links.
+        # Items are yielded from the newest. Listing is stopped as soon as caller stops
+        # iterating, listed items are saved into cache anyway.
+        channel_url = channel.channel_url
+        listing = channel_listing_cache.get(channel_url, content_type)
+        is_fresh = (
+            listing != None and listing.is_expired(channel_listing_cache.ttl) == False
+        )
+        if is_fresh and listing.is_complete:
+            logger.info(f"Using cached {content_type} listing of {channel_url}")
+            for cached_item in listing.items:
+                yield self.__from_cached_item(cached_item)
+            return
+
+        if content_type == "live":
+            content = channel.live
+        elif content_type == "video":
+            content = channel.videos
+        else:
+            logger.error("Invalid content_type. Use 'live' or 'video'.")
+            return
+
+        # fresh incomplete listing => its items are the newest ones, listing is continued.
+        # expired listing => only items newer than its items are fetched.
+        listed_items = list(listing.items) if is_fresh else []
+        known_items = listing.items if listing != None and is_fresh == False else []
+        newest_publish_date = (
+            listing.newest_publish_date if len(known_items) > 0 else None
+        )
+        is_complete = False
         try:
-            channel = Channel(channel_url)
-            if content_type == "live":
-                content = channel.live
-            elif content_type == "video":
-                content = channel.videos
-            else:
-                logger.error("Invalid content_type. Use 'live' or 'video'.")
-                return []
-
-            # Limit the number of results to max_results
-            result = []
-            for item in content[:max_results]:
-                try:
-                    item.check_availability()  # raises an exception if video is unavailable
-                    result.append(
-                        self.YoutubeItem(item.title, item.watch_url, item.publish_date)
-                    )
-                except Exception as e:
-                    logger.info(
-                        f"Video item is unavailable | possibly it is not uploaded but planned to be uploaded: {e}"
-                    )
-            return result
+            for cached_item in listed_items:
+                yield self.__from_cached_item(cached_item)
+            batches = self.__iter_new_channel_items(
+                content,
+                max_results,
+                set(cached_item["url"] for cached_item in listed_items),
+                set(cached_item["url"] for cached_item in known_items),
+                newest_publish_date,
+            )
+            for batch in batches:
+                # the whole fetched batch is cached, even if caller needs only its part.
+                listed_items += [self.__to_cached_item(item) for item in batch]
+                yield from batch
+            for cached_item in known_items[: max(0, max_results - len(listed_items))]:
+                listed_items.append(cached_item)
+                yield self.__from_cached_item(cached_item)
+            is_complete = True
+        except GeneratorExit:
+            raise
         except Exception as e:
             logger.error(f"Failed to fetch {content_type} content: {e}")
-            return []
-
-    def __get_latest_videos(self, source, number_of_latest_videos=10):
+            if len(listed_items) == 0:
+                # expired listing is better than nothing.
+                for cached_item in known_items:
+                    yield self.__from_cached_item(cached_item)
+        finally:
+            if len(listed_items) > 0:
+                channel_listing_cache.put(
+                    channel_url,
+                    content_type,
+                    listed_items[:max_results],
+                    is_complete=is_complete,
+                    fetched_at=listing.fetched_at if is_fresh else None,
+                )
+
+    @staticmethod
+    def __get_sort_key(item):
+        if item.publish_date == None:
+            return 0
+        return item.publish_date.timestamp()
+
+    def __iter_latest_videos(self, channel, number_of_latest_videos=10):
         # we get both live videos and normal videos
-        live_videos = self.__get_links_to_channel_videos(
-            source.url, "live", number_of_latest_videos
+        live_videos = self.__iter_links_to_channel_videos(
+            channel, "live", number_of_latest_videos
         )
-        normal_videos = self.__get_links_to_channel_videos(
-            source.url, "video", number_of_latest_videos
+        normal_videos = self.__iter_links_to_channel_videos(
+            channel, "video", number_of_latest_videos
         )
-        # merge live and normal videos, sort them by date and take the newest once.
-        merged = live_videos + normal_videos
-        merged.sort(key=lambda x: x.publish_date, reverse=True)
-        merged = merged[0:number_of_latest_videos]
-        return merged
+        # merge live and normal videos by date lazily and take the newest once.
+        merged = heapq.merge(
+            live_videos, normal_videos, key=self.__get_sort_key, reverse=True
+        )
+        try:
+            yield from itertools.islice(merged, number_of_latest_videos)
+        finally:
+            # listings are saved into cache when they are closed.
+            live_videos.close()
+            normal_videos.close()
 
     # gets url of the video, which was not downloaded yet.
     # if no videos in the list or all videos were downloaded - return None
     def __get_not_downloaded_content_url(self, account, latest_videos):
-        cached_downloaded_content = read_json(
-            account.get_account_dir_path()
-            + f"/{CACHE_DIR_NAME}/{DOWNLOADED_CONTENT_CACHE_PATH}"
-        )
+        # latest_videos is lazy => listing stops at the first not downloaded video.
         determined_url = None
         for item in latest_videos:
-            if item.url not in cached_downloaded_content:
+            if downloaded_content_store.is_downloaded(account, item.url) == False:
                 determined_url = item.url
                 break
         return determined_url
@@ -92,12 +218,20 @@ class YoutubeContentDownloadDefiner(ContentDownloadDefiner):
         self, source: Source, account: ManagableAccount
     ) -> ContentToDownload:
 
-        latest_videos = self.__get_latest_videos(source, MAX_DEPTH_OF_VIDEO_SEARCH)
-
-        determined_url = self.__get_not_downloaded_content_url(account, latest_videos)
+        # the same channel object is used for both listings.
+        channel = self.channel_cls(source.url)
+        latest_videos = self.__iter_latest_videos(channel, MAX_DEPTH_OF_VIDEO_SEARCH)
+        try:
+            determined_url = self.__get_not_downloaded_content_url(
+                account, latest_videos
+            )
+        finally:
+            latest_videos.close()
         source_type = source.source_type
         content_type = source.content_type
-        return ContentToDownload(determined_url, source_type, content_type)
+        return ContentToDownload(
+            determined_url, source_type, content_type, account.output_profile
+        )
 
     def define_content_to_download(
         self, source: Source, account: ManagableAccount
@@ -109,13 +243,6 @@ class YoutubeContentDownloadDefiner(ContentDownloadDefiner):
             )
             return None
 
-        # create file, where metadata about already downloaded content will be stored, so
-        # to not download it again.
-        cache_folder_path = account.get_account_dir_path() + f"/{CACHE_DIR_NAME}"
-        create_file_if_not_exists(
-            DOWNLOADED_CONTENT_CACHE_PATH, cache_folder_path, "[]"
-        )
-
         res = self.__define_content_to_download(source, account)
 
         logger.info(f"Defined content to download={res} from source={source.name}")
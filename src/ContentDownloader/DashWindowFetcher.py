@@ -0,0 +1,134 @@
+"""
+# DashWindowFetcher.py
+# date: 18.10.2026
+# brief: fetches only time windows of youtube adaptive (DASH) video stream.
+#        Segment index (sidx) of the stream maps time to byte ranges of fragments, so
+#        initialization segment and fragments, which cover the windows, are downloaded
+#        and muxed with already downloaded audio. Video outside of the windows is not
+#        downloaded at all. Timestamps of fetched fragments are kept, so highlights are
+#        cut from the result using the same times as from the full video.
+"""
+
+import requests
+from configurations.config import DOWNLOAD_REQUEST_TIMEOUT
+from pytubefix import YouTube
+
+from src.ContentDownloader.RangedStreamDownloader import (
+    RangedStreamDownloader, StreamToDownload, merge_ranges)
+from src.utils.ffmpeg_utils import mux_audio_video
+from src.utils.fs_utils import remove_file
+from src.utils.Logger import logger
+from src.utils.mp4_utils import read_dash_index, select_fragments
+from src.utils.NetworkGovernor import get_host, network_governor
+
+MB = 1024 * 1024
+
+
+class DashWindowFetcher:
+    def __init__(
+        self,
+        page_url: str,
+        itag: int,
+        url: str,
+        filesize: int = None,
+        youtube_cls=YouTube,
+        network_priority: int = None,
+    ):
+        # page_url and itag are used to get new url of the stream, if the old one expired.
+        # network_priority - priority of job, which downloaded the video. Windows are fetched
+        #                    later by extractor in other thread or process, so priority of
+        #                    the job is kept here (priority of the creating thread by default).
+        self.youtube_cls = youtube_cls
+        if network_priority == None:
+            network_priority = network_governor.get_priority()
+        self.network_priority = network_priority
+        self.page_url = page_url
+        self.itag = itag
+        self.url = url
+        self.filesize = filesize
+
+    def __fetch(self, first: int, last: int) -> bytes:
+        with network_governor.transfer(
+            get_host(self.url), priority=self.network_priority
+        ):
+            response = requests.get(
+                self.url,
+                headers={"Range": f"bytes={first}-{last}"},
+                timeout=DOWNLOAD_REQUEST_TIMEOUT,
+            )
+            if response.status_code == 416:
+                return b""  # requested range is after the end of the stream.
+            response.raise_for_status()
+            data = response.content[: last - first + 1]
+            network_governor.consume(len(data), priority=self.network_priority)
+        return data
+
+    def __refresh_url(self):
+        stream = self.youtube_cls(self.page_url).streams.get_by_itag(self.itag)
+        if stream == None:
+            raise RuntimeError(f"stream itag={self.itag} is not found: {self.page_url}")
+        self.url = stream.url
+        self.filesize = stream.filesize
+
+    def __fetch_video_windows(self, windows, output_path):
+        init_range, fragments = read_dash_index(self.__fetch)
+        selected = select_fragments(fragments, windows)
+        if len(selected) == 0:
+            raise RuntimeError("no fragments cover requested windows")
+        ranges = merge_ranges(
+            [list(init_range)]
+            + [[fragment.first_byte, fragment.last_byte] for fragment in selected]
+        )
+        stream = StreamToDownload(
+            self.url, output_path, self.filesize, self.itag, ranges=ranges
+        )
+        RangedStreamDownloader().download_streams([stream])
+
+        downloaded_bytes = stream.get_output_size()
+        total_bytes = fragments[-1].last_byte + 1
+        logger.info(
+            f"Fetched {len(selected)}/{len(fragments)} video fragments for {len(windows)} windows | "
+            f"{downloaded_bytes / MB:.1f}MB of {total_bytes / MB:.1f}MB"
+        )
+
+    def fetch_windows(self, windows, audio_path: str, output_path: str) -> str:
+        """
+        Downloads video fragments, which cover windows, and muxes them with audio.
+
+        Parameters:
+        - windows (list): [(start, end), ...] in seconds.
+        - audio_path (str): path of downloaded audio stream of the same video.
+        - output_path (str): path of resulting video.
+
+        Returns:
+        - str: output_path or None if failed.
+        """
+        video_path = f"{output_path}.video.mp4"
+        try:
+            with network_governor.priority(self.network_priority):
+                # stream downloader takes priority of the calling thread.
+                self.__fetch_windows_with_refresh(windows, video_path)
+            mux_audio_video(video_path, audio_path, output_path, audio_codec="copy")
+            return output_path
+        except Exception as e:
+            logger.error(
+                f"DashWindowFetcher: failed to fetch windows of {self.page_url}: {e}"
+            )
+        finally:
+            remove_file(video_path)
+        return None
+
+    def __fetch_windows_with_refresh(self, windows, video_path):
+        try:
+            self.__fetch_video_windows(windows, video_path)
+        except requests.HTTPError as e:
+            # url of stream expires after some time => get the new one and try again.
+            logger.warning(f"DashWindowFetcher: {e} | refreshing stream url")
+            self.__refresh_url()
+            self.__fetch_video_windows(windows, video_path)
+
+    def __str__(self):
+        return f"DashWindowFetcher(page_url={self.page_url}, itag={self.itag})"
+
+    def __repr__(self):
+        return f"DashWindowFetcher(page_url={self.page_url!r}, itag={self.itag!r}, network_priority={self.network_priority!r})"
@@ -0,0 +1,430 @@
+"""
+# RangedStreamDownloader.py
+# date: 18.10.2026
+# brief: downloads streams by url in parallel byte-range chunks.
+#        Output file is preallocated with the stream size and every chunk is written
+#        directly at its offset, so chunks can be downloaded in any order.
+#        Chunks of all streams passed to download_streams go through the same pool
+#        of connections, so video and audio streams are downloaded at the same time.
+#        With resume=True completed byte ranges are saved into sidecar manifest
+#        ({output_path}.manifest.json), so interrupted download continues from the
+#        completed ranges instead of the first byte.
+#        If ranges of stream are given, only these byte ranges are downloaded and written
+#        into output file one after another.
+#        pipe_streams writes every stream sequentially into pipe (f.e. FIFO read by ffmpeg):
+#        chunks are still downloaded in parallel, but only a window of them is kept in
+#        memory and they are written in order.
+#        Every request holds connection slot of NetworkGovernor and every block takes
+#        bandwidth from it with priority of the thread, which called download_streams.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+import requests
+from configurations.config import (DOWNLOAD_CHUNK_RETRIES,
+                                   DOWNLOAD_CHUNK_SIZE_MB,
+                                   DOWNLOAD_CHUNK_WORKERS,
+                                   DOWNLOAD_REQUEST_TIMEOUT,
+                                   DOWNLOAD_STREAMING_WINDOW_CHUNKS)
+
+from src.utils.fs_utils import read_json, save_json
+from src.utils.Logger import logger
+from src.utils.NetworkGovernor import get_host, network_governor
+
+MANIFEST_SUFFIX = ".manifest.json"
+MB = 1024 * 1024
+# size of block read from connection and written into file.
+READ_BLOCK_SIZE = 256 * 1024
+
+
+class StreamToDownload:
+    def __init__(
+        self,
+        url: str,
+        output_path: str,
+        filesize: int = None,
+        itag: int = None,
+        ranges=None,
+    ):
+        # itag - identifier of the stream, url of the same stream can change between runs.
+        # ranges - [(first byte, last byte), ...] to download, None - the whole stream.
+        self.url = url
+        self.output_path = output_path
+        self.filesize = filesize
+        self.itag = itag
+        self.ranges = ranges
+
+    def get_output_size(self):
+        if self.ranges == None:
+            return self.filesize
+        return sum(last - first + 1 for first, last in self.ranges)
+
+    def get_manifest_path(self):
+        return f"{self.output_path}{MANIFEST_SUFFIX}"
+
+    def __str__(self):
+        return f"StreamToDownload(output_path={self.output_path}, filesize={self.filesize}, itag={self.itag})"
+
+    def __repr__(self):
+        return f"StreamToDownload(url={self.url!r}, output_path={self.output_path!r}, filesize={self.filesize!r}, itag={self.itag!r})"
+
+
+def merge_ranges(ranges):
+    # merges overlapping and adjacent (first byte, last byte) ranges.
+    merged = []
+    for first, last in sorted(ranges):
+        if len(merged) > 0 and first <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], last)
+        else:
+            merged.append([first, last])
+    return merged
+
+
+def is_range_completed(completed_ranges, first: int, last: int) -> bool:
+    # completed_ranges must be merged.
+    return any(
+        range_first <= first and last <= range_last
+        for range_first, range_last in completed_ranges
+    )
+
+
+class _StreamProgress:
+    def __init__(self, stream: StreamToDownload, chunks_count: int, priority: int):
+        self.stream = stream
+        self.priority = priority  # network priority
+        self.lock = threading.Lock()
+        self.downloaded_bytes = 0
+        self.chunks_left = chunks_count
+        self.started_at = time.perf_counter()
+        self.fd = None
+        self.completed_ranges = []
+        self.resume = False
+
+    def save_manifest(self):
+        # must be called under lock, after completed ranges are flushed to disk.
+        manifest = {
+            "url": self.stream.url,
+            "itag": self.stream.itag,
+            "filesize": self.stream.filesize,
+            "completed": self.completed_ranges,
+        }
+        path = self.stream.get_manifest_path()
+        tmp_path = f"{path}.tmp"
+        if save_json(manifest, tmp_path):
+            os.replace(tmp_path, path)
+
+
+class RangedStreamDownloader:
+    def __init__(
+        self,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE_MB * MB,
+        workers: int = DOWNLOAD_CHUNK_WORKERS,
+        timeout: int = DOWNLOAD_REQUEST_TIMEOUT,
+        retries: int = DOWNLOAD_CHUNK_RETRIES,
+        window_chunks: int = DOWNLOAD_STREAMING_WINDOW_CHUNKS,
+    ):
+        # window_chunks - chunks of one stream kept in memory by pipe_streams.
+        self.chunk_size = max(1, chunk_size)
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.retries = max(0, retries)
+        self.window_chunks = max(1, window_chunks)
+        self.__local = threading.local()  # requests session per worker thread
+
+    def __get_session(self) -> requests.Session:
+        if getattr(self.__local, "session", None) == None:
+            self.__local.session = requests.Session()
+        return self.__local.session
+
+    def __get_filesize(self, url: str) -> int:
+        with network_governor.transfer(get_host(url)):
+            response = self.__get_session().head(
+                url, allow_redirects=True, timeout=self.timeout
+            )
+        response.raise_for_status()
+        filesize = int(response.headers.get("Content-Length", 0))
+        if filesize <= 0:
+            raise RuntimeError(f"size of stream is unknown: {url}")
+        return filesize
+
+    def __split_into_chunks(self, stream: StreamToDownload):
+        # returns list of (first byte, last byte, offset in output file) of every chunk.
+        ranges = stream.ranges
+        if ranges == None:
+            ranges = [(0, stream.filesize - 1)]
+        chunks = []
+        output_offset = 0
+        for range_first, range_last in ranges:
+            for first in range(range_first, range_last + 1, self.chunk_size):
+                last = min(first + self.chunk_size - 1, range_last)
+                chunks.append((first, last, output_offset + first - range_first))
+            output_offset += range_last - range_first + 1
+        return chunks
+
+    def __read_range(self, progress: _StreamProgress, first: int, last: int, on_block):
+        # calls on_block(position, block) for every received block of bytes first-last.
+        # Range is retried from the first not received byte.
+        position = first
+        attempt = 0
+        while True:
+            try:
+                headers = {"Range": f"bytes={position}-{last}"}
+                url = progress.stream.url
+                with network_governor.transfer(
+                    get_host(url), priority=progress.priority
+                ), self.__get_session().get(
+                    url,
+                    headers=headers,
+                    stream=True,
+                    timeout=self.timeout,
+                ) as response:
+                    response.raise_for_status()
+                    if response.status_code != 206 and position != 0:
+                        raise RuntimeError("server does not support range requests")
+                    for block in response.iter_content(READ_BLOCK_SIZE):
+                        block = block[: last + 1 - position]
+                        network_governor.consume(len(block), progress.priority)
+                        on_block(position, block)
+                        position += len(block)
+                        with progress.lock:
+                            progress.downloaded_bytes += len(block)
+                        if position > last:
+                            break
+                if position <= last:
+                    raise RuntimeError(
+                        f"connection closed at byte {position}, expected up to {last}"
+                    )
+                break
+            except Exception as e:
+                attempt += 1
+                if attempt > self.retries:
+                    raise
+                logger.warning(
+                    f"RangedStreamDownloader: retry {attempt}/{self.retries} of bytes {position}-{last} | {progress.stream.output_path}: {e}"
+                )
+
+    def __download_chunk(
+        self, progress: _StreamProgress, first: int, last: int, output_offset: int
+    ):
+        self.__read_range(
+            progress,
+            first,
+            last,
+            lambda position, block: os.pwrite(
+                progress.fd, block, output_offset + position - first
+            ),
+        )
+        if progress.resume:
+            # range is marked as completed only when its data is on disk.
+            os.fsync(progress.fd)
+        with progress.lock:
+            progress.chunks_left -= 1
+            is_stream_done = progress.chunks_left == 0
+            if progress.resume:
+                progress.completed_ranges = merge_ranges(
+                    progress.completed_ranges + [[first, last]]
+                )
+                progress.save_manifest()
+        if is_stream_done:
+            self.__log_throughput(progress)
+
+    def __log_throughput(self, progress: _StreamProgress):
+        elapsed = time.perf_counter() - progress.started_at
+        throughput = progress.downloaded_bytes / MB / elapsed if elapsed > 0 else 0
+        logger.info(
+            f"Downloaded {progress.stream.output_path} | {progress.downloaded_bytes / MB:.1f}MB in {elapsed:.1f}s | {throughput:.2f}MB/s"
+        )
+
+    def __load_completed_ranges(self, stream: StreamToDownload):
+        # returns completed ranges of previous download of the same stream.
+        manifest = read_json(stream.get_manifest_path())
+        if manifest == None or os.path.isfile(stream.output_path) == False:
+            return []
+        if (
+            manifest.get("itag") != stream.itag
+            or manifest.get("filesize") != stream.filesize
+            or os.path.getsize(stream.output_path) != stream.filesize
+        ):
+            logger.warning(
+                f"RangedStreamDownloader: manifest does not match stream, download from scratch | {stream}"
+            )
+            return []
+        return merge_ranges(manifest.get("completed", []))
+
+    def __open_output(self, progress: _StreamProgress):
+        stream = progress.stream
+        if progress.resume:
+            progress.completed_ranges = self.__load_completed_ranges(stream)
+        if len(progress.completed_ranges) > 0:
+            progress.fd = os.open(stream.output_path, os.O_WRONLY)
+        else:
+            progress.fd = os.open(
+                stream.output_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644
+            )
+            # preallocate file, so chunks can be written at their offsets.
+            os.ftruncate(progress.fd, stream.get_output_size())
+        if progress.resume:
+            progress.save_manifest()
+
+    def download_streams(
+        self, streams: List[StreamToDownload], resume: bool = False
+    ) -> List[str]:
+        """
+        Downloads given streams at the same time.
+
+        Parameters:
+        - streams (list): streams to download.
+        - resume (bool): keep manifest of completed ranges and skip ranges, which were
+                         completed by previous call for the same stream.
+
+        Returns:
+        - list: paths of downloaded files in the same order as streams.
+
+        Raises:
+        - Exception: if any chunk of any stream could not be downloaded.
+        """
+        started_at = time.perf_counter()
+        # chunks are downloaded in worker threads => priority of the caller is passed to them.
+        priority = network_governor.get_priority()
+        progresses = []
+        tasks = []
+        try:
+            for stream in streams:
+                if stream.ranges == None and (
+                    stream.filesize == None or stream.filesize <= 0
+                ):
+                    stream.filesize = self.__get_filesize(stream.url)
+                progress = _StreamProgress(stream, 0, priority)
+                # manifest describes the whole stream => only whole streams are resumed.
+                progress.resume = resume and stream.ranges == None
+                self.__open_output(progress)
+                progresses.append(progress)
+
+                all_chunks = self.__split_into_chunks(stream)
+                chunks = [
+                    chunk
+                    for chunk in all_chunks
+                    if is_range_completed(progress.completed_ranges, chunk[0], chunk[1])
+                    == False
+                ]
+                progress.chunks_left = len(chunks)
+                if len(chunks) < len(all_chunks):
+                    logger.info(
+                        f"Resuming download of {stream.output_path} | {len(chunks)} chunks left"
+                    )
+                tasks += [(progress, *chunk) for chunk in chunks]
+
+            with ThreadPoolExecutor(
+                max_workers=min(self.workers, max(1, len(tasks))),
+                thread_name_prefix="ranged-download",
+            ) as executor:
+                futures = [executor.submit(self.__download_chunk, *t) for t in tasks]
+                for future in futures:
+                    try:
+                        future.result()
+                    except Exception:
+                        # other chunks are useless if one of them failed.
+                        for pending in futures:
+                            pending.cancel()
+                        raise
+        finally:
+            for progress in progresses:
+                os.close(progress.fd)
+
+        total_bytes = sum(progress.downloaded_bytes for progress in progresses)
+        elapsed = time.perf_counter() - started_at
+        throughput = total_bytes / MB / elapsed if elapsed > 0 else 0
+        logger.info(
+            f"Downloaded {len(streams)} streams | {total_bytes / MB:.1f}MB in {elapsed:.1f}s | {throughput:.2f}MB/s | chunks={len(tasks)} workers={self.workers}"
+        )
+        return [stream.output_path for stream in streams]
+
+    def __fetch_chunk(self, progress: _StreamProgress, first: int, last: int) -> bytes:
+        data = bytearray()
+        self.__read_range(
+            progress, first, last, lambda position, block: data.extend(block)
+        )
+        return data
+
+    def __pipe_stream(self, progress: _StreamProgress, workers: int):
+        stream = progress.stream
+        chunks = self.__split_into_chunks(stream)
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="pipe-download"
+        ) as executor:
+            pending = deque()
+            chunks_iter = iter(chunks)
+            try:
+                # blocks until reader opens the pipe.
+                progress.fd = os.open(stream.output_path, os.O_WRONLY)
+                for first, last, _ in chunks_iter:
+                    pending.append(
+                        executor.submit(self.__fetch_chunk, progress, first, last)
+                    )
+                    if len(pending) == self.window_chunks:
+                        break
+                while len(pending) > 0:
+                    data = memoryview(pending.popleft().result())
+                    next_chunk = next(chunks_iter, None)
+                    if next_chunk != None:
+                        pending.append(
+                            executor.submit(
+                                self.__fetch_chunk,
+                                progress,
+                                next_chunk[0],
+                                next_chunk[1],
+                            )
+                        )
+                    # waits while reader is busy, chunks in window are downloaded meanwhile.
+                    while len(data) > 0:
+                        data = data[os.write(progress.fd, data) :]
+            finally:
+                for future in pending:
+                    future.cancel()
+                if progress.fd != None:
+                    os.close(progress.fd)  # reader gets end of stream
+        self.__log_throughput(progress)
+
+    def pipe_streams(self, streams: List[StreamToDownload]):
+        """
+        Downloads streams at the same time and writes every stream sequentially into
+        its output_path, which is a pipe (FIFO) opened by reader. Streams have
+        separate workers, so reader can consume them in any order.
+
+        Raises:
+        - Exception: if any chunk could not be downloaded or reader closed the pipe.
+        """
+        priority = network_governor.get_priority()
+        for stream in streams:
+            if stream.filesize == None or stream.filesize <= 0:
+                stream.filesize = self.__get_filesize(stream.url)
+        # workers are split between streams by their size.
+        total_size = sum(stream.filesize for stream in streams)
+        progresses = [_StreamProgress(stream, 0, priority) for stream in streams]
+        with ThreadPoolExecutor(
+            max_workers=len(streams), thread_name_prefix="pipe-writer"
+        ) as executor:
+            futures = [
+                executor.submit(
+                    self.__pipe_stream,
+                    progress,
+                    max(1, round(self.workers * progress.stream.filesize / total_size)),
+                )
+                for progress in progresses
+            ]
+            for future in futures:
+                future.result()
+
+    def __str__(self):
+        return f"RangedStreamDownloader(chunk_size={self.chunk_size}, workers={self.workers})"
+
+    def __repr__(self):
+        return (
+            f"RangedStreamDownloader(chunk_size={self.chunk_size!r}, workers={self.workers!r}, "
+            f"timeout={self.timeout!r}, retries={self.retries!r})"
+        )
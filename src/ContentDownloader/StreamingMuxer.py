@@ -0,0 +1,112 @@
+"""
+# StreamingMuxer.py
+# date: 18.10.2026
+# brief: downloads adaptive video and audio streams straight into ffmpeg, which muxes
+#        them while download is still running. Streams are written into FIFOs read by
+#        ffmpeg, so only the muxed file is written on disk (no video/audio temp files).
+#        Works for fragmented mp4 (DASH) streams of youtube, which can be read
+#        sequentially. Interrupted streaming download can not be resumed.
+"""
+
+import os
+import subprocess
+import threading
+
+from src.ContentDownloader.RangedStreamDownloader import (
+    RangedStreamDownloader, StreamToDownload)
+from src.utils.ffmpeg_utils import get_mux_command
+from src.utils.fs_utils import remove_file
+from src.utils.Logger import logger
+
+# seconds between checks of ffmpeg while streams are downloaded.
+POLL_INTERVAL = 1.0
+
+
+class StreamingMuxer:
+    def __init__(
+        self, stream_downloader: RangedStreamDownloader = None, audio_codec: str = "aac"
+    ):
+        self.stream_downloader = (
+            stream_downloader if stream_downloader != None else RangedStreamDownloader()
+        )
+        self.audio_codec = audio_codec
+
+    @staticmethod
+    def __unblock_writers(fifo_paths):
+        # writer waits for reader in open() and gets broken pipe if reader is closed
+        # => open and close reader end of every fifo instead of dead ffmpeg.
+        for fifo_path in fifo_paths:
+            try:
+                os.close(os.open(fifo_path, os.O_RDONLY | os.O_NONBLOCK))
+            except OSError:
+                pass
+
+    def download_and_mux(
+        self, video: StreamToDownload, audio: StreamToDownload, output_path: str
+    ) -> str:
+        """
+        Downloads video and audio streams and muxes them into output_path.
+        output_path of streams are used as paths of FIFOs.
+
+        Returns:
+        - str: output_path.
+
+        Raises:
+        - Exception: if download or ffmpeg failed.
+        """
+        fifo_paths = [video.output_path, audio.output_path]
+        for fifo_path in fifo_paths:
+            remove_file(fifo_path)
+            os.mkfifo(fifo_path)
+
+        errors = []
+
+        def download():
+            try:
+                self.stream_downloader.pipe_streams([video, audio])
+            except Exception as e:
+                errors.append(e)
+
+        ffmpeg = subprocess.Popen(
+            get_mux_command(
+                video.output_path, audio.output_path, output_path, self.audio_codec
+            ),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+        )
+        thread = threading.Thread(target=download, name="streaming-mux", daemon=True)
+        thread.start()
+        try:
+            while thread.is_alive():
+                thread.join(POLL_INTERVAL)
+                if thread.is_alive() and ffmpeg.poll() != None:
+                    # ffmpeg died => download can not be finished.
+                    self.__unblock_writers(fifo_paths)
+            if len(errors) > 0:
+                ffmpeg.kill()
+            _, stderr = ffmpeg.communicate()
+            if len(errors) > 0:
+                raise errors[0]
+            if ffmpeg.returncode != 0:
+                error = stderr.decode(errors="replace").strip()
+                raise RuntimeError(f"ffmpeg failed to mux streams: {error}")
+        finally:
+            if ffmpeg.poll() == None:
+                ffmpeg.kill()
+                ffmpeg.wait()
+            if thread.is_alive():
+                self.__unblock_writers(fifo_paths)
+                thread.join()
+            for fifo_path in fifo_paths:
+                remove_file(fifo_path)
+        logger.info(f"Streams were downloaded and muxed on the fly into {output_path}")
+        return output_path
+
+    def __str__(self):
+        return f"StreamingMuxer(audio_codec={self.audio_codec})"
+
+    def __repr__(self):
+        return (
+            f"StreamingMuxer(stream_downloader={self.stream_downloader!r}, "
+            f"audio_codec={self.audio_codec!r})"
+        )
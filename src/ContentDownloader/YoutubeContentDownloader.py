@@ -1,18 +1,37 @@
 import os
 import re
-import subprocess
+import threading
+import time
 import warnings
 
+from configurations.config import (DOWNLOAD_CHECKPOINT_TTL_HOURS,
+                                   DOWNLOAD_CHECKPOINTS_PATH,
+                                   DOWNLOAD_STREAMING_MUX,
+                                   DOWNLOAD_STREAMING_MUX_MAX_SIZE_MB,
+                                   YOUTUBE_AUDIO_FIRST_MODE)
 from pytubefix import YouTube
 
 from src.ContentDownloader.ContentDownloader import ContentDownloader
+from src.ContentDownloader.DashWindowFetcher import DashWindowFetcher
+from src.ContentDownloader.RangedStreamDownloader import (
+    MANIFEST_SUFFIX, RangedStreamDownloader, StreamToDownload)
+from src.ContentDownloader.StreamingMuxer import StreamingMuxer
 from src.entities.ContentToDownload import ContentToDownload
+from src.entities.ContentType import ContentType
 from src.entities.DownloadedRawContent import (DownloadedRawContent,
                                                DownloadedRawContentType)
 from src.entities.MediaFile import MediaFile
 from src.entities.MediaType import MediaType
+from src.entities.OutputProfile import OutputProfile
 from src.entities.SourceType import SourceType
+from src.utils.DiskUsageMonitor import DiskUsageMonitor
+from src.utils.ffmpeg_utils import is_valid_media, mux_audio_video
+from src.utils.fs_utils import (create_directory_if_not_exist, move,
+                                remove_directory)
 from src.utils.Logger import logger
+from src.utils.MediaStore import get_media_key, media_store
+from src.utils.NetworkGovernor import network_governor
+from src.utils.stream_selection import get_stream_size, select_video_stream
 
 # Suppress SyntaxWarning globally
 warnings.filterwarnings(
@@ -20,9 +39,27 @@ warnings.filterwarnings(
 )  # TODO: be very carefull with this
 
 
+# partially downloaded video => only one download of the same video at once.
+_checkpoint_locks = {}
+_checkpoint_locks_guard = threading.Lock()
+
+
+def _get_checkpoint_lock(video_id: str):
+    with _checkpoint_locks_guard:
+        if video_id not in _checkpoint_locks:
+            _checkpoint_locks[video_id] = threading.Lock()
+        return _checkpoint_locks[video_id]
+
+
 class YoutubeContentDownloader(ContentDownloader):
 
-    def __get_video_stream(self, youtube_video, highest_resolution="1080p"):
+    def __init__(self, youtube_cls=YouTube):
+        # youtube_cls - class of youtube video (pytubefix YouTube or its stand-in in benchmarks).
+        self.youtube_cls = youtube_cls
+        self.__stream_downloader = RangedStreamDownloader()
+        self.__streaming_muxer = StreamingMuxer(self.__stream_downloader)
+
+    def __get_default_video_stream(self, youtube_video, highest_resolution="1080p"):
         video_stream = youtube_video.streams.filter(
             res=highest_resolution, file_extension="mp4", progressive=False
         ).first()
@@ -35,71 +72,276 @@ class YoutubeContentDownloader(ContentDownloader):
             )
         return video_stream
 
+    def __get_video_stream(self, youtube_video, output_profile: OutputProfile = None):
+        # the smallest stream, which is enough for output of account.
+        default_stream = self.__get_default_video_stream(youtube_video)
+        if output_profile == None:
+            return default_stream
+        streams = youtube_video.streams.filter(
+            progressive=False, file_extension="mp4", only_video=True
+        )
+        video_stream = select_video_stream(list(streams), output_profile)
+        if video_stream == None:
+            return default_stream
+
+        saved_bytes = get_stream_size(default_stream) - get_stream_size(video_stream)
+        logger.info(
+            f"Selected video stream {video_stream.resolution} {video_stream.fps}fps {video_stream.video_codec} "
+            f"itag={video_stream.itag} for {output_profile} | saved {saved_bytes / (1024 * 1024):.1f}MB "
+            f"compared to {default_stream.resolution} itag={default_stream.itag}"
+        )
+        return video_stream
+
     def __get_audio_stream(self, youtube_video):
         return youtube_video.streams.filter(
             only_audio=True, file_extension="mp4"
         ).first()
 
-    def __download_stream(self, stream, filename):
-        return stream.download(filename=filename)
-
-    def __combine_audio_video(self, video_path, audio_path, output_path):
-        ffmpeg_command = [
-            "ffmpeg",
-            "-i",
-            video_path,
-            "-i",
-            audio_path,
-            "-c:v",
-            "copy",
-            "-c:a",
-            "aac",
-            "-strict",
-            "experimental",
-            output_path,
+    def __download_streams(self, streams_with_filenames):
+        # video and audio streams are downloaded at the same time in byte-range chunks.
+        streams_to_download = [
+            StreamToDownload(stream.url, filename, stream.filesize, stream.itag)
+            for stream, filename in streams_with_filenames
         ]
-        with open(os.devnull, "w") as devnull:
-            subprocess.run(ffmpeg_command, check=True, stdout=devnull, stderr=devnull)
-
-    def __cleanup_temp_files(self, *file_paths):
-        for file_path in file_paths:
-            if os.path.isfile(file_path):
-                os.remove(file_path)
+        # partial streams are kept with manifest of completed ranges, so
+        # interrupted download is continued on the next try.
+        return self.__stream_downloader.download_streams(
+            streams_to_download, resume=True
+        )
 
     def __sanitize_title(self, title):
         # Replace invalid characters and limit the title to 30 characters
         sanitized_title = re.sub(r'[\\/*?:"<>|]', "", title)
         return sanitized_title[:30]  # Truncate to 30 characters
 
-    def __downloadContentByUrl(self, youtube_video_url, download_path):
-        try:
-            yt = YouTube(youtube_video_url)
-            video_title = self.__sanitize_title(yt.title)
+    def __remove_stale_checkpoints(self):
+        # checkpoints of videos, which were not requested again for a long time.
+        if os.path.isdir(DOWNLOAD_CHECKPOINTS_PATH) == False:
+            return
+        expire_before = time.time() - DOWNLOAD_CHECKPOINT_TTL_HOURS * 3600
+        for video_id in os.listdir(DOWNLOAD_CHECKPOINTS_PATH):
+            checkpoint_path = os.path.join(DOWNLOAD_CHECKPOINTS_PATH, video_id)
+            lock = _get_checkpoint_lock(video_id)
+            if lock.acquire(blocking=False) == False:
+                continue  # is being downloaded right now.
+            try:
+                mtimes = [os.path.getmtime(checkpoint_path)] + [
+                    os.path.getmtime(os.path.join(checkpoint_path, name))
+                    for name in os.listdir(checkpoint_path)
+                ]
+                if max(mtimes) < expire_before:
+                    logger.info(
+                        f"Removing stale download checkpoint: {checkpoint_path}"
+                    )
+                    remove_directory(checkpoint_path)
+            except Exception as e:
+                logger.warning(
+                    f"Failed to check download checkpoint {checkpoint_path}: {e}"
+                )
+            finally:
+                lock.release()
+
+    def __download_into_checkpoint(
+        self, youtube_video_url, video_stream, audio_stream, checkpoint_path
+    ):
+        # downloads and muxes video into checkpoint directory,
+        # returns path of muxed video.
+        muxed_path = os.path.join(checkpoint_path, "muxed.mp4")
+        if is_valid_media(muxed_path):
+            logger.info(f"Video is already downloaded and muxed: {muxed_path}")
+            return muxed_path
 
-            # Get video and audio streams
-            video_stream = self.__get_video_stream(yt)
-            audio_stream = self.__get_audio_stream(yt)
+        # Muxed video gets its name only when it is complete.
+        tmp_muxed_path = os.path.join(checkpoint_path, "muxed.part.mp4")
+        with DiskUsageMonitor(checkpoint_path) as monitor:
+            mode = "streaming"
+            is_muxed = False
+            if self.__can_stream(video_stream, audio_stream, checkpoint_path):
+                is_muxed = self.__stream_and_mux(
+                    video_stream, audio_stream, checkpoint_path, tmp_muxed_path
+                )
+            if is_muxed == False:
+                mode = "files"
+                self.__download_and_mux_files(
+                    youtube_video_url,
+                    video_stream,
+                    audio_stream,
+                    checkpoint_path,
+                    tmp_muxed_path,
+                )
+        os.replace(tmp_muxed_path, muxed_path)
+        logger.info(
+            f"Video was downloaded in {video_stream.resolution} resolution with audio | "
+            f"mode={mode} {monitor.get_summary()}"
+        )
+        return muxed_path
+
+    def __can_stream(self, video_stream, audio_stream, checkpoint_path):
+        # interrupted streaming download leaves nothing to resume,
+        # so big videos are downloaded into files.
+        if DOWNLOAD_STREAMING_MUX == False:
+            return False
+        if self.__has_partial_streams(checkpoint_path):
+            return False
+        sizes = [get_stream_size(video_stream), get_stream_size(audio_stream)]
+        if 0 in sizes:
+            return False  # size is unknown.
+        return sum(sizes) <= DOWNLOAD_STREAMING_MUX_MAX_SIZE_MB * 1024 * 1024
+
+    def __has_partial_streams(self, checkpoint_path):
+        # previous download was interrupted => continue it from completed ranges.
+        return any(
+            name.endswith(MANIFEST_SUFFIX) for name in os.listdir(checkpoint_path)
+        )
 
-            # Download video and audio
-            video_path = self.__download_stream(
-                video_stream, f"{download_path}/video.mp4"
+    def __stream_and_mux(
+        self, video_stream, audio_stream, checkpoint_path, output_path
+    ):
+        # streams go straight into ffmpeg, only muxed video is written on disk.
+        try:
+            self.__streaming_muxer.download_and_mux(
+                StreamToDownload(
+                    video_stream.url,
+                    os.path.join(checkpoint_path, "video.fifo"),
+                    video_stream.filesize,
+                    video_stream.itag,
+                ),
+                StreamToDownload(
+                    audio_stream.url,
+                    os.path.join(checkpoint_path, "audio.fifo"),
+                    audio_stream.filesize,
+                    audio_stream.itag,
+                ),
+                output_path,
             )
-            audio_path = self.__download_stream(
-                audio_stream, f"{download_path}/audio.mp4"
+            return True
+        except Exception as e:
+            logger.warning(
+                f"Streaming mux failed => downloading streams into files: {e}"
             )
+        return False
 
-            # Define the final output path using the video title
-            final_path = os.path.join(download_path, f"{video_title}.mp4")
+    def __download_and_mux_files(
+        self,
+        youtube_video_url,
+        video_stream,
+        audio_stream,
+        checkpoint_path,
+        output_path,
+    ):
+        # Download video and audio
+        video_path, audio_path = self.__download_streams(
+            [
+                (video_stream, os.path.join(checkpoint_path, "video.mp4")),
+                (audio_stream, os.path.join(checkpoint_path, "audio.mp4")),
+            ]
+        )
 
-            # Combine video and audio
-            self.__combine_audio_video(video_path, audio_path, final_path)
+        # Combine video and audio.
+        mux_audio_video(video_path, audio_path, output_path)
+        # audio stream is reused by audio-first downloads of the same video.
+        media_store.put(get_media_key(youtube_video_url, audio_stream.itag), audio_path)
 
-            # Cleanup temporary files
-            self.__cleanup_temp_files(video_path, audio_path)
+    def __materialize(self, media_key, path, final_path, holder):
+        # moves downloaded media into store and links it into final_path.
+        if media_store.put(media_key, path, holder) and media_store.materialize(
+            media_key, final_path, holder
+        ):
+            return
+        if move(path, final_path) == None:
+            raise RuntimeError(f"failed to move {path} to {final_path}")
+
+    def __download_audio_first(
+        self,
+        yt,
+        youtube_video_url,
+        checkpoint_path,
+        download_path,
+        video_title,
+        output_profile,
+    ):
+        # only audio is downloaded, video windows are fetched after highlights are chosen.
+        video_stream = self.__get_video_stream(yt, output_profile)
+        audio_stream = self.__get_audio_stream(yt)
+        if video_stream.is_otf:
+            # stream has no segment index => windows can not be fetched.
+            return None
 
-            logger.info(
-                f"Download complete! Video '{video_title}' was downloaded in {video_stream.resolution} resolution with audio."
+        holder = os.path.normpath(download_path)
+        final_path = os.path.join(download_path, f"{video_title}_audio.mp4")
+        media_key = get_media_key(youtube_video_url, audio_stream.itag)
+        if media_store.materialize(media_key, final_path, holder) == False:
+            (audio_path,) = self.__download_streams(
+                [(audio_stream, os.path.join(checkpoint_path, "audio.mp4"))]
             )
+            self.__materialize(media_key, audio_path, final_path, holder)
+        remove_directory(checkpoint_path)
+
+        remote_video = DashWindowFetcher(
+            youtube_video_url,
+            video_stream.itag,
+            video_stream.url,
+            video_stream.filesize,
+            self.youtube_cls,
+            network_priority=network_governor.get_priority(),
+        )
+        logger.info(
+            f"Download complete! Audio of '{video_title}' was downloaded, video in {video_stream.resolution} resolution will be fetched for highlights only."
+        )
+        media_files = [MediaFile(final_path, MediaType.AUDIO)]
+        return DownloadedRawContent(
+            media_files, DownloadedRawContentType.AUDIO_FIRST, other=remote_video
+        )
+
+    def __downloadContentByUrl(
+        self, youtube_video_url, download_path, audio_first=False, output_profile=None
+    ):
+        try:
+            yt = self.youtube_cls(youtube_video_url)
+            video_title = self.__sanitize_title(yt.title)
+
+            self.__remove_stale_checkpoints()
+            # streams are downloaded into persistent checkpoint directory of the video,
+            # so download can be continued if it was interrupted.
+            checkpoint_path = os.path.join(DOWNLOAD_CHECKPOINTS_PATH, yt.video_id)
+            with _get_checkpoint_lock(yt.video_id):
+                create_directory_if_not_exist(checkpoint_path)
+                if audio_first:
+                    res = self.__download_audio_first(
+                        yt,
+                        youtube_video_url,
+                        checkpoint_path,
+                        download_path,
+                        video_title,
+                        output_profile,
+                    )
+                    if res != None:
+                        return res
+                    logger.warning(
+                        f"Audio-first mode is not supported for {youtube_video_url} => downloading the whole video"
+                    )
+                # Define the final output path using the video title
+                final_path = os.path.join(download_path, f"{video_title}.mp4")
+
+                # Get video and audio streams
+                video_stream = self.__get_video_stream(yt, output_profile)
+                audio_stream = self.__get_audio_stream(yt)
+
+                # video could be downloaded already by another job => it is linked from media store.
+                holder = os.path.normpath(download_path)
+                media_key = get_media_key(
+                    youtube_video_url, f"{video_stream.itag}+{audio_stream.itag}"
+                )
+                if media_store.materialize(media_key, final_path, holder) == False:
+                    muxed_path = self.__download_into_checkpoint(
+                        youtube_video_url, video_stream, audio_stream, checkpoint_path
+                    )
+                    self.__materialize(media_key, muxed_path, final_path, holder)
+
+                # Cleanup temporary files
+                remove_directory(checkpoint_path)
+
+            logger.info(f"Download complete! Video '{video_title}' was downloaded.")
             media_files = [MediaFile(final_path, MediaType.VIDEO)]
             res = DownloadedRawContent(media_files, DownloadedRawContentType.VIDEO)
             return res
@@ -123,7 +365,18 @@ class YoutubeContentDownloader(ContentDownloader):
             )
             return None
         url_to_download = content_to_download.url
-        res = self.__downloadContentByUrl(url_to_download, download_path)
+        # highlights of interviews are chosen by audio only.
+        audio_first = (
+            YOUTUBE_AUDIO_FIRST_MODE
+            and content_to_download.content_type
+            == ContentType.YOUTUBE_VIDEO_INTERVIEW.value
+        )
+        res = self.__downloadContentByUrl(
+            url_to_download,
+            download_path,
+            audio_first,
+            content_to_download.output_profile,
+        )
         return res
 
     def __str__(self):
@@ -0,0 +1,119 @@
+"""
+# test_ranged_stream_downloader.py
+# date: 18.10.2026
+# brief: checks resume of interrupted download by manifest of completed ranges:
+#        only ranges, which are missing after interruption, are requested again.
+# usage: python -m pytest src/ContentDownloader/test_ranged_stream_downloader.py
+"""
+
+import os
+import random
+
+import pytest
+
+from src.ContentDownloader.RangedStreamDownloader import (
+    RangedStreamDownloader, StreamToDownload)
+from src.utils.fs_utils import read_json
+
+CHUNK_SIZE = 1000
+CHUNKS_COUNT = 10
+URL = "https://media.example/videoplayback?itag=137"
+
+
+class FakeResponse:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.status_code = 206
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, block_size):
+        for first in range(0, len(self.data), block_size):
+            yield self.data[first : first + block_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+class FakeServer:
+    # serves range requests of data, fails every request after max_requests.
+    def __init__(self, data: bytes, max_requests: int = None):
+        self.data = data
+        self.max_requests = max_requests
+        self.requested_ranges = []
+
+    def get(self, url, headers, stream, timeout):
+        first, last = map(int, headers["Range"][len("bytes=") :].split("-"))
+        if (
+            self.max_requests != None
+            and len(self.requested_ranges) >= self.max_requests
+        ):
+            raise ConnectionError("connection reset")
+        self.requested_ranges.append((first, last))
+        return FakeResponse(self.data[first : last + 1])
+
+
+@pytest.fixture
+def data():
+    return random.Random(0).randbytes(CHUNK_SIZE * CHUNKS_COUNT)
+
+
+def download(server, output_path, filesize, monkeypatch):
+    downloader = RangedStreamDownloader(chunk_size=CHUNK_SIZE, workers=1, retries=0)
+    monkeypatch.setattr(
+        downloader, "_RangedStreamDownloader__get_session", lambda: server
+    )
+    stream = StreamToDownload(URL, output_path, filesize, itag=137)
+    return downloader.download_streams([stream], resume=True)
+
+
+def test_interrupted_download_is_resumed_from_missing_ranges(
+    data, tmp_path, monkeypatch
+):
+    output_path = str(tmp_path / "video.mp4")
+    interrupted_server = FakeServer(data, max_requests=4)
+    with pytest.raises(ConnectionError):
+        download(interrupted_server, output_path, len(data), monkeypatch)
+    manifest = read_json(f"{output_path}.manifest.json")
+    assert manifest["completed"] == [[0, 4 * CHUNK_SIZE - 1]]
+
+    server = FakeServer(data)
+    assert download(server, output_path, len(data), monkeypatch) == [output_path]
+
+    assert server.requested_ranges == [
+        (first, first + CHUNK_SIZE - 1)
+        for first in range(4 * CHUNK_SIZE, len(data), CHUNK_SIZE)
+    ]
+    with open(output_path, "rb") as file:
+        assert file.read() == data
+    manifest = read_json(f"{output_path}.manifest.json")
+    assert manifest["completed"] == [[0, len(data) - 1]]
+
+
+def test_completed_download_is_not_requested_again(data, tmp_path, monkeypatch):
+    output_path = str(tmp_path / "video.mp4")
+    download(FakeServer(data), output_path, len(data), monkeypatch)
+
+    server = FakeServer(data)
+    download(server, output_path, len(data), monkeypatch)
+    assert server.requested_ranges == []
+
+
+def test_manifest_of_other_stream_is_ignored(data, tmp_path, monkeypatch):
+    output_path = str(tmp_path / "video.mp4")
+    with pytest.raises(ConnectionError):
+        download(FakeServer(data, max_requests=4), output_path, len(data), monkeypatch)
+
+    # the same path, but stream of other size => download from scratch.
+    other_data = data[: -CHUNK_SIZE // 2]
+    server = FakeServer(other_data)
+    download(server, output_path, len(other_data), monkeypatch)
+
+    assert len(server.requested_ranges) == CHUNKS_COUNT
+    assert os.path.getsize(output_path) == len(other_data)
+    with open(output_path, "rb") as file:
+        assert file.read() == other_data
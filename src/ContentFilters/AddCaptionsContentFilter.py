@@ -2,16 +2,23 @@ import os
 import subprocess
 from typing import List
 
-import whisper
+from configurations.config import (CAPTIONS_ACCEPTED_TRANSCRIPT_MODELS,
+                                   CAPTIONS_WHISPER_MODEL)
 
 from src.ContentFilters.ContentFilter import ContentFilter
 from src.entities.ContentToUpload import ContentToUpload
 from src.entities.MediaType import MediaType
+from src.utils.JobWorkspace import JobWorkspace
+from src.utils.TranscriptStore import slice_transcript, transcript_store
 
 
 class AddCaptionsContentFilter(ContentFilter):
-    def __init__(self, whisper_model_size: str = "medium"):
-        self.model = whisper.load_model(whisper_model_size)
+    def __init__(self, whisper_model_size: str = None):
+        # model is taken from model registry when captions are generated.
+        # whisper_model_size - None => captions are taken from source transcript made by
+        #                      highlights extractor, CAPTIONS_WHISPER_MODEL is used
+        #                      only if highlight has no source transcript.
+        self.whisper_model_size = whisper_model_size
 
     def format_time(self, seconds):
         hours = int(seconds // 3600)
@@ -20,24 +27,37 @@ class AddCaptionsContentFilter(ContentFilter):
         millis = int((seconds - int(seconds)) * 1000)
         return f"{hours:02}:{minutes:02}:{secs:02},{millis:03}"
 
-    def detect_language(self, audio_path: str):
-        result = self.model.transcribe(audio_path, task="detect-language")
-        return result.get("language", "uk")
-
-    def generate_captions(self, video_path: str, subtitles_path: str):
-        # Extract audio from the video
-        audio_path = "temp_audio.wav"
-        subprocess.run(
-            ["ffmpeg", "-i", video_path, "-q:a", "0", "-map", "a", audio_path],
-            check=True,
+    def find_source_transcript(self, source_segment):
+        preferred_model = self.whisper_model_size or source_segment.get(
+            "transcript_model"
+        )
+        if preferred_model == None:
+            return None
+        return transcript_store.find(
+            source_segment["content_hash"],
+            preferred_model,
+            accepted_models=CAPTIONS_ACCEPTED_TRANSCRIPT_MODELS,
         )
 
-        # Detect language from audio
-        language = self.detect_language(audio_path)
-        print(f"Detected language: {language}")
+    def get_transcript(self, video_path: str, source_segment=None):
+        # Highlight cut from already transcribed source => take its part of source transcript.
+        if source_segment != None and source_segment.get("content_hash") != None:
+            source_transcript = self.find_source_transcript(source_segment)
+            if source_transcript != None:
+                return slice_transcript(
+                    source_transcript, source_segment["start"], source_segment["end"]
+                )
+        # Otherwise generate captions using Whisper (language is detected automatically)
+        _, transcript = transcript_store.transcribe(
+            video_path, self.whisper_model_size or CAPTIONS_WHISPER_MODEL
+        )
+        return transcript
 
-        # Generate captions using Whisper
-        result = self.model.transcribe(audio_path, language=language)
+    def generate_captions(
+        self, video_path: str, subtitles_path: str, source_segment=None
+    ):
+        result = self.get_transcript(video_path, source_segment)
+        print(f"Detected language: {result.get('language')}")
 
         # Write subtitles to file
         with open(subtitles_path, "w", encoding="utf-8") as f:
@@ -48,12 +68,11 @@ class AddCaptionsContentFilter(ContentFilter):
                 )
                 f.write(f"{segment['text']}\n\n")
 
-        # Cleanup temporary audio file
-        os.remove(audio_path)
-
-    def add_subtitles_to_video(self, video_path: str, subtitles_path: str):
+    def add_subtitles_to_video(
+        self, video_path: str, subtitles_path: str, workspace: JobWorkspace
+    ):
         # Add subtitles to the video and overwrite the original
-        temp_output_path = "temp_video_with_captions.mp4"
+        temp_output_path = workspace.get_path("temp_video_with_captions.mp4")
         subprocess.run(
             [
                 "ffmpeg",
@@ -78,17 +97,21 @@ class AddCaptionsContentFilter(ContentFilter):
             for media_file in content.mediaFiles:
                 if media_file.mtype == MediaType.VIDEO:
                     video_path = media_file.path
-                    subtitles_path = "subtitles.srt"
 
                     try:
                         print(f"Processing video: {video_path}")
 
-                        # Generate captions and add them to the video
-                        self.generate_captions(video_path, subtitles_path)
-                        self.add_subtitles_to_video(video_path, subtitles_path)
-
-                        # Cleanup temporary subtitles file
-                        os.remove(subtitles_path)
+                        # temporary files are removed together with workspace.
+                        with JobWorkspace("captions") as workspace:
+                            subtitles_path = workspace.get_path("subtitles.srt")
+
+                            # Generate captions and add them to the video
+                            self.generate_captions(
+                                video_path, subtitles_path, content.source_segment
+                            )
+                            self.add_subtitles_to_video(
+                                video_path, subtitles_path, workspace
+                            )
 
                         print(f"Captions added to video: {video_path}")
 
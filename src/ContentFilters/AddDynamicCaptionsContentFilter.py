@@ -3,15 +3,25 @@ import re
 import subprocess
 from typing import List
 
+from configurations.config import (CAPTIONS_ACCEPTED_TRANSCRIPT_MODELS,
+                                   CAPTIONS_WHISPER_MODEL)
+
 from src.ContentFilters.ContentFilter import ContentFilter
 from src.entities.ContentToUpload import ContentToUpload
 from src.entities.MediaType import MediaType
+from src.utils.JobWorkspace import JobWorkspace
 from src.utils.Logger import logger
+from src.utils.TranscriptStore import slice_transcript, transcript_store
 
 
 class AddDynamicCaptionsContentFilter(ContentFilter):
     def __init__(
-        self, fontsize=24, font_color="#FFFFFF", bg_color="#000000", position_margin=50
+        self,
+        fontsize=24,
+        font_color="#FFFFFF",
+        bg_color="#000000",
+        position_margin=50,
+        whisper_model_size=None,
     ):
         """Initialize caption style parameters.
 
@@ -20,7 +30,11 @@ class AddDynamicCaptionsContentFilter(ContentFilter):
             font_color (str): Primary color of the font in HEX format.
             bg_color (str): Background color of the captions in HEX format.
             position_margin (int): Vertical margin for the captions.
+            whisper_model_size (str): Whisper model of captions, None - model of source
+                transcript made by highlights extractor (CAPTIONS_WHISPER_MODEL, if
+                there is no source transcript).
         """
+        self.whisper_model_size = whisper_model_size
         self.fontsize = fontsize
         self.font_color = self.hex_to_ass_color(font_color)
         self.bg_color = self.hex_to_ass_color(bg_color, alpha=128)
@@ -58,17 +72,42 @@ class AddDynamicCaptionsContentFilter(ContentFilter):
         """Removes special characters from text."""
         return re.sub(r"[^\w\s]", "", text)
 
-    @staticmethod
-    def detect_language(audio_path):
-        """Detects the language of the audio using Whisper."""
-        import whisper
+    def find_source_transcript(self, source_segment):
+        preferred_model = self.whisper_model_size or source_segment.get(
+            "transcript_model"
+        )
+        if preferred_model == None:
+            return None
+        return transcript_store.find(
+            source_segment["content_hash"],
+            preferred_model,
+            word_timestamps=True,
+            accepted_models=CAPTIONS_ACCEPTED_TRANSCRIPT_MODELS,
+        )
 
-        model = whisper.load_model("medium")
-        result = model.transcribe(audio_path, task="language-detection")
-        return result.get("language", "en")
+    def get_transcript(self, video_path, source_segment=None):
+        """Returns transcript with word timestamps for the video.
 
-    def add_captions_to_video(self, video_path):
+        Highlight cut from already transcribed source takes its part of source transcript,
+        otherwise video is transcribed by Whisper.
+        """
+        if source_segment != None and source_segment.get("content_hash") != None:
+            source_transcript = self.find_source_transcript(source_segment)
+            if source_transcript != None:
+                return slice_transcript(
+                    source_transcript, source_segment["start"], source_segment["end"]
+                )
+        _, transcript = transcript_store.transcribe(
+            video_path,
+            self.whisper_model_size or CAPTIONS_WHISPER_MODEL,
+            word_timestamps=True,
+        )
+        return transcript
+
+    def add_captions_to_video(self, video_path, source_segment=None):
         """Adds word-level captions directly to the input video using Whisper."""
+        # temporary files of the video are kept in its own workspace.
+        workspace = JobWorkspace("dynamic_captions")
         try:
             # Ensure FFmpeg is installed
             ffmpeg_check = subprocess.run(
@@ -77,26 +116,11 @@ class AddDynamicCaptionsContentFilter(ContentFilter):
             if ffmpeg_check.returncode != 0:
                 raise EnvironmentError("FFmpeg is not installed or not in PATH.")
 
-            # Generate audio from video
-            audio_path = "temp_audio.wav"
-            subprocess.run(
-                ["ffmpeg", "-i", video_path, "-q:a", "0", "-map", "a", audio_path],
-                check=True,
-            )
-
-            # Detect language of the audio
-            language = AddDynamicCaptionsContentFilter.detect_language(audio_path)
-
-            # Generate subtitles using Whisper
-            import whisper
-
-            model = whisper.load_model("medium")
-            result = model.transcribe(
-                audio_path, language=language, word_timestamps=True
-            )
+            # Generate subtitles using Whisper or source transcript
+            result = self.get_transcript(video_path, source_segment)
 
             # Create subtitles file
-            subtitles_path = "subtitles.srt"
+            subtitles_path = workspace.get_path("subtitles.srt")
             with open(subtitles_path, "w", encoding="utf-8") as f:
                 index = 1
                 for segment in result["segments"]:
@@ -112,7 +136,7 @@ class AddDynamicCaptionsContentFilter(ContentFilter):
                         index += 1
 
             # Add subtitles directly to the input video
-            temp_video_path = "temp_video_with_captions.mp4"
+            temp_video_path = workspace.get_path("temp_video_with_captions.mp4")
             subprocess.run(
                 [
                     "ffmpeg",
@@ -131,17 +155,16 @@ class AddDynamicCaptionsContentFilter(ContentFilter):
 
             # Replace the original video with the modified one
             os.replace(temp_video_path, video_path)
-
-            # Cleanup temporary files
-            os.remove(audio_path)
-            os.remove(subtitles_path)
         except Exception as e:
             logger.log(f"An error occurred while adding captions: {e}")
+        finally:
+            # Cleanup temporary files
+            workspace.remove()
 
     def filter(self, content_to_upload: List[ContentToUpload]) -> List[ContentToUpload]:
         for content in content_to_upload:
             for media_file in content.mediaFiles:
                 if media_file.mtype == MediaType.VIDEO:
                     input_path = media_file.path
-                    self.add_captions_to_video(input_path)
+                    self.add_captions_to_video(input_path, content.source_segment)
         return content_to_upload
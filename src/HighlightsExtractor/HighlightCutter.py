@@ -0,0 +1,204 @@
+"""
+# HighlightCutter.py
+# date: 18.10.2026
+# brief: cuts highlights from source video using ffmpeg.
+#        Highlight start is snapped to the nearest previous keyframe, so the highlight can be
+#        cut without re-encoding (-c copy). If there is no keyframe close enough to the
+#        highlight start, only the head of highlight (till the next keyframe) is re-encoded
+#        and joined with the body cut by stream copy. The whole highlight is re-encoded
+#        only if it is not possible.
+#        Output video is always h264: highlights of sources with other codecs (av1, vp9)
+#        are re-encoded, unless filters re-encode them afterwards anyway.
+"""
+
+import os
+import subprocess
+from bisect import bisect_left, bisect_right
+
+from configurations.config import (MAX_KEYFRAME_SNAP_SECONDS,
+                                   MAX_REENCODED_KEYFRAME_SNAP_SECONDS)
+
+from src.utils.ffmpeg_utils import (get_keyframe_times, get_media_duration,
+                                    get_video_stream_info)
+from src.utils.fs_utils import remove_file
+from src.utils.Logger import logger
+
+# ffmpeg seeks to keyframe before -ss, so -ss is moved a bit after the keyframe
+# to not get the previous one because of rounding.
+KEYFRAME_SEEK_EPSILON = 0.001
+# re-encoded head of highlight is encoded with the same profile as the source,
+# so it can be joined with the stream-copied body.
+X264_PROFILES = {
+    "Constrained Baseline": "baseline",
+    "Baseline": "baseline",
+    "Main": "main",
+    "High": "high",
+}
+
+
+class HighlightCutter:
+    def __init__(
+        self,
+        source_path: str,
+        max_keyframe_snap=MAX_KEYFRAME_SNAP_SECONDS,
+        max_reencoded_keyframe_snap=MAX_REENCODED_KEYFRAME_SNAP_SECONDS,
+    ):
+        # max_reencoded_keyframe_snap - limit of snap, when highlight is re-encoded by filters anyway.
+        self.source_path = source_path
+        self.max_keyframe_snap = max_keyframe_snap
+        self.max_reencoded_keyframe_snap = max_reencoded_keyframe_snap
+        # keyframe index is computed once per source and used for all highlights.
+        self.duration = get_media_duration(source_path)
+        try:
+            self.keyframes = get_keyframe_times(source_path)
+        except Exception as e:
+            logger.warning(f"HighlightCutter: failed to read keyframes: {e}")
+            self.keyframes = []
+        self.video_info = get_video_stream_info(source_path)
+        # only h264 is uploaded as is.
+        self.is_h264 = self.video_info.get("codec_name") == "h264"
+        logger.info(
+            f"HighlightCutter: source={source_path} duration={self.duration} keyframes={len(self.keyframes)}"
+        )
+
+    def __get_previous_keyframe(self, time: float):
+        idx = bisect_right(self.keyframes, time)
+        if idx == 0:
+            return None
+        return self.keyframes[idx - 1]
+
+    def __get_next_keyframe(self, time: float):
+        idx = bisect_left(self.keyframes, time + KEYFRAME_SEEK_EPSILON)
+        if idx == len(self.keyframes):
+            return None
+        return self.keyframes[idx]
+
+    def plan_cut(self, start: float, reencode_required=False):
+        # returns (cut_start, stream_copy).
+        # reencode_required - content is re-encoded by filters afterwards, so edges of the
+        #                     highlight do not need accurate cut.
+        #                     Snap is still limited, so long GOP does not prepend many
+        #                     seconds of unrelated footage to the highlight.
+        if self.is_h264 == False and reencode_required == False:
+            return start, False  # stream copy would keep codec of the source.
+        max_snap = self.max_keyframe_snap
+        if reencode_required:
+            max_snap = max(self.max_reencoded_keyframe_snap, self.max_keyframe_snap)
+        keyframe = self.__get_previous_keyframe(start)
+        if keyframe != None and start - keyframe <= max_snap:
+            return keyframe, True
+        return start, False
+
+    def __run_ffmpeg(self, args):
+        with open(os.devnull, "w") as devnull:
+            subprocess.run(
+                ["ffmpeg", "-y"] + args, check=True, stdout=devnull, stderr=devnull
+            )
+
+    def __get_head_codec_args(self, threads: int):
+        args = ["-c:v", "libx264", "-threads", str(threads)]
+        profile = X264_PROFILES.get(self.video_info.get("profile"))
+        if profile != None:
+            args += ["-profile:v", profile]
+        if self.video_info.get("pix_fmt") != None:
+            args += ["-pix_fmt", self.video_info["pix_fmt"]]
+        return args
+
+    def __cut_reencoding_head(
+        self, start: float, end: float, output_path: str, threads: int
+    ) -> bool:
+        # head [start, keyframe) is re-encoded, body [keyframe, end) is stream copied.
+        # Both are written as mpeg-ts (parameter sets inside of the stream), so they can
+        # be joined by concat demuxer. Audio is taken from the source as a whole.
+        keyframe = self.__get_next_keyframe(start)
+        if self.is_h264 == False or keyframe == None or keyframe >= end:
+            return False
+        head_path = f"{output_path}.head.ts"
+        body_path = f"{output_path}.body.ts"
+        list_path = f"{output_path}.concat.txt"
+        try:
+            self.__run_ffmpeg(
+                ["-ss", f"{start:.3f}", "-i", self.source_path]
+                + ["-t", f"{keyframe - start:.3f}", "-map", "0:v:0", "-an"]
+                + self.__get_head_codec_args(threads)
+                + ["-f", "mpegts", head_path]
+            )
+            self.__run_ffmpeg(
+                ["-ss", f"{keyframe + KEYFRAME_SEEK_EPSILON:.3f}"]
+                + ["-i", self.source_path, "-t", f"{end - keyframe:.3f}"]
+                + ["-map", "0:v:0", "-an", "-c:v", "copy"]
+                + ["-bsf:v", "h264_mp4toannexb", "-f", "mpegts", body_path]
+            )
+            with open(list_path, "w") as list_file:
+                for path in (head_path, body_path):
+                    list_file.write(f"file '{os.path.abspath(path)}'\n")
+            self.__run_ffmpeg(
+                ["-f", "concat", "-safe", "0", "-i", list_path]
+                + ["-ss", f"{start:.3f}", "-i", self.source_path]
+                + ["-map", "0:v:0", "-map", "1:a:0?", "-t", f"{end - start:.3f}"]
+                + ["-c:v", "copy", "-c:a", "aac", "-movflags", "+faststart"]
+                + [output_path]
+            )
+            return True
+        except Exception as e:
+            logger.warning(
+                f"HighlightCutter: failed to re-encode only head of {output_path}: {e}"
+            )
+            return False
+        finally:
+            for path in (head_path, body_path, list_path):
+                remove_file(path)
+
+    def cut(
+        self,
+        start: float,
+        end: float,
+        output_path: str,
+        stream_copy: bool,
+        threads: int = 0,
+    ) -> bool:
+        # threads - number of encoder threads, 0 - chosen by ffmpeg.
+        if stream_copy == False and self.__cut_reencoding_head(
+            start, end, output_path, threads
+        ):
+            return True
+        if stream_copy:
+            seek = start + KEYFRAME_SEEK_EPSILON
+            codec_args = ["-c", "copy", "-avoid_negative_ts", "make_zero"]
+        else:
+            seek = start
+            codec_args = [
+                "-c:v",
+                "libx264",
+                "-c:a",
+                "aac",
+                "-threads",
+                str(threads),
+            ]
+        try:
+            self.__run_ffmpeg(
+                [
+                    "-ss",
+                    f"{seek:.3f}",
+                    "-i",
+                    self.source_path,
+                    "-t",
+                    f"{end - start:.3f}",
+                    "-map",
+                    "0:v:0",
+                    "-map",
+                    "0:a:0?",
+                ]
+                + codec_args
+                + ["-movflags", "+faststart", output_path]
+            )
+            return True
+        except Exception as e:
+            logger.error(f"HighlightCutter: failed to cut {output_path}: {e}")
+        return False
+
+    def __str__(self):
+        return f"HighlightCutter(source_path={self.source_path})"
+
+    def __repr__(self):
+        return f"HighlightCutter(source_path={self.source_path!r})"
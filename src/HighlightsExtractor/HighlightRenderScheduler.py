@@ -0,0 +1,89 @@
+"""
+# HighlightRenderScheduler.py
+# date: 18.10.2026
+# brief: renders highlights of one source concurrently.
+#        Every highlight is rendered by separate ffmpeg process, so workers are threads,
+#        which only wait for their ffmpeg. CPU budget is split between workers, so
+#        re-encoding highlights does not oversubscribe CPU.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from configurations.config import (DOWNLOAD_PIPELINE_EXTRACT_WORKERS,
+                                   HIGHLIGHT_RENDER_WORKERS)
+
+from src.HighlightsExtractor.HighlightCutter import HighlightCutter
+from src.utils.Logger import logger
+
+
+class RenderTask:
+    def __init__(self, start: float, end: float, output_path: str, stream_copy: bool):
+        self.start = start
+        self.end = end
+        self.output_path = output_path
+        self.stream_copy = stream_copy
+
+    def __str__(self):
+        return f"RenderTask(output_path={self.output_path}, start={self.start:.3f}, end={self.end:.3f})"
+
+    def __repr__(self):
+        return (
+            f"RenderTask(start={self.start!r}, end={self.end!r}, "
+            f"output_path={self.output_path!r}, stream_copy={self.stream_copy!r})"
+        )
+
+
+def get_render_cpu_budget() -> int:
+    # extract stage of download pipeline can run in several processes,
+    # each of them renders its own highlights.
+    return max(1, (os.cpu_count() or 1) // max(1, DOWNLOAD_PIPELINE_EXTRACT_WORKERS))
+
+
+class HighlightRenderScheduler:
+    def __init__(
+        self,
+        cutter: HighlightCutter,
+        workers: int = HIGHLIGHT_RENDER_WORKERS,
+        cpu_budget: int = None,
+    ):
+        self.cutter = cutter
+        self.cpu_budget = cpu_budget if cpu_budget != None else get_render_cpu_budget()
+        self.workers = max(1, min(workers, self.cpu_budget))
+
+    def __get_encoder_threads(self, tasks: List[RenderTask]) -> int:
+        # stream copy almost does not use CPU, so budget is split between re-encoding tasks only.
+        reencode_tasks = sum(1 for task in tasks if task.stream_copy == False)
+        parallel_encoders = max(1, min(self.workers, reencode_tasks))
+        return max(1, self.cpu_budget // parallel_encoders)
+
+    def __render_task(self, task: RenderTask, threads: int) -> bool:
+        return self.cutter.cut(
+            task.start, task.end, task.output_path, task.stream_copy, threads=threads
+        )
+
+    def render(self, tasks: List[RenderTask]) -> List[bool]:
+        # returns result of every task in the same order as tasks.
+        if len(tasks) == 0:
+            return []
+        threads = self.__get_encoder_threads(tasks)
+        started_at = time.perf_counter()
+        with ThreadPoolExecutor(
+            max_workers=min(self.workers, len(tasks)),
+            thread_name_prefix="highlight-render",
+        ) as executor:
+            results = list(
+                executor.map(lambda task: self.__render_task(task, threads), tasks)
+            )
+        logger.info(
+            f"Rendered {sum(results)}/{len(tasks)} highlights in {time.perf_counter() - started_at:.1f}s | workers={self.workers} encoder_threads={threads}"
+        )
+        return results
+
+    def __str__(self):
+        return f"HighlightRenderScheduler(workers={self.workers}, cpu_budget={self.cpu_budget})"
+
+    def __repr__(self):
+        return f"HighlightRenderScheduler(cutter={self.cutter!r}, workers={self.workers!r}, cpu_budget={self.cpu_budget!r})"
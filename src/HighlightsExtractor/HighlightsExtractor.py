@@ -14,5 +14,8 @@ class HighlightsExtractor(ABC):
         self,
         downloaded_raw_content: DownloadedRawContent,
         destination_for_saving_highlights=TMP_DIR_PATH,
+        reencode_required=False,
     ) -> List[ContentToUpload]:
+        # reencode_required - highlights will be re-encoded by filters afterwards,
+        #                     so extractor does not need to re-encode them.
         pass
@@ -1,55 +1,121 @@
 import os
+import time
 from typing import List
 
-import moviepy.editor as mp
-import whisper
-from configurations.config import (HIGHLIGHT_NAME, MAX_NUM_OF_HIGHLIGHTS,
-                                   SENTIMENTAL_TAINED_MODEL_PATH, TMP_DIR_PATH)
-from transformers import pipeline
+from configurations.config import (DEFAULT_ASR_BACKEND, HIGHLIGHT_NAME,
+                                   MAX_NUM_OF_HIGHLIGHTS, SENTIMENT_BATCH_SIZE,
+                                   SENTIMENTAL_TAINED_MODEL_PATH, TMP_DIR_PATH,
+                                   VAD_ENABLED)
 
 from src.entities.ContentToUpload import ContentToUpload
-from src.entities.DownloadedRawContent import DownloadedRawContent
+from src.entities.DownloadedRawContent import (DownloadedRawContent,
+                                               DownloadedRawContentType)
 from src.entities.MediaFile import MediaFile
 from src.entities.MediaType import MediaType
+from src.HighlightsExtractor.HighlightCutter import HighlightCutter
+from src.HighlightsExtractor.HighlightRenderScheduler import (
+    HighlightRenderScheduler, RenderTask)
 from src.HighlightsExtractor.HighlightsExtractor import HighlightsExtractor
 from src.utils.fs_utils import is_path_exists
 from src.utils.Logger import logger
+from src.utils.ModelRegistry import use_sentiment_pipeline
+from src.utils.segments_utils import (calculate_overlap,
+                                      remove_overlapping_segments)
+from src.utils.TranscriptStore import transcript_store
 
 
 class TextualHighlightsVideoExtractor(HighlightsExtractor):
 
     def __init__(
-        self, model_name="base", sentiment_model=SENTIMENTAL_TAINED_MODEL_PATH
+        self,
+        model_name="base",
+        sentiment_model=SENTIMENTAL_TAINED_MODEL_PATH,
+        asr_backend=DEFAULT_ASR_BACKEND,
+        vad=VAD_ENABLED,
     ):
-        # Load Whisper model and multilingual sentiment analyzer
-        self.model = whisper.load_model(model_name)
-        self.sentiment_analyzer = pipeline("sentiment-analysis", model=sentiment_model)
+        # Whisper model and multilingual sentiment analyzer are taken from model registry
+        # when they are needed, so they are loaded only once per process.
+        # asr_backend - speech recognition engine of whisper model (see get_asr_backend).
+        self.model_name = model_name
+        self.asr_backend = asr_backend
+        # vad - only speech of source is transcribed (intros, music, silence are skipped).
+        self.vad = vad
+        self.sentiment_model = sentiment_model
 
         # Set environment variable to avoid parallelism warnings
         os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
     def _load_video(self, video_path):
+        # returns cutter, which cuts highlights from the video.
         if not os.path.exists(video_path):
             logger.error(
                 f"HightlightsExtractor: video file for loading is not found: {video_path}"
             )
             return None
-        try:
-            return mp.VideoFileClip(video_path)
-        except Exception as e:
-            logger.error(f"Error loading video: {e}")
-        return None
+        cutter = HighlightCutter(video_path)
+        if cutter.duration == None:
+            logger.error(f"Error loading video: can not read duration of {video_path}")
+            return None
+        return cutter
+
+    def _get_highlight_windows(self, highlights, max_duration, context_buffer):
+        # parts of the source, which are needed to cut highlights.
+        windows = []
+        for segment in highlights:
+            start_time = max(segment["start"] - context_buffer, 0)
+            end_time = min(segment["end"] + context_buffer, start_time + max_duration)
+            windows.append((start_time, end_time))
+        return windows
+
+    def _load_remote_video(
+        self, remote_video, audio_path, highlights, max_duration, context_buffer
+    ):
+        # fetches only parts of the video, which are covered by highlights.
+        windows = self._get_highlight_windows(highlights, max_duration, context_buffer)
+        video_path = os.path.join(os.path.dirname(audio_path), "highlights_windows.mp4")
+        if remote_video.fetch_windows(windows, audio_path, video_path) == None:
+            return None
+        return self._load_video(video_path)
 
     def _transcribe_audio(self, video_path):
-        # transcribe audio from video into text
-        result = self.model.transcribe(video_path, language=None)
-        return result["text"], result["segments"]
+        # transcribe audio from video into text.
+        # Transcript is stored with word timestamps, so caption filters can reuse it.
+        content_hash, transcript = transcript_store.transcribe(
+            video_path,
+            self.model_name,
+            word_timestamps=True,
+            asr_backend=self.asr_backend,
+            vad=self.vad,
+        )
+        return content_hash, transcript["text"], transcript["segments"]
+
+    def _score_segments_by_interest(self, segments, batch_size=SENTIMENT_BATCH_SIZE):
+        # Segments are scored in batches. Texts are sorted by length, so segments of similar
+        # length are in the same batch and less padding is needed.
+        texts = [segment["text"] for segment in segments]
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        sentiments = [None] * len(texts)
+
+        started_at = time.perf_counter()
+        with use_sentiment_pipeline(self.sentiment_model) as sentiment_analyzer:
+            for batch_start in range(0, len(order), batch_size):
+                batch = order[batch_start : batch_start + batch_size]
+                batch_sentiments = sentiment_analyzer(
+                    [texts[i] for i in batch],
+                    batch_size=batch_size,
+                    padding=True,
+                    truncation=True,
+                )
+                for i, sentiment in zip(batch, batch_sentiments):
+                    sentiments[i] = sentiment
+        elapsed = time.perf_counter() - started_at
+        segments_per_sec = len(texts) / elapsed if elapsed > 0 else 0
+        logger.info(
+            f"Scored {len(texts)} segments | batch_size={batch_size} | {segments_per_sec:.1f} segments/sec"
+        )
 
-    def _score_segments_by_interest(self, segments):
         scored_segments = []
-        for segment in segments:
-            text = segment["text"]
-            sentiment = self.sentiment_analyzer(text)[0]
+        for segment, sentiment in zip(segments, sentiments):
             score = sentiment["score"]
 
             if sentiment["label"] in ["POSITIVE", "EXCITEMENT"]:
@@ -59,7 +125,7 @@ class TextualHighlightsVideoExtractor(HighlightsExtractor):
                 {
                     "start": segment["start"],
                     "end": segment["end"],
-                    "text": text,
+                    "text": segment["text"],
                     "score": score,
                 }
             )
@@ -67,54 +133,70 @@ class TextualHighlightsVideoExtractor(HighlightsExtractor):
         scored_segments.sort(key=lambda x: x["score"], reverse=True)
         return scored_segments
 
-    def _remove_duplicates(self, scored_segments, overlap_threshold=0.5):
-        unique_segments = []
-        for current in scored_segments:
-            is_duplicate = False
-            for existing in unique_segments:
-                overlap = self._calculate_overlap(current, existing)
-                if overlap > overlap_threshold:
-                    is_duplicate = True
-                    break
-            if not is_duplicate:
-                unique_segments.append(current)
-        return unique_segments
+    def _remove_duplicates(
+        self, scored_segments, overlap_threshold=0.5, max_highlights=None
+    ):
+        # stops as soon as max_highlights non-overlapping segments are found.
+        return remove_overlapping_segments(
+            scored_segments, overlap_threshold, max_highlights
+        )
 
     def _calculate_overlap(self, segment1, segment2):
-        start1, end1 = segment1["start"], segment1["end"]
-        start2, end2 = segment2["start"], segment2["end"]
-        overlap = max(0, min(end1, end2) - max(start1, start2))
-        duration = max(end1 - start1, end2 - start2)
-        return overlap / duration
+        return calculate_overlap(segment1, segment2)
 
     def _select_highlights(self, scored_segments, max_highlights):
         return scored_segments[:max_highlights]
 
     def _extract_highlights(
-        self, video, highlights, output_folder, max_duration, context_buffer
+        self,
+        cutter,
+        highlights,
+        output_folder,
+        max_duration,
+        context_buffer,
+        source_content_hash=None,
+        reencode_required=False,
     ):
         content_to_upload_list = []
+        # caption filters reuse source transcript of this model (see _transcribe_audio).
+        transcript_model = transcript_store.get_model_id(
+            self.model_name, self.asr_backend, self.vad
+        )
         # sort_highlights_folder(output_folder) # TODO it corrupts contentToUpload config.
 
+        tasks = []
         for idx, segment in enumerate(highlights):
             start_time = max(segment["start"] - context_buffer, 0)
-            end_time = min(segment["end"] + context_buffer, video.duration)
+            # start is moved to keyframe if highlight can be cut without re-encoding.
+            start_time, stream_copy = cutter.plan_cut(start_time, reencode_required)
+            end_time = min(segment["end"] + context_buffer, cutter.duration)
 
             if end_time - start_time > max_duration:
                 end_time = start_time + max_duration
 
-            clip = video.subclip(start_time, end_time)
-            clip = clip.set_audio(video.audio.subclip(start_time, end_time))
-
             output_path = os.path.join(output_folder, f"{HIGHLIGHT_NAME}_{idx + 1}.mp4")
-            clip.write_videofile(output_path, codec="libx264", audio_codec="aac")
+            tasks.append(RenderTask(start_time, end_time, output_path, stream_copy))
+
+        # highlights are rendered in parallel, results are in the same order as tasks.
+        results = HighlightRenderScheduler(cutter).render(tasks)
+        for idx, (task, is_rendered) in enumerate(zip(tasks, results)):
+            if is_rendered == False:
+                continue
             logger.info(
-                f"Saved highlight {idx + 1} to {output_path}",
+                f"Saved highlight {idx + 1} to {task.output_path} | stream_copy={task.stream_copy}",
                 only_debug_mode=True,
             )
 
-            media_file = MediaFile(output_path, MediaType.VIDEO)
-            content_to_upload = ContentToUpload([media_file], "", idx + 1)
+            media_file = MediaFile(task.output_path, MediaType.VIDEO)
+            source_segment = {
+                "content_hash": source_content_hash,
+                "transcript_model": transcript_model,
+                "start": task.start,
+                "end": task.end,
+            }
+            content_to_upload = ContentToUpload(
+                [media_file], "", idx + 1, source_segment=source_segment
+            )
             content_to_upload_list.append(content_to_upload)
         return content_to_upload_list
 
@@ -125,25 +207,47 @@ class TextualHighlightsVideoExtractor(HighlightsExtractor):
         max_highlights=MAX_NUM_OF_HIGHLIGHTS,
         max_duration=120,
         context_buffer=15,
+        reencode_required=False,
+        remote_video=None,
     ):
-        logger.info("Loading source content")
-        video = self._load_video(source_path)
+        # remote_video - source_path has only audio, video is fetched for chosen highlights.
+        if remote_video == None:
+            logger.info("Loading source content")
+            cutter = self._load_video(source_path)
+            if cutter == None:
+                return None
 
         logger.info("Transcribing source content audio into text.")
-        transcript, segments = self._transcribe_audio(source_path)
+        content_hash, transcript, segments = self._transcribe_audio(source_path)
 
         logger.info("Scoring content for interest...")
         scored_segments = self._score_segments_by_interest(segments)
 
         logger.info("Removing duplicate or overlapping highlights...")
-        unique_highlights = self._remove_duplicates(scored_segments)
+        unique_highlights = self._remove_duplicates(
+            scored_segments, max_highlights=max_highlights
+        )
 
         logger.info("Selecting highlights...")
         highlights = self._select_highlights(unique_highlights, max_highlights)
 
+        if remote_video != None:
+            logger.info(f"Fetching video of {len(highlights)} highlights...")
+            cutter = self._load_remote_video(
+                remote_video, source_path, highlights, max_duration, context_buffer
+            )
+            if cutter == None:
+                return None
+
         logger.info(f"Extracting {len(highlights)} highlights...")
         content_to_upload = self._extract_highlights(
-            video, highlights, highlights_path, max_duration, context_buffer
+            cutter,
+            highlights,
+            highlights_path,
+            max_duration,
+            context_buffer,
+            source_content_hash=content_hash,
+            reencode_required=reencode_required,
         )
 
         logger.info(f"Highlights saved to folder: {highlights_path}")
@@ -153,6 +257,7 @@ class TextualHighlightsVideoExtractor(HighlightsExtractor):
         self,
         downloaded_raw_content: DownloadedRawContent,
         destination_for_saving_highlights=TMP_DIR_PATH,
+        reencode_required=False,
     ) -> List[ContentToUpload]:
         if len(downloaded_raw_content.mediaFiles) == 0:
             logger.warning(
@@ -160,6 +265,9 @@ class TextualHighlightsVideoExtractor(HighlightsExtractor):
             )
             return None
         source_content_path = downloaded_raw_content.mediaFiles[0].path
+        remote_video = None
+        if downloaded_raw_content.ctype == DownloadedRawContentType.AUDIO_FIRST:
+            remote_video = downloaded_raw_content.other
         logger.info(
             f"Extracting highlights from content: {source_content_path} | Saving into {destination_for_saving_highlights}"
         )
@@ -175,12 +283,15 @@ class TextualHighlightsVideoExtractor(HighlightsExtractor):
             res = None
         else:
             res = self._get_highlights(
-                source_content_path, destination_for_saving_highlights
+                source_content_path,
+                destination_for_saving_highlights,
+                reencode_required=reencode_required,
+                remote_video=remote_video,
             )
         return res
 
     def __str__(self):
-        return "TextualHighlightsVideoExtractor"
+        return f"TextualHighlightsVideoExtractor(asr_backend={self.asr_backend})"
 
     def __repr__(self):
-        return "TextualHighlightsVideoExtractor"
+        return f"TextualHighlightsVideoExtractor(model_name={self.model_name!r}, asr_backend={self.asr_backend!r}, vad={self.vad!r})"
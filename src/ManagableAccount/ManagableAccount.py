@@ -8,12 +8,15 @@
 from abc import ABC, abstractmethod
 from typing import List
 
-from configurations.config import MANAGABLE_ACCOUNT_DATA_PATH
+from configurations.config import (DEFAULT_OUTPUT_PROFILE,
+                                   MANAGABLE_ACCOUNT_DATA_PATH,
+                                   PREFETCH_SCHEDULE_CYCLES)
 
 from src.entities.AccountCredentials import AccountCredentials
 from src.entities.AccountType import AccountType
 from src.entities.ContentToUpload import ContentToUpload
 from src.entities.FilterType import FilterType
+from src.entities.OutputProfile import OutputProfile
 from src.entities.Proxy import Proxy
 from src.entities.Schedule import Schedule
 from src.utils.fs_utils import is_path_exists
@@ -32,6 +35,9 @@ class ManagableAccount(ABC):
         schedule: Schedule,
         sources: List[str],
         filters: List[FilterType],
+        low_watermark: int = None,
+        output_profile: OutputProfile = None,
+        asr_backend: str = None,
     ):
         self.name = name
         self.description = description
@@ -42,6 +48,21 @@ class ManagableAccount(ABC):
         self.schedule = schedule
         self.sources = sources
         self.filters = filters
+        self.low_watermark = low_watermark
+        if output_profile == None:
+            output_profile = OutputProfile(**DEFAULT_OUTPUT_PROFILE)
+        self.output_profile = output_profile
+        # speech recognition backend, None => chosen by content type (see get_asr_backend_name).
+        self.asr_backend = asr_backend
+
+    def get_low_watermark(self) -> int:
+        # min number of ready content items, below which new content is prefetched.
+        # By default it is enough content for the next schedule cycles.
+        if self.low_watermark != None:
+            return self.low_watermark
+        if self.schedule == None:
+            return 1
+        return max(1, len(self.schedule.time) * PREFETCH_SCHEDULE_CYCLES)
 
     def get_account_dir_path(self):
         return f"{MANAGABLE_ACCOUNT_DATA_PATH}/{self.accountType.value}/{self.name}/"
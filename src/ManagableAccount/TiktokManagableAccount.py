@@ -11,6 +11,7 @@ from src.entities.AccountType import AccountType
 from src.entities.ContentToUpload import ContentToUpload
 from src.entities.FilterType import FilterType
 from src.entities.MediaType import MediaType
+from src.entities.OutputProfile import OutputProfile
 from src.entities.Proxy import Proxy
 from src.entities.Schedule import Schedule
 from src.ManagableAccount.entrypoints.TiktokEntrypoint.TiktokEntrypoint import \
@@ -31,6 +32,9 @@ class TiktokManagableAccount(ManagableAccount):
         schedule: Schedule,
         sources: List[str],
         filters: List[FilterType],
+        low_watermark: int = None,
+        output_profile: OutputProfile = None,
+        asr_backend: str = None,
     ):
         super().__init__(
             name,
@@ -42,6 +46,9 @@ class TiktokManagableAccount(ManagableAccount):
             schedule,
             sources,
             filters,
+            low_watermark,
+            output_profile,
+            asr_backend,
         )
         cookies_for_login_in_tiktok_account_path = (
             self.get_account_dir_path() + TIKTOK_COOKIES_PATH
@@ -5,8 +5,11 @@ from src.ManagableAccount.entrypoints.TiktokEntrypoint.tiktok_uploader.src.tikto
 from src.ManagableAccount.entrypoints.TiktokEntrypoint.tiktok_uploader.src.tiktok_uploader.upload import \
     upload_videos
 from src.utils.Logger import logger
+from src.utils.NetworkGovernor import PRIORITY_HIGH, network_governor
 from configurations.config import HEADLESS_MODE
 
+TIKTOK_UPLOAD_HOST = "www.tiktok.com"
+
 class TiktokEntrypoint:
 
     def __init__(self, cookies_path, proxy):
@@ -32,10 +35,18 @@ class TiktokEntrypoint:
 
         if self.m_proxy != None:
             tmp_proxy = self.m_proxy.to_json()
+            proxy_key = f"{self.m_proxy.host}:{self.m_proxy.port}"
         else:
             tmp_proxy = None
+            proxy_key = None
         logger.info(f"Uploading with proxy {tmp_proxy}")
-        failed_videos = upload_videos(
-            videos=videos, auth=auth, headless=HEADLESS_MODE, proxy=tmp_proxy
-        )
+        # upload for schedule slot preempts background downloads.
+        # Traffic of browser can not be metered => size of video is taken from bandwidth budget.
+        with network_governor.transfer(
+            TIKTOK_UPLOAD_HOST, proxy=proxy_key, priority=PRIORITY_HIGH
+        ):
+            network_governor.consume(os.path.getsize(path), PRIORITY_HIGH)
+            failed_videos = upload_videos(
+                videos=videos, auth=auth, headless=HEADLESS_MODE, proxy=tmp_proxy
+            )
         return len(failed_videos) == 0
@@ -1,5 +1,7 @@
 """Gets the browser's given the user's input"""
 
+import base64
+
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options as ChromeOptions
 # Webdriver managers
@@ -17,6 +19,7 @@ from src.ManagableAccount.entrypoints.TiktokEntrypoint.tiktok_uploader.src.tikto
     config
 from src.ManagableAccount.entrypoints.TiktokEntrypoint.tiktok_uploader.src.tiktok_uploader.proxy_auth_extension.proxy_auth_extension import \
     generate_proxy_auth_extension
+from src.utils.JobWorkspace import JobWorkspace
 
 
 def get_browser(name: str = "chrome", options=None, *args, **kwargs) -> webdriver:
@@ -102,16 +105,21 @@ def chrome_defaults(
         options.add_argument("--headless=new")
     if proxy:
         if "user" in proxy.keys() and "pass" in proxy.keys():
-            # This can fail if you are executing the function more than once in the same time
-            extension_file = "temp_proxy_auth_extension.zip"
-            generate_proxy_auth_extension(
-                proxy["host"],
-                proxy["port"],
-                proxy["user"],
-                proxy["pass"],
-                extension_file,
-            )
-            options.add_extension(extension_file)
+            # Extension is generated in its own workspace, so browsers can be launched
+            # at the same time. It is added encoded, so the file is not needed afterwards.
+            with JobWorkspace("proxy_auth_extension") as workspace:
+                extension_file = workspace.get_path("proxy_auth_extension.zip")
+                generate_proxy_auth_extension(
+                    proxy["host"],
+                    proxy["port"],
+                    proxy["user"],
+                    proxy["pass"],
+                    extension_file,
+                )
+                with open(extension_file, "rb") as f:
+                    options.add_encoded_extension(
+                        base64.b64encode(f.read()).decode("utf-8")
+                    )
         else:
             options.add_argument(f'--proxy-server={proxy["host"]}:{proxy["port"]}')
 
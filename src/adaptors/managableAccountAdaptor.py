@@ -1,8 +1,11 @@
 from typing import Dict, List, Optional
 
+from configurations.config import DEFAULT_OUTPUT_PROFILE
+
 from src.entities.AccountCredentials import AccountCredentials
 from src.entities.AccountType import AccountType
 from src.entities.FilterType import FilterType
+from src.entities.OutputProfile import OutputProfile
 from src.entities.Proxy import Proxy
 from src.entities.Schedule import Schedule
 from src.ManagableAccount.ManagableAccount import ManagableAccount
@@ -75,6 +78,19 @@ def json_to_managable_account(data: Dict) -> Optional[ManagableAccount]:
         for filter_str in json_filters
     ]
 
+    # Parse output profile, missing fields are taken from default profile.
+    output_profile_data = data.get("output_profile", None)
+    output_profile = None
+    if output_profile_data != None:
+        try:
+            output_profile = OutputProfile(
+                **{**DEFAULT_OUTPUT_PROFILE, **output_profile_data}
+            )
+        except:
+            logger.info(
+                "Error happened during parsing managable accounts config: output profile is not parsed"
+            )
+
     # Create and return the correct ManagableAccount instance based on account type
     if account_type == AccountType.TIKTOK:
         return TiktokManagableAccount(
@@ -87,6 +103,9 @@ def json_to_managable_account(data: Dict) -> Optional[ManagableAccount]:
             schedule=schedule,
             sources=sources,
             filters=filters,
+            low_watermark=data.get("low_watermark", None),
+            output_profile=output_profile,
+            asr_backend=data.get("asr_backend", None),
         )
 
     return None
@@ -3,15 +3,24 @@
 """
 
 from src.entities.ContentType import ContentType
+from src.entities.OutputProfile import OutputProfile
 from src.entities.SourceType import SourceType
 
 
 class ContentToDownload:
 
-    def __init__(self, url: str, source_type: SourceType, content_type: ContentType):
+    def __init__(
+        self,
+        url: str,
+        source_type: SourceType,
+        content_type: ContentType,
+        output_profile: OutputProfile = None,
+    ):
         self.url = url
         self.source_type = source_type
         self.content_type = content_type
+        # output of account, content is downloaded for. Used to select quality of streams.
+        self.output_profile = output_profile
 
     def __str__(self):
         return f"ContentToDownload(url='{self.url}', source_type='{self.source_type}', content_type='{self.content_type}')"
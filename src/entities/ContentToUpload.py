@@ -11,10 +11,16 @@ class ContentToUploadType(Enum):
 
 class ContentToUpload:
 
-    def __init__(self, mediaFiles: List[MediaFile], text: str, cid: int):
+    def __init__(
+        self, mediaFiles: List[MediaFile], text: str, cid: int, source_segment=None
+    ):
         self.cid = cid  # needed to sort ContentToUpload by this key.
         self.mediaFiles = mediaFiles
         self.text = text
+        # part of source media, content was cut from:
+        # {"content_hash": str, "start": float, "end": float}. Used by filters to reuse
+        # source transcript. It is not saved into upload config.
+        self.source_segment = source_segment
 
     def __repr__(self):
         return (
@@ -6,6 +6,8 @@ from src.entities.MediaFile import MediaFile
 
 class DownloadedRawContentType(Enum):
     VIDEO = "VIDEO"
+    # only audio is downloaded, video is fetched later for chosen parts (other - DashWindowFetcher).
+    AUDIO_FIRST = "AUDIO_FIRST"
     UNSPECIFIED = "UNSPECIFIED"
 
 
@@ -4,4 +4,5 @@ from enum import Enum
 class MediaType(Enum):
     VIDEO = "VIDEO"
     PHOTO = "PHOTO"
+    AUDIO = "AUDIO"
     UNSPECIFIED = "UNSPECIFIED"
@@ -0,0 +1,56 @@
+from typing import List
+
+# how source video is placed into output frame.
+FIT_MODE_FIT = "fit"  # the whole source is scaled into frame (letterbox)
+FIT_MODE_CROP = "crop"  # source is scaled to fill frame, the rest is cropped
+
+
+class OutputProfile:
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        fps: int = None,
+        codecs: List[str] = None,
+        max_bitrate: int = None,
+        fit_mode: str = FIT_MODE_FIT,
+    ):
+        # width, height - size of output video (f.e. 1080x1920 for 9:16 tiktok clip).
+        # fps - max useful fps, None - any.
+        # codecs - preferred video codecs (f.e. "avc1"), the first is the most preferred.
+        # max_bitrate - max bitrate of source video stream in bits/s, None - any.
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.codecs = codecs if codecs != None else []
+        self.max_bitrate = max_bitrate
+        self.fit_mode = fit_mode
+
+    def get_required_source_height(self, source_aspect_ratio: float) -> int:
+        # min height of source video, which gives output without upscaling.
+        # source_aspect_ratio - width / height of source video.
+        if self.fit_mode == FIT_MODE_CROP:
+            # source fills the frame => limited by the side, which is not cropped.
+            return max(self.height, round(self.width / source_aspect_ratio))
+        # the whole source is inside the frame => limited by the side, which touches frame.
+        return min(self.height, round(self.width / source_aspect_ratio))
+
+    def __repr__(self):
+        return (
+            f"OutputProfile(width={self.width}, height={self.height}, fps={self.fps}, "
+            f"codecs={self.codecs}, max_bitrate={self.max_bitrate}, fit_mode={self.fit_mode!r})"
+        )
+
+    def __str__(self):
+        return f"OutputProfile: {self.width}x{self.height} {self.fit_mode}"
+
+    def to_dict(self):
+        return {
+            "width": self.width,
+            "height": self.height,
+            "fps": self.fps,
+            "codecs": self.codecs,
+            "max_bitrate": self.max_bitrate,
+            "fit_mode": self.fit_mode,
+        }
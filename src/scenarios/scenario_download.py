@@ -11,9 +11,15 @@
 @return: void
 """
 
+import os
+import threading
 from typing import List
 
-from configurations.config import SOURCES_CONFIG_PATH, TMP_DIR_PATH
+from configurations.config import (DOWNLOAD_PIPELINE_DOWNLOAD_WORKERS,
+                                   DOWNLOAD_PIPELINE_EXTRACT_WORKERS,
+                                   DOWNLOAD_PIPELINE_FILTER_WORKERS,
+                                   DOWNLOAD_PIPELINE_QUEUE_SIZE,
+                                   SOURCES_CONFIG_PATH)
 
 from src.ContentFilters.AddCaptionsContentFilter import \
     AddCaptionsContentFilter
@@ -21,23 +27,33 @@ from src.ContentFilters.AddDynamicCaptionsContentFilter import \
     AddDynamicCaptionsContentFilter
 from src.ContentFilters.EmptyFilter import EmptyFilter
 from src.ContentFilters.TiktokTagsAddFilter import TiktokTagsAddFilter
+from src.entities.ContentToDownload import ContentToDownload
 from src.entities.ContentToUpload import ContentToUpload
 from src.entities.DownloadedRawContent import DownloadedRawContent
 from src.entities.FilterType import FilterType
 from src.entities.Source import Source
 from src.ManagableAccount.ManagableAccount import ManagableAccount
-from src.utils.helpers import (cache_downloaded_content, get_account_sources,
+from src.utils.helpers import (cache_downloaded_content, get_account_key,
+                               get_account_sources,
                                get_content_download_definer,
                                get_content_downloader,
                                get_highlights_video_extractor,
-                               remove_downloaded_raw_content,
+                               get_sources_subscribers,
                                update_uploading_config_with_new_content)
+from src.utils.JobWorkspace import JobWorkspace
 from src.utils.Logger import logger
+from src.utils.MediaStore import media_store
+from src.utils.NetworkGovernor import (connect_network_governor,
+                                       network_governor,
+                                       serve_network_governor)
+from src.utils.SourceContentRegistry import (CLAIM_BUSY, CLAIM_READY,
+                                             source_content_registry)
+from src.utils.StagedPipeline import PipelineStage, StagedPipeline
 
 
-def _download_raw_content_from_source(
+def _define_content_to_download(
     source: Source, account: ManagableAccount
-) -> DownloadedRawContent:
+) -> ContentToDownload:
     logger.info(f"Start downloading process for source={source}")
 
     # Determine ContentDownloadDefiner - obj, that defines, which content to download
@@ -51,9 +67,14 @@ def _download_raw_content_from_source(
     content_to_download = content_to_download_definer.define_content_to_download(
         source, account
     )
-    if content_to_download == None:
+    if content_to_download == None or content_to_download.url == None:
         return None
+    return content_to_download
+
 
+def _download_raw_content(
+    content_to_download: ContentToDownload, download_path: str
+) -> DownloadedRawContent:
     # Determine ContentDownloader based on contentToDownload.
     # For Youtube it will be YoutubeContentDownloader,
     # For Telegram - TelegramContentDownloader, etc
@@ -62,13 +83,7 @@ def _download_raw_content_from_source(
         return None
 
     # Download DownloadedRawContent using determined downloader
-    downloaded_raw_content = downloader.downloadContent(
-        content_to_download, download_path=TMP_DIR_PATH
-    )
-
-    if downloaded_raw_content != None:
-        cache_downloaded_content(content_to_download, account)
-    return downloaded_raw_content
+    return downloader.downloadContent(content_to_download, download_path=download_path)
 
 
 def _get_filter(account, filter_type):
@@ -82,6 +97,15 @@ def _get_filter(account, filter_type):
     return ret_filter
 
 
+def _is_reencoding_required(account: ManagableAccount):
+    # filters, which draw on video, re-encode it anyway.
+    reencoding_filters = [
+        FilterType.ADD_VIDEO_CAPTIONS,
+        FilterType.ADD_VIDEO_DYNAMIC_CAPTIONS,
+    ]
+    return any(filter_type in reencoding_filters for filter_type in account.filters)
+
+
 def _filter_content_to_upload(
     content_to_upload: List[ContentToUpload], account: ManagableAccount
 ):
@@ -94,40 +118,205 @@ def _filter_content_to_upload(
     return content_to_upload
 
 
-def _download_content_from_source(source: Source, account: ManagableAccount):
-    downloaded_raw_content = _download_raw_content_from_source(source, account)
-    if downloaded_raw_content == None:
-        return None  # Failed while downloding content.
+class _SourceJob:
+    # item, which goes through download pipeline stages.
+    def __init__(self, source: Source, account: ManagableAccount, subscribers=None):
+        # subscribers - keys of accounts subscribed to the source (see get_account_key).
+        self.source = source
+        self.account = account
+        self.subscribers = subscribers or [get_account_key(account)]
+        self.content_to_download = None
+        self.download_path = (
+            None  # media linked from media store is referenced by this path.
+        )
+        # stages run in pool threads => network priority of the caller is kept in job.
+        self.network_priority = network_governor.get_priority()
+        self.downloaded_raw_content = None
+        self.content_to_upload = None
+        # content is processed for all subscribed accounts through source content registry.
+        self.is_claimed = False  # this job processes content and registers highlights.
+        self.is_registered = False  # highlights are in registry.
+        # all files of the job (downloaded content, highlights) are kept in its own directory.
+        self.workspace = JobWorkspace(f"{account.name}_{source.name}")
+
+    def __str__(self):
+        return f"SourceJob(source={self.source.name}, account={self.account.name})"
+
+    def __repr__(self):
+        return f"SourceJob(source={self.source.name!r}, account={self.account.name!r})"
+
+
+def _claim_source_content(job: _SourceJob):
+    # returns False if content is being processed for another account right now.
+    url = job.content_to_download.url
+    if set(job.subscribers).issubset([get_account_key(job.account)]):
+        return True  # nobody else needs highlights of this content.
+
+    claim = source_content_registry.claim(url, job.subscribers)
+    if claim == CLAIM_BUSY:
+        logger.info(f"Content {url} is being processed for another account => skip")
+        return False
+    if claim == CLAIM_READY:
+        # highlights were already extracted for another account.
+        job.content_to_upload = source_content_registry.checkout(
+            url, job.workspace.get_subdir("highlights")
+        )
+        job.is_registered = job.content_to_upload != None
+        return job.is_registered
+    job.is_claimed = True
+    return True
+
+
+def _download_stage(job: _SourceJob):
+    with network_governor.priority(job.network_priority):
+        return _download_job_content(job)
+
+
+def _download_job_content(job: _SourceJob):
+    job.content_to_download = _define_content_to_download(job.source, job.account)
+    if job.content_to_download == None:
+        return None
+    if _claim_source_content(job) == False:
+        return None
+
+    if job.content_to_upload == None:
+        job.download_path = job.workspace.get_subdir("download")
+        job.downloaded_raw_content = _download_raw_content(
+            job.content_to_download, job.download_path
+        )
+        if job.downloaded_raw_content == None:
+            return None  # Failed while downloding content.
+    cache_downloaded_content(job.content_to_download, job.account)
+    return job
+
+
+def _extract_stage(job: _SourceJob):
+    if job.downloaded_raw_content == None:
+        return job  # highlights are taken from source content registry.
 
     # Determine, which content extractor to use based on content type.
     # For example: for youtube video interviews it will be one extractor.
     # 			   for boxing video it will be another extractor.
-
-    extractor = get_highlights_video_extractor(source.content_type)
+    extractor = get_highlights_video_extractor(job.source.content_type, job.account)
     if extractor == None:
         return None
 
     # Extract highlights and save them into destination_for_saving_highlights.
-    # Also add note about highlight into contentToUploadeConfig.json
-    content_to_upload = extractor.extract_highlights(
-        downloaded_raw_content=downloaded_raw_content
-    )
     # Extractor preprocess downloaded_raw_content and returned list[ContentToUpload]
+    job.content_to_upload = extractor.extract_highlights(
+        downloaded_raw_content=job.downloaded_raw_content,
+        destination_for_saving_highlights=job.workspace.get_subdir("highlights"),
+        reencode_required=_is_reencoding_required(job.account),
+    )
+    if job.content_to_upload == None:
+        return None
+
+    if job.is_claimed:
+        # highlights are registered before filters, so every account applies its own.
+        job.is_registered = source_content_registry.register(
+            job.content_to_download.url, job.content_to_upload
+        )
+    return job
 
+
+def _filter_stage(job: _SourceJob):
     # Add filters to the content_to_upload like audio/visual effects, subtitles, etc.
-    content_to_upload = _filter_content_to_upload(content_to_upload, account)
+    job.content_to_upload = _filter_content_to_upload(
+        job.content_to_upload, job.account
+    )
+    return job
+
 
+def _publish_stage(job: _SourceJob):
     # ContentToUpload is ready for uploading.
     # Moving ContentToUpload from tmp folder into account`s content folder.
     # Modifying account`s upload config => adding new notes in config about new content.
-    update_uploading_config_with_new_content(account, content_to_upload)
+    update_uploading_config_with_new_content(job.account, job.content_to_upload)
+    if job.is_registered:
+        source_content_registry.mark_consumed(
+            job.content_to_download.url, get_account_key(job.account)
+        )
+
+    # remove raw content and everything else left in job workspace.
+    _release_media(job)
+    job.workspace.remove()
+    return job
+
 
-    # remove content of tmp folder
-    remove_downloaded_raw_content(downloaded_raw_content)
+def _release_media(job: _SourceJob):
+    # raw media of the job stays in media store, but can be evicted now.
+    if job.download_path != None:
+        media_store.release(os.path.normpath(job.download_path))
+
+
+def _drop_job(job: _SourceJob):
+    # job failed in one of the stages => files of the job are not needed anymore.
+    _release_media(job)
+    job.workspace.remove()
+    if job.is_registered:
+        # content is marked as downloaded for account => it will not be taken again.
+        source_content_registry.mark_consumed(
+            job.content_to_download.url, get_account_key(job.account)
+        )
+    elif job.is_claimed:
+        source_content_registry.release(job.content_to_download.url)
+
+
+_download_pipeline = None
+_download_pipeline_lock = threading.Lock()
+
+
+def _get_download_pipeline():
+    # pipeline is shared by all runs, so worker processes of extraction and filters
+    # (and models loaded by them) live as long as the application.
+    global _download_pipeline
+    with _download_pipeline_lock:
+        if _download_pipeline == None:
+            _download_pipeline = _create_download_pipeline()
+        return _download_pipeline
+
+
+def _create_download_pipeline():
+    # download is network-bound => threads.
+    # extraction and filters are cpu-bound => processes.
+    # publish modifies account`s upload config => always one worker.
+    stages = [
+        PipelineStage("download", _download_stage, DOWNLOAD_PIPELINE_DOWNLOAD_WORKERS),
+        PipelineStage(
+            "extract",
+            _extract_stage,
+            DOWNLOAD_PIPELINE_EXTRACT_WORKERS,
+            use_processes=True,
+        ),
+        PipelineStage(
+            "filter",
+            _filter_stage,
+            DOWNLOAD_PIPELINE_FILTER_WORKERS,
+            use_processes=True,
+        ),
+        PipelineStage("publish", _publish_stage, 1),
+    ]
+    pipeline = StagedPipeline(
+        stages, queue_size=DOWNLOAD_PIPELINE_QUEUE_SIZE, on_drop=_drop_job
+    )
+    if pipeline.is_sequential() == False:
+        # extraction fetches video windows in audio-first mode => network I/O of worker
+        # processes goes through governor of this process, so limits stay global.
+        pipeline.process_initializer = connect_network_governor
+        pipeline.process_initargs = serve_network_governor()
+    return pipeline
 
 
 def download_screnario(account: ManagableAccount):
     account_sources = get_account_sources(SOURCES_CONFIG_PATH, account)
 
-    for source in account_sources:
-        _download_content_from_source(source, account)
+    sources_subscribers = get_sources_subscribers()
+    jobs = [
+        _SourceJob(source, account, sources_subscribers.get(source.name))
+        for source in account_sources
+    ]
+    pipeline = _get_download_pipeline()
+    processed_jobs = pipeline.run(jobs)
+    logger.info(
+        f"Download scenario finished for account={account.name} | processed sources={len(processed_jobs)}/{len(jobs)}"
+    )
@@ -7,12 +7,13 @@
 @return: bool - the result of uploading
 """
 
-from configurations.config import CONTENT_TO_UPLOAD_CONFIG_FILENAME, RM_UPLOADED_CONTENT_DEBUG_FLAG
+from configurations.config import (CONTENT_TO_UPLOAD_CONFIG_FILENAME,
+                                   RM_UPLOADED_CONTENT_DEBUG_FLAG)
 
 from src.adaptors.ContentToUploadAdaptor import json_to_ContentToUpload
 from src.ManagableAccount.ManagableAccount import ManagableAccount
 from src.utils.fs_utils import read_json
-from src.utils.helpers import remove_uploaded_content
+from src.utils.helpers import get_config_lock, remove_uploaded_content
 from src.utils.Logger import logger
 
 
@@ -22,8 +23,11 @@ def upload_scenario(account: ManagableAccount) -> bool:
     content_to_upload_config_path = (
         account.get_account_dir_path() + CONTENT_TO_UPLOAD_CONFIG_FILENAME
     )
-    content_to_upload_requests = read_json(content_to_upload_config_path)
-    if len(content_to_upload_requests) == 0:
+    # config is modified by prefetch of the same account,
+    # which may run at the same time.
+    with get_config_lock(content_to_upload_config_path):
+        content_to_upload_requests = read_json(content_to_upload_config_path)
+    if content_to_upload_requests == None or len(content_to_upload_requests) == 0:
         logger.warning(
             f"There is still no content to upload even after downloading account={account.name}"
         )
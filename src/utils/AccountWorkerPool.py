@@ -0,0 +1,132 @@
+"""
+# AccountWorkerPool.py
+# date: 18.10.2026
+# brief: pool of threads, which execute jobs for managable accounts.
+#        Jobs of the same account are executed one by one in order they were submitted,
+#        jobs of different accounts are executed in parallel.
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+from src.ManagableAccount.ManagableAccount import ManagableAccount
+from src.utils.Logger import logger
+
+
+class _AccountJob:
+    def __init__(self, account: ManagableAccount, func: Callable, name: str):
+        self.account = account
+        self.func = func
+        self.name = name
+        self.submitted_at = time.monotonic()
+
+    def __str__(self):
+        return f"AccountJob(name={self.name}, account={self.account.name})"
+
+    def __repr__(self):
+        return f"AccountJob(name={self.name!r}, account={self.account.name!r})"
+
+
+class AccountWorkerPool:
+    def __init__(self, workers: int = 1, name: str = "account-worker"):
+        self.workers = max(1, workers)
+        self.name = name
+        self.__ready_jobs = queue.Queue()  # jobs, which can be started right now
+        self.__lock = threading.Lock()
+        self.__busy_accounts = set()  # accounts, which have running or ready job
+        self.__deferred_jobs = {}  # account key -> jobs waiting for the previous job
+        self.__threads = []
+
+        # statistics for sizing the pool
+        self.__running_jobs = 0
+        self.__finished_jobs = 0
+        self.__total_wait_time = 0.0
+        self.__max_wait_time = 0.0
+
+    @staticmethod
+    def __get_account_key(account: ManagableAccount):
+        return account.get_account_dir_path()
+
+    def start(self):
+        for idx in range(self.workers):
+            thread = threading.Thread(
+                target=self.__worker, name=f"{self.name}-{idx}", daemon=True
+            )
+            thread.start()
+            self.__threads.append(thread)
+        logger.info(f"{self} started")
+
+    def submit(self, account: ManagableAccount, func: Callable, name: str = "job"):
+        # func is called with account as the only argument.
+        job = _AccountJob(account, func, name)
+        key = self.__get_account_key(account)
+        with self.__lock:
+            if key in self.__busy_accounts:
+                # the previous job of this account is not finished yet => wait for it.
+                self.__deferred_jobs.setdefault(key, deque()).append(job)
+            else:
+                self.__busy_accounts.add(key)
+                self.__ready_jobs.put(job)
+        logger.info(f"Submitted {job} | queue_depth={self.get_queue_depth()}")
+
+    def get_queue_depth(self):
+        # number of jobs, which are not started yet.
+        with self.__lock:
+            deferred = sum(len(jobs) for jobs in self.__deferred_jobs.values())
+        return self.__ready_jobs.qsize() + deferred
+
+    def get_stats(self):
+        with self.__lock:
+            finished = self.__finished_jobs
+            avg_wait_time = self.__total_wait_time / finished if finished > 0 else 0.0
+            stats = {
+                "workers": self.workers,
+                "running_jobs": self.__running_jobs,
+                "finished_jobs": finished,
+                "avg_wait_time": avg_wait_time,
+                "max_wait_time": self.__max_wait_time,
+            }
+        stats["queue_depth"] = self.get_queue_depth()
+        return stats
+
+    def __on_job_finished(self, job: _AccountJob):
+        key = self.__get_account_key(job.account)
+        with self.__lock:
+            self.__running_jobs -= 1
+            self.__finished_jobs += 1
+            deferred = self.__deferred_jobs.get(key)
+            if deferred:
+                self.__ready_jobs.put(deferred.popleft())
+                if len(deferred) == 0:
+                    del self.__deferred_jobs[key]
+            else:
+                self.__busy_accounts.discard(key)
+
+    def __worker(self):
+        while True:
+            job = self.__ready_jobs.get()  # Waits for data to become available
+            wait_time = time.monotonic() - job.submitted_at
+            with self.__lock:
+                self.__running_jobs += 1
+                self.__total_wait_time += wait_time
+                self.__max_wait_time = max(self.__max_wait_time, wait_time)
+            logger.info(
+                f"Started {job} | wait_time={wait_time:.2f}s queue_depth={self.get_queue_depth()}"
+            )
+            try:
+                job.func(job.account)
+            except Exception as e:
+                logger.error(f"{job} failed: {e}")
+            finally:
+                self.__on_job_finished(job)
+                self.__ready_jobs.task_done()  # Signal that the task is complete
+            logger.info(f"Finished {job} | stats={self.get_stats()}")
+
+    def __str__(self):
+        return f"AccountWorkerPool(name={self.name}, workers={self.workers})"
+
+    def __repr__(self):
+        return f"AccountWorkerPool(name={self.name!r}, workers={self.workers})"
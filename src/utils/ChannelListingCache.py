@@ -0,0 +1,139 @@
+"""
+# ChannelListingCache.py
+# date: 18.10.2026
+# brief: cache of channel listings (the latest items of channel), keyed by channel url
+#        and content kind (video, live). Listing is kept in memory and on disk, so
+#        repeated definitions within TTL do not list channel again. Expired listing is
+#        still used for refresh: only items newer than the newest seen one are fetched.
+#        Listing can be incomplete (listing was stopped as soon as needed item was
+#        found), then it contains only the newest items of the channel.
+"""
+
+import hashlib
+import os
+import threading
+import time
+
+from configurations.config import (CHANNEL_LISTING_CACHE_PATH,
+                                   CHANNEL_LISTING_CACHE_TTL)
+
+from src.utils.fs_utils import (create_directory_if_not_exist, read_json,
+                                save_json)
+
+
+class ChannelListing:
+    def __init__(
+        self,
+        items,
+        fetched_at: float,
+        newest_publish_date: str = None,
+        is_complete: bool = True,
+    ):
+        # items - [{"title", "url", "publish_date"}, ...] the newest first.
+        # publish dates are stored in iso format.
+        self.items = items
+        self.fetched_at = fetched_at
+        self.newest_publish_date = newest_publish_date
+        self.is_complete = is_complete
+
+    def is_expired(self, ttl: int) -> bool:
+        return time.time() - self.fetched_at > ttl
+
+    def to_dict(self):
+        return {
+            "items": self.items,
+            "fetched_at": self.fetched_at,
+            "newest_publish_date": self.newest_publish_date,
+            "is_complete": self.is_complete,
+        }
+
+    def __str__(self):
+        return f"ChannelListing(items={len(self.items)}, fetched_at={self.fetched_at})"
+
+    def __repr__(self):
+        return (
+            f"ChannelListing(items={self.items!r}, fetched_at={self.fetched_at!r}, "
+            f"newest_publish_date={self.newest_publish_date!r})"
+        )
+
+
+class ChannelListingCache:
+    def __init__(
+        self,
+        cache_path: str = CHANNEL_LISTING_CACHE_PATH,
+        ttl=CHANNEL_LISTING_CACHE_TTL,
+    ):
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.__lock = threading.Lock()
+        self.__listings = {}  # (channel url, kind) -> ChannelListing
+
+    def __get_path(self, channel_url: str, kind: str):
+        key = hashlib.sha1(f"{channel_url}|{kind}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_path, f"{key}.json")
+
+    def get(self, channel_url: str, kind: str) -> ChannelListing:
+        """
+        Returns cached listing (it can be expired, see ChannelListing.is_expired)
+        or None if channel was not listed yet.
+        """
+        key = (channel_url, kind)
+        with self.__lock:
+            listing = self.__listings.get(key)
+        if listing != None:
+            return listing
+
+        data = read_json(self.__get_path(channel_url, kind))
+        if data == None:
+            return None
+        listing = ChannelListing(
+            data.get("items", []),
+            data.get("fetched_at", 0),
+            data.get("newest_publish_date"),
+            data.get("is_complete", True),
+        )
+        with self.__lock:
+            self.__listings.setdefault(key, listing)
+        return listing
+
+    def get_fresh(self, channel_url: str, kind: str) -> ChannelListing:
+        # returns listing only if it is not expired.
+        listing = self.get(channel_url, kind)
+        if listing == None or listing.is_expired(self.ttl):
+            return None
+        return listing
+
+    def put(
+        self,
+        channel_url: str,
+        kind: str,
+        items,
+        is_complete: bool = True,
+        fetched_at: float = None,
+    ):
+        # fetched_at - time, when listing was started, None - now.
+        dates = [item["publish_date"] for item in items if item["publish_date"] != None]
+        listing = ChannelListing(
+            items,
+            fetched_at if fetched_at != None else time.time(),
+            max(dates) if dates else None,
+            is_complete,
+        )
+        with self.__lock:
+            self.__listings[(channel_url, kind)] = listing
+
+        create_directory_if_not_exist(self.cache_path)
+        path = self.__get_path(channel_url, kind)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        if save_json(listing.to_dict(), tmp_path):
+            os.replace(tmp_path, path)
+        return listing
+
+    def __str__(self):
+        return f"ChannelListingCache(cache_path={self.cache_path}, ttl={self.ttl})"
+
+    def __repr__(self):
+        return f"ChannelListingCache(cache_path={self.cache_path!r}, ttl={self.ttl!r})"
+
+
+channel_listing_cache = ChannelListingCache()
@@ -0,0 +1,114 @@
+"""
+# ContentPrefetcher.py
+# date: 18.10.2026
+# brief: background prefetcher, which watches backlog of ready content of every account
+#        (contentToUploadConfig.json) and starts producing new content as soon as
+#        backlog drops below account`s low watermark. So scheduled uploads only take
+#        already prepared content and never wait for download.
+"""
+
+import threading
+import time
+from typing import Callable, List
+
+from src.ManagableAccount.ManagableAccount import ManagableAccount
+from src.utils.AccountWorkerPool import AccountWorkerPool
+from src.utils.helpers import get_content_to_upload_count
+from src.utils.Logger import logger
+from src.utils.NetworkGovernor import PRIORITY_LOW, network_governor
+
+
+class ContentPrefetcher:
+    def __init__(
+        self,
+        managable_accounts: List[ManagableAccount],
+        produce_content: Callable,
+        workers: int = 1,
+        check_interval: int = 300,
+        retry_interval: int = 3600,
+    ):
+        # produce_content - function, which takes account and prepares new content for it.
+        # check_interval - how often (in seconds) backlogs are checked without wakeup.
+        # retry_interval - pause for account, which got no new content on the last prefetch.
+        self.managable_accounts = managable_accounts
+        self.produce_content = produce_content
+        self.check_interval = check_interval
+        self.retry_interval = retry_interval
+        self.__pool = AccountWorkerPool(workers, name="prefetch-worker")
+        self.__lock = threading.Lock()
+        self.__in_progress = set()
+        self.__retry_after = {}  # account key -> monotonic time
+        self.__wakeup_event = threading.Event()
+
+    @staticmethod
+    def __get_account_key(account: ManagableAccount):
+        return account.get_account_dir_path()
+
+    def start(self):
+        self.__pool.start()
+        thread = threading.Thread(
+            target=self.__run, name="content-prefetcher", daemon=True
+        )
+        thread.start()
+        logger.info(f"{self} started")
+
+    def wakeup(self):
+        # called when content was consumed, so backlog should be checked right now.
+        self.__wakeup_event.set()
+
+    def __run(self):
+        while True:
+            self.__check_backlogs()
+            self.__wakeup_event.wait(self.check_interval)
+            self.__wakeup_event.clear()
+
+    def __check_backlogs(self):
+        now = time.monotonic()
+        for account in self.managable_accounts:
+            key = self.__get_account_key(account)
+            with self.__lock:
+                if key in self.__in_progress or self.__retry_after.get(key, 0) > now:
+                    continue
+
+            backlog = get_content_to_upload_count(account)
+            low_watermark = account.get_low_watermark()
+            if backlog >= low_watermark:
+                continue
+
+            logger.info(
+                f"Prefetch: backlog of account={account.name} is {backlog} < low_watermark={low_watermark} => prefetching content"
+            )
+            with self.__lock:
+                self.__in_progress.add(key)
+            self.__pool.submit(account, self.__prefetch, name="prefetch")
+
+    def __prefetch(self, account: ManagableAccount):
+        key = self.__get_account_key(account)
+        backlog_before = get_content_to_upload_count(account)
+        try:
+            # prefetch is background traffic => uploads and urgent downloads go first.
+            with network_governor.priority(PRIORITY_LOW):
+                self.produce_content(account)
+        finally:
+            backlog_after = get_content_to_upload_count(account)
+            logger.info(
+                f"Prefetch: account={account.name} backlog {backlog_before} -> {backlog_after}"
+            )
+            with self.__lock:
+                self.__in_progress.discard(key)
+                if backlog_after <= backlog_before:
+                    # no new content in sources => do not ask them again too soon.
+                    self.__retry_after[key] = time.monotonic() + self.retry_interval
+                else:
+                    self.__retry_after.pop(key, None)
+            # backlog may still be below watermark => check it again.
+            self.wakeup()
+
+    def get_stats(self):
+        return self.__pool.get_stats()
+
+    def __str__(self):
+        return f"ContentPrefetcher(accounts={len(self.managable_accounts)})"
+
+    def __repr__(self):
+        return f"ContentPrefetcher(accounts={len(self.managable_accounts)!r})"
@@ -0,0 +1,85 @@
+"""
+# DiskUsageMonitor.py
+# date: 18.10.2026
+# brief: measures peak disk usage of directory and elapsed time of operation.
+#        Size of directory (allocated blocks of all files in it) is sampled in background
+#        thread, so preallocated sparse files are counted only by written data.
+#
+# usage:
+#        with DiskUsageMonitor(checkpoint_path) as monitor:
+#            download(...)
+#        logger.info(monitor.get_summary())
+"""
+
+import os
+import threading
+import time
+
+MB = 1024 * 1024
+
+
+def get_directory_disk_usage(path: str) -> int:
+    # bytes allocated by files in directory (recursively).
+    usage = 0
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        usage += get_directory_disk_usage(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        usage += entry.stat(follow_symlinks=False).st_blocks * 512
+                except FileNotFoundError:
+                    continue  # file was removed while directory is scanned.
+    except FileNotFoundError:
+        pass
+    return usage
+
+
+class DiskUsageMonitor:
+    def __init__(self, path: str, interval: float = 0.5):
+        self.path = path
+        self.interval = interval
+        self.peak_bytes = 0
+        self.started_at = None
+        self.elapsed = None
+        self.__stop_event = threading.Event()
+        self.__thread = None
+
+    def __sample(self):
+        self.peak_bytes = max(self.peak_bytes, get_directory_disk_usage(self.path))
+
+    def __run(self):
+        while self.__stop_event.wait(self.interval) == False:
+            self.__sample()
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self.__sample()
+        self.__thread = threading.Thread(
+            target=self.__run, name="disk-usage-monitor", daemon=True
+        )
+        self.__thread.start()
+
+    def stop(self):
+        self.__stop_event.set()
+        self.__thread.join()
+        self.__sample()
+        self.elapsed = time.perf_counter() - self.started_at
+
+    def get_summary(self) -> str:
+        return f"elapsed={self.elapsed:.1f}s peak_disk={self.peak_bytes / MB:.1f}MB"
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+    def __str__(self):
+        return f"DiskUsageMonitor(path={self.path}, peak_bytes={self.peak_bytes})"
+
+    def __repr__(self):
+        return f"DiskUsageMonitor(path={self.path!r}, interval={self.interval!r})"
@@ -0,0 +1,142 @@
+"""
+# DownloadedContentStore.py
+# date: 18.10.2026
+# brief: indexed store of content, which was already downloaded for managable accounts.
+#        Stored in SQLite table with primary key (account, url), so membership check is
+#        an index lookup and adding url is a single insert committed through write-ahead
+#        log (crash-safe). Old per-account JSON caches (downloadedContentCache.json) are
+#        migrated into the store on the first access to the account.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+from configurations.config import (CACHE_DIR_NAME,
+                                   DOWNLOADED_CONTENT_CACHE_PATH,
+                                   DOWNLOADED_CONTENT_DB_PATH)
+
+from src.ManagableAccount.ManagableAccount import ManagableAccount
+from src.utils.fs_utils import create_directory_if_not_exist, read_json
+from src.utils.Logger import logger
+
+# seconds to wait for the lock of database, which is held by another connection.
+DB_BUSY_TIMEOUT = 30
+
+
+class DownloadedContentStore:
+    def __init__(self, db_path: str = DOWNLOADED_CONTENT_DB_PATH):
+        self.db_path = db_path
+        self.__local = threading.local()  # connection per thread
+        self.__migration_lock = threading.Lock()
+        self.__migrated_accounts = set()
+
+    def __get_connection(self) -> sqlite3.Connection:
+        connection = getattr(self.__local, "connection", None)
+        if connection == None:
+            create_directory_if_not_exist(os.path.dirname(self.db_path) or ".")
+            connection = sqlite3.connect(self.db_path, timeout=DB_BUSY_TIMEOUT)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS downloaded_content ("
+                "account TEXT NOT NULL, url TEXT NOT NULL, downloaded_at REAL NOT NULL, "
+                "PRIMARY KEY (account, url)) WITHOUT ROWID"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS migrated_accounts (account TEXT PRIMARY KEY)"
+            )
+            connection.commit()
+            self.__local.connection = connection
+        return connection
+
+    @staticmethod
+    def __get_account_key(account: ManagableAccount) -> str:
+        return os.path.normpath(account.get_account_dir_path())
+
+    @staticmethod
+    def __get_json_cache_path(account: ManagableAccount) -> str:
+        return f"{account.get_account_dir_path()}/{CACHE_DIR_NAME}/{DOWNLOADED_CONTENT_CACHE_PATH}"
+
+    def __migrate_json_cache(self, account: ManagableAccount, account_key: str):
+        # imports urls from old JSON cache of the account only once.
+        with self.__migration_lock:
+            if account_key in self.__migrated_accounts:
+                return
+            connection = self.__get_connection()
+            is_migrated = connection.execute(
+                "SELECT 1 FROM migrated_accounts WHERE account = ?", (account_key,)
+            ).fetchone()
+            if is_migrated == None:
+                json_cache_path = self.__get_json_cache_path(account)
+                urls = read_json(json_cache_path)
+                urls = urls if isinstance(urls, list) else []
+                now = time.time()
+                with connection:
+                    connection.executemany(
+                        "INSERT OR IGNORE INTO downloaded_content VALUES (?, ?, ?)",
+                        [(account_key, url, now) for url in urls],
+                    )
+                    connection.execute(
+                        "INSERT INTO migrated_accounts VALUES (?)", (account_key,)
+                    )
+                if len(urls) > 0:
+                    logger.info(
+                        f"Migrated {len(urls)} downloaded content urls of account={account.name} from {json_cache_path}"
+                    )
+            self.__migrated_accounts.add(account_key)
+
+    def __get_migrated_account_key(self, account: ManagableAccount) -> str:
+        account_key = self.__get_account_key(account)
+        if account_key not in self.__migrated_accounts:
+            self.__migrate_json_cache(account, account_key)
+        return account_key
+
+    def is_downloaded(self, account: ManagableAccount, url: str) -> bool:
+        account_key = self.__get_migrated_account_key(account)
+        row = (
+            self.__get_connection()
+            .execute(
+                "SELECT 1 FROM downloaded_content WHERE account = ? AND url = ?",
+                (account_key, url),
+            )
+            .fetchone()
+        )
+        return row != None
+
+    def add(self, account: ManagableAccount, url: str) -> bool:
+        try:
+            account_key = self.__get_migrated_account_key(account)
+            connection = self.__get_connection()
+            with connection:
+                connection.execute(
+                    "INSERT OR IGNORE INTO downloaded_content VALUES (?, ?, ?)",
+                    (account_key, url, time.time()),
+                )
+            return True
+        except Exception as e:
+            logger.error(
+                f"Failed to save downloaded content url={url} account={account.name}: {e}"
+            )
+        return False
+
+    def get_downloaded_count(self, account: ManagableAccount) -> int:
+        account_key = self.__get_migrated_account_key(account)
+        return (
+            self.__get_connection()
+            .execute(
+                "SELECT COUNT(*) FROM downloaded_content WHERE account = ?",
+                (account_key,),
+            )
+            .fetchone()[0]
+        )
+
+    def __str__(self):
+        return f"DownloadedContentStore(db_path={self.db_path})"
+
+    def __repr__(self):
+        return f"DownloadedContentStore(db_path={self.db_path!r})"
+
+
+downloaded_content_store = DownloadedContentStore()
@@ -0,0 +1,181 @@
+"""
+# HeapScheduler.py
+# date: 18.10.2026
+# brief: scheduler, which keeps jobs in min-heap ordered by the next fire time and
+#        sleeps exactly until the next due job.
+#        The last fire time of each job is saved into state file, so slots, which were
+#        missed while application was not running, can be caught up on the next start.
+"""
+
+import heapq
+import itertools
+import threading
+from datetime import datetime, timedelta
+from typing import Callable
+
+from src.utils.fs_utils import read_json, save_json
+from src.utils.Logger import logger
+
+# policies for slots, which were missed while application was not running.
+MISSED_SLOTS_SKIP = "skip"  # do not run missed slots
+MISSED_SLOTS_RUN_ONCE = "run_once"  # run job once for all missed slots
+MISSED_SLOTS_RUN_ALL = "run_all"  # run job for every missed slot
+
+# sleep is limited, so wall clock changes (suspend, time sync) are noticed.
+MAX_SLEEP_SECONDS = 3600
+
+
+class _ScheduledJob:
+    def __init__(self, name, every_days, at_time, func, args):
+        self.name = name
+        self.every_days = every_days
+        self.at_time = at_time
+        self.func = func
+        self.args = args
+
+    def get_slot(self, day: datetime):
+        return day.replace(
+            hour=self.at_time.hour,
+            minute=self.at_time.minute,
+            second=self.at_time.second,
+            microsecond=0,
+        )
+
+    def __str__(self):
+        return f"ScheduledJob(name={self.name}, every_days={self.every_days})"
+
+    def __repr__(self):
+        return f"ScheduledJob(name={self.name!r}, every_days={self.every_days})"
+
+
+class HeapScheduler:
+    def __init__(self, state_path: str = None, missed_slots_policy=MISSED_SLOTS_SKIP):
+        self.state_path = state_path
+        self.missed_slots_policy = missed_slots_policy
+        self.__heap = []  # (fire_time, seq, job)
+        self.__seq = itertools.count()  # keeps heap order stable for equal fire times
+        self.__condition = threading.Condition()
+        self.__stopped = False
+        self.__state = {}
+        if state_path != None:
+            self.__state = read_json(state_path) or {}
+
+    @staticmethod
+    def __parse_time(at_time: str):
+        for time_format in ("%H:%M", "%H:%M:%S"):
+            try:
+                return datetime.strptime(at_time, time_format).time()
+            except ValueError:
+                pass
+        return None
+
+    def __get_last_fire_time(self, job: _ScheduledJob):
+        last_fire_time = self.__state.get(job.name)
+        if last_fire_time == None:
+            return None
+        try:
+            return datetime.fromisoformat(last_fire_time)
+        except ValueError:
+            return None
+
+    def __save_fire_time(self, job: _ScheduledJob, fire_time: datetime):
+        self.__state[job.name] = fire_time.isoformat()
+        if self.state_path != None:
+            save_json(self.__state, self.state_path)
+
+    def __get_first_fire_time(self, job: _ScheduledJob, now: datetime):
+        # returns fire time of the first slot and number of missed slots before it.
+        last_fire_time = self.__get_last_fire_time(job)
+        if last_fire_time == None:
+            fire_time = job.get_slot(now)
+            if fire_time <= now:
+                fire_time += timedelta(days=1)
+            return fire_time, 0
+
+        period = timedelta(days=job.every_days)
+        fire_time = job.get_slot(last_fire_time) + period
+        missed_slots = 0
+        if fire_time <= now:
+            missed_slots = (now - fire_time) // period + 1
+            fire_time += period * missed_slots
+        return fire_time, missed_slots
+
+    def __push(self, fire_time: datetime, job: _ScheduledJob):
+        heapq.heappush(self.__heap, (fire_time, next(self.__seq), job))
+
+    def __run_job(self, job: _ScheduledJob):
+        try:
+            job.func(*job.args)
+        except Exception as e:
+            logger.error(f"Scheduler: {job} failed: {e}")
+
+    def add_job(self, name: str, every_days: int, at_time: str, func: Callable, *args):
+        # name - unique name of the job, used as a key in state file.
+        # at_time - time of the day in format hh:mm
+        parsed_time = self.__parse_time(at_time)
+        if parsed_time == None:
+            logger.error(f"Scheduler: invalid time={at_time} for job={name}")
+            return False
+        job = _ScheduledJob(name, max(1, every_days or 1), parsed_time, func, args)
+
+        now = datetime.now()
+        fire_time, missed_slots = self.__get_first_fire_time(job, now)
+        if missed_slots > 0:
+            logger.info(
+                f"Scheduler: {job} missed {missed_slots} slots | policy={self.missed_slots_policy}"
+            )
+            if self.missed_slots_policy == MISSED_SLOTS_RUN_ONCE:
+                missed_slots = 1
+            elif self.missed_slots_policy != MISSED_SLOTS_RUN_ALL:
+                missed_slots = 0
+            for _ in range(missed_slots):
+                self.__run_job(job)
+            self.__save_fire_time(job, fire_time - timedelta(days=job.every_days))
+
+        with self.__condition:
+            self.__push(fire_time, job)
+            self.__condition.notify()
+        logger.info(f"Scheduler: {job} next fire time={fire_time}")
+        return True
+
+    def get_jobs_count(self):
+        with self.__condition:
+            return len(self.__heap)
+
+    def stop(self):
+        with self.__condition:
+            self.__stopped = True
+            self.__condition.notify()
+
+    def run_forever(self):
+        logger.info(f"Scheduler started with {self.get_jobs_count()} jobs")
+        while True:
+            with self.__condition:
+                if self.__stopped:
+                    break
+                if len(self.__heap) == 0:
+                    self.__condition.wait()
+                    continue
+                fire_time, _, job = self.__heap[0]
+                delay = (fire_time - datetime.now()).total_seconds()
+                if delay > 0:
+                    self.__condition.wait(min(delay, MAX_SLEEP_SECONDS))
+                    continue
+                heapq.heappop(self.__heap)
+
+                # slots, which passed while job was waiting (e.g. system was suspended), are skipped.
+                period = timedelta(days=job.every_days)
+                next_fire_time = fire_time + period
+                while next_fire_time <= datetime.now():
+                    next_fire_time += period
+                self.__push(next_fire_time, job)
+
+            self.__run_job(job)
+            self.__save_fire_time(job, fire_time)
+        logger.info("Scheduler stopped")
+
+    def __str__(self):
+        return f"HeapScheduler(jobs={self.get_jobs_count()}, missed_slots_policy={self.missed_slots_policy})"
+
+    def __repr__(self):
+        return f"HeapScheduler(jobs={self.get_jobs_count()}, missed_slots_policy={self.missed_slots_policy!r})"
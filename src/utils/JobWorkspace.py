@@ -0,0 +1,73 @@
+"""
+# JobWorkspace.py
+# date: 18.10.2026
+# brief: job-scoped scratch directory.
+#        Every job (download, extraction, filter, browser launch) gets its own unique
+#        directory under JOB_WORKSPACES_PATH, so jobs running at the same time do not
+#        overwrite files of each other. Directory is removed when job is finished,
+#        no matter if it succeeded or failed.
+#
+# usage:
+#        with JobWorkspace("filter") as workspace:
+#            subtitles_path = workspace.get_path("subtitles.srt")
+"""
+
+import os
+import re
+import uuid
+
+from configurations.config import JOB_WORKSPACES_PATH
+
+from src.utils.fs_utils import create_directory_if_not_exist, remove_directory
+from src.utils.Logger import logger
+
+
+class JobWorkspace:
+    def __init__(self, name: str = "job", root: str = JOB_WORKSPACES_PATH):
+        # name is only a readable prefix, uniqueness is provided by uuid.
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", name)[:50]
+        self.path = os.path.join(root, f"{safe_name}_{uuid.uuid4().hex}")
+        self.is_created = False
+
+    def create(self) -> str:
+        if self.is_created == False:
+            if create_directory_if_not_exist(self.path) == False:
+                raise OSError(f"Failed to create job workspace: {self.path}")
+            self.is_created = True
+        return self.path
+
+    def get_path(self, *parts: str) -> str:
+        # returns path of file inside workspace.
+        return os.path.join(self.create(), *parts)
+
+    def get_subdir(self, name: str) -> str:
+        # returns path of directory inside workspace, directory is created.
+        path = self.get_path(name)
+        if create_directory_if_not_exist(path) == False:
+            raise OSError(f"Failed to create directory in job workspace: {path}")
+        return path
+
+    def remove(self) -> bool:
+        # directory could be created by copy of workspace in another process,
+        # so it is checked on disk instead of is_created.
+        self.is_created = False
+        if os.path.isdir(self.path) == False:
+            return False
+        res = remove_directory(self.path)
+        if res == False:
+            logger.warning(f"Failed to remove job workspace: {self.path}")
+        return res
+
+    def __enter__(self):
+        self.create()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.remove()
+        return False
+
+    def __str__(self):
+        return f"JobWorkspace(path={self.path})"
+
+    def __repr__(self):
+        return f"JobWorkspace(path={self.path!r}, is_created={self.is_created!r})"
@@ -0,0 +1,331 @@
+"""
+# MediaStore.py
+# date: 18.10.2026
+# brief: content-addressed store of raw and intermediate media (downloaded streams,
+#        muxed videos). Media is looked up by key (source url + stream itag, see
+#        get_media_key) and stored once by sha256 of its data, so re-runs, other
+#        accounts and other extractors reuse already downloaded media instead of
+#        downloading it again.
+#        - materialize: media is hard-linked (or reflinked, or copied if both are not
+#          possible) into job directory. Stored files are read-only, so job can not
+#          modify shared data in place.
+#        - verification: size and mtime of stored file are checked on every reuse, its
+#          sha256 is computed again only if they changed (or always, verify_on_read).
+#        - references: job (holder), which materialized media, references it until
+#          release(holder). Referenced media is never evicted. References of dead
+#          processes are dropped.
+#        - garbage collection: when total size exceeds max_size, not referenced media
+#          is evicted, the least recently used first.
+#        Index is kept in SQLite, so store is shared between threads and processes.
+"""
+
+import fcntl
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+import time
+
+from configurations.config import (MEDIA_STORE_MAX_SIZE_GB, MEDIA_STORE_PATH,
+                                   MEDIA_STORE_VERIFY_ON_READ)
+
+from src.utils.fs_utils import create_directory_if_not_exist, remove_file
+from src.utils.Logger import logger
+
+GB = 1024 * 1024 * 1024
+HASH_BLOCK_SIZE = 1024 * 1024
+DB_BUSY_TIMEOUT = 30
+FICLONE = 0x40049409  # linux ioctl, which clones file data (reflink)
+
+
+def get_media_key(url: str, itag) -> str:
+    # itag - identifier of the stream or description of intermediate media
+    # (f.e. "137+140").
+    return f"{url}#{itag}"
+
+
+def get_file_sha256(path: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b""):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
+def _is_process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+
+def _reflink(src: str, dst: str):
+    with open(src, "rb") as src_file, open(dst, "wb") as dst_file:
+        fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+
+
+class MediaStore:
+    def __init__(
+        self,
+        store_path: str = MEDIA_STORE_PATH,
+        max_size: int = int(MEDIA_STORE_MAX_SIZE_GB * GB),
+        verify_on_read: bool = MEDIA_STORE_VERIFY_ON_READ,
+    ):
+        self.store_path = store_path
+        self.max_size = max_size
+        self.verify_on_read = verify_on_read
+        self.__local = threading.local()  # connection per thread
+
+    def __get_connection(self) -> sqlite3.Connection:
+        connection = getattr(self.__local, "connection", None)
+        if connection == None:
+            create_directory_if_not_exist(self.__get_objects_path())
+            connection = sqlite3.connect(
+                os.path.join(self.store_path, "index.sqlite3"),
+                timeout=DB_BUSY_TIMEOUT,
+                isolation_level=None,  # transactions are started explicitly
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS media ("
+                "key TEXT PRIMARY KEY, sha256 TEXT NOT NULL, size INTEGER NOT NULL, "
+                "last_used_at REAL NOT NULL)"
+            )
+            columns = [row[1] for row in connection.execute("PRAGMA table_info(media)")]
+            if "mtime_ns" not in columns:
+                # mtime of stored file, NULL => file is hashed on the next reuse.
+                connection.execute("ALTER TABLE media ADD COLUMN mtime_ns INTEGER")
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS media_sha256 ON media(sha256)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS refs ("
+                "key TEXT NOT NULL, holder TEXT NOT NULL, pid INTEGER NOT NULL, "
+                "PRIMARY KEY (key, holder))"
+            )
+            self.__local.connection = connection
+        return connection
+
+    def __get_objects_path(self) -> str:
+        return os.path.join(self.store_path, "objects")
+
+    def __get_object_path(self, sha256: str) -> str:
+        return os.path.join(self.__get_objects_path(), sha256)
+
+    def __link(self, src: str, dst: str) -> str:
+        # returns used method.
+        remove_file(dst)
+        try:
+            os.link(src, dst)
+            return "hardlink"
+        except OSError:
+            pass
+        try:
+            _reflink(src, dst)
+            return "reflink"
+        except OSError:
+            remove_file(dst)
+        shutil.copyfile(src, dst)
+        return "copy"
+
+    def __remove_entry(self, connection: sqlite3.Connection, key: str):
+        connection.execute("DELETE FROM media WHERE key = ?", (key,))
+        connection.execute("DELETE FROM refs WHERE key = ?", (key,))
+
+    def __remove_orphan_objects(self, connection: sqlite3.Connection, hashes):
+        # must be called inside transaction, which removed entries of hashes.
+        # Object is removed only if no entry points to it.
+        for sha256 in set(hashes):
+            row = connection.execute(
+                "SELECT 1 FROM media WHERE sha256 = ?", (sha256,)
+            ).fetchone()
+            if row == None:
+                remove_file(self.__get_object_path(sha256))
+
+    def materialize(self, key: str, destination: str, holder: str) -> bool:
+        """
+        Places media of key at destination path and references it by holder.
+
+        Returns:
+        - bool: False if there is no valid media for key in store.
+        """
+        connection = self.__get_connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT sha256, size, mtime_ns FROM media WHERE key = ?", (key,)
+            ).fetchone()
+            if row != None:
+                connection.execute(
+                    "INSERT OR REPLACE INTO refs VALUES (?, ?, ?)",
+                    (key, holder, os.getpid()),
+                )
+                connection.execute(
+                    "UPDATE media SET last_used_at = ? WHERE key = ?",
+                    (time.time(), key),
+                )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        if row == None:
+            return False
+
+        # media is referenced => it can not be evicted while it is linked.
+        sha256, size, mtime_ns = row
+        object_path = self.__get_object_path(sha256)
+        is_valid = self.__verify(key, object_path, sha256, size, mtime_ns)
+        if is_valid == False:
+            logger.warning(f"MediaStore: media of {key} is corrupted => removing it")
+            self.__invalidate(key, sha256)
+            return False
+
+        method = self.__link(object_path, destination)
+        logger.info(
+            f"MediaStore: reused {key} ({size / GB:.2f}GB) | "
+            f"{method} into {destination}"
+        )
+        return True
+
+    def __verify(self, key: str, object_path: str, sha256: str, size: int, mtime_ns):
+        # hashing of multi-GB media costs as much I/O as its download,
+        # so file is hashed only if it could be changed since it was stored.
+        try:
+            stat = os.stat(object_path)
+        except OSError:
+            return False
+        if stat.st_size != size:
+            return False
+        if self.verify_on_read == False and stat.st_mtime_ns == mtime_ns:
+            return True
+        if get_file_sha256(object_path) != sha256:
+            return False
+        self.__get_connection().execute(
+            "UPDATE media SET mtime_ns = ? WHERE key = ?", (stat.st_mtime_ns, key)
+        )
+        return True
+
+    def __invalidate(self, key: str, sha256: str):
+        connection = self.__get_connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            self.__remove_entry(connection, key)
+            self.__remove_orphan_objects(connection, [sha256])
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def put(self, key: str, path: str, holder: str = None) -> bool:
+        """
+        Moves file at path into store as media of key.
+        File with the same data is stored only once.
+
+        Parameters:
+        - holder (str): if given, media is referenced by holder, so it is not evicted
+                        before holder materializes it.
+        """
+        try:
+            sha256 = get_file_sha256(path)
+            size = os.path.getsize(path)
+            object_path = self.__get_object_path(sha256)
+            connection = self.__get_connection()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                if os.path.isfile(object_path):
+                    remove_file(path)  # the same data is already stored.
+                else:
+                    os.replace(path, object_path)
+                    os.chmod(object_path, 0o444)
+                mtime_ns = os.stat(object_path).st_mtime_ns
+                connection.execute(
+                    "INSERT OR REPLACE INTO media "
+                    "(key, sha256, size, last_used_at, mtime_ns) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, sha256, size, time.time(), mtime_ns),
+                )
+                if holder != None:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO refs VALUES (?, ?, ?)",
+                        (key, holder, os.getpid()),
+                    )
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+            logger.info(f"MediaStore: stored {key} ({size / GB:.2f}GB) sha256={sha256}")
+        except Exception as e:
+            logger.error(f"MediaStore: failed to store {key} from {path}: {e}")
+            return False
+        self.collect_garbage()
+        return True
+
+    def release(self, holder: str):
+        # holder does not need its media anymore => it can be evicted.
+        connection = self.__get_connection()
+        connection.execute("DELETE FROM refs WHERE holder = ?", (holder,))
+
+    def get_total_size(self) -> int:
+        row = (
+            self.__get_connection()
+            .execute(
+                "SELECT COALESCE(SUM(size), 0) "
+                "FROM (SELECT DISTINCT sha256, size FROM media)"
+            )
+            .fetchone()
+        )
+        return row[0]
+
+    def collect_garbage(self):
+        # evicts not referenced media, the least recently used first,
+        # until store fits max_size.
+        connection = self.__get_connection()
+        connection.execute("BEGIN IMMEDIATE")
+        removed_hashes = []
+        try:
+            # references of processes, which died without release.
+            for key, holder, pid in connection.execute(
+                "SELECT key, holder, pid FROM refs"
+            ).fetchall():
+                if _is_process_alive(pid) == False:
+                    connection.execute(
+                        "DELETE FROM refs WHERE key = ? AND holder = ?", (key, holder)
+                    )
+
+            total_size = self.get_total_size()
+            candidates = connection.execute(
+                "SELECT key, sha256, size FROM media "
+                "WHERE key NOT IN (SELECT key FROM refs) ORDER BY last_used_at"
+            ).fetchall()
+            for key, sha256, size in candidates:
+                if total_size <= self.max_size:
+                    break
+                self.__remove_entry(connection, key)
+                removed_hashes.append(sha256)
+                shared = connection.execute(
+                    "SELECT 1 FROM media WHERE sha256 = ?", (sha256,)
+                ).fetchone()
+                if shared == None:
+                    total_size -= size
+                logger.info(f"MediaStore: evicted {key} ({size / GB:.2f}GB)")
+            self.__remove_orphan_objects(connection, removed_hashes)
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def __str__(self):
+        return f"MediaStore(store_path={self.store_path}, max_size={self.max_size})"
+
+    def __repr__(self):
+        return (
+            f"MediaStore(store_path={self.store_path!r}, max_size={self.max_size!r}, "
+            f"verify_on_read={self.verify_on_read!r})"
+        )
+
+
+media_store = MediaStore()
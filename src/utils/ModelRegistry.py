@@ -0,0 +1,186 @@
+"""
+# ModelRegistry.py
+# date: 18.10.2026
+# brief: process-wide registry of ML models (whisper, sentiment pipeline, etc.).
+#        Models are keyed by (family, size, device, dtype), loaded lazily on the first
+#        request and shared between all extractors and filters. Models, which are not used
+#        right now, stay in memory until total size of loaded models exceeds memory budget,
+#        then the least recently used of them are evicted.
+"""
+
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable
+
+from configurations.config import MODEL_REGISTRY_MEMORY_BUDGET_MB
+
+from src.utils.Logger import logger
+
+
+class _ModelEntry:
+    def __init__(self, key):
+        self.key = key
+        self.model = None
+        self.size = 0  # bytes
+        self.refcount = 0
+        self.load_lock = threading.Lock()  # model is loaded only once
+
+
+class ModelRegistry:
+    def __init__(self, memory_budget_mb: int):
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+        self.__lock = threading.Lock()
+        # key -> _ModelEntry, the last one is the most recently used
+        self.__entries = OrderedDict()
+
+    @staticmethod
+    def __estimate_model_size(model):
+        # torch modules => size of parameters and buffers.
+        # transformers pipelines keep torch module in model attribute.
+        module = getattr(model, "model", model)
+        try:
+            tensors = list(module.parameters()) + list(module.buffers())
+            return sum(t.numel() * t.element_size() for t in tensors)
+        except Exception:
+            return 0
+
+    def __get_loaded_size(self):
+        return sum(entry.size for entry in self.__entries.values())
+
+    def __evict_idle_models(self):
+        # should be called under self.__lock
+        for key in list(self.__entries.keys()):
+            if self.__get_loaded_size() <= self.memory_budget:
+                break
+            entry = self.__entries[key]
+            if entry.refcount == 0 and entry.model != None:
+                logger.info(
+                    f"ModelRegistry: evicting model={key} size={entry.size // (1024 * 1024)}MB"
+                )
+                del self.__entries[key]
+
+    def acquire(
+        self, family: str, size: str, device: str, dtype: str, loader: Callable
+    ):
+        # returns model and increments its reference counter.
+        # loader - function without arguments, which loads model if it is not loaded yet.
+        key = (family, size, device, dtype)
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry == None:
+                entry = _ModelEntry(key)
+                self.__entries[key] = entry
+            self.__entries.move_to_end(key)
+            entry.refcount += 1
+
+        try:
+            with entry.load_lock:
+                if entry.model == None:
+                    logger.info(f"ModelRegistry: loading model={key}")
+                    model = loader()
+                    entry.size = self.__estimate_model_size(model)
+                    entry.model = model
+                    logger.info(
+                        f"ModelRegistry: loaded model={key} size={entry.size // (1024 * 1024)}MB"
+                    )
+        except Exception:
+            with self.__lock:
+                entry.refcount -= 1
+                if entry.model == None and entry.refcount == 0:
+                    self.__entries.pop(key, None)
+            raise
+
+        with self.__lock:
+            self.__evict_idle_models()
+        return entry.model
+
+    def release(self, family: str, size: str, device: str, dtype: str):
+        key = (family, size, device, dtype)
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry == None or entry.refcount == 0:
+                logger.warning(f"ModelRegistry: release of not acquired model={key}")
+                return
+            entry.refcount -= 1
+            self.__evict_idle_models()
+
+    @contextmanager
+    def use(self, family: str, size: str, device: str, dtype: str, loader: Callable):
+        model = self.acquire(family, size, device, dtype, loader)
+        try:
+            yield model
+        finally:
+            self.release(family, size, device, dtype)
+
+    def get_stats(self):
+        with self.__lock:
+            return {
+                "models": [
+                    {"key": entry.key, "refcount": entry.refcount, "size": entry.size}
+                    for entry in self.__entries.values()
+                ],
+                "loaded_size": self.__get_loaded_size(),
+                "memory_budget": self.memory_budget,
+            }
+
+    def __str__(self):
+        return f"ModelRegistry(models={len(self.__entries)}, memory_budget={self.memory_budget})"
+
+    def __repr__(self):
+        return f"ModelRegistry(models={len(self.__entries)!r}, memory_budget={self.memory_budget!r})"
+
+
+model_registry = ModelRegistry(MODEL_REGISTRY_MEMORY_BUDGET_MB)
+
+
+def get_default_device():
+    import torch
+
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def get_default_dtype(device: str):
+    # whisper runs in fp16 only on gpu.
+    return "fp16" if device == "cuda" else "fp32"
+
+
+def use_whisper_model(size: str, device: str = None):
+    # usage: with use_whisper_model("medium") as model: model.transcribe(...)
+    device = device or get_default_device()
+
+    def loader():
+        import whisper
+
+        return whisper.load_model(size, device=device)
+
+    return model_registry.use(
+        "whisper", size, device, get_default_dtype(device), loader
+    )
+
+
+def use_ct2_whisper_model(size: str, compute_type: str = "int8", cpu_threads: int = 0):
+    # usage: with use_ct2_whisper_model("medium") as model: model.transcribe(...)
+    # whisper converted into CTranslate2 format (faster-whisper),
+    # quantized model runs on cpu.
+    # It is not torch module, so its size is not counted into memory budget.
+    def loader():
+        from faster_whisper import WhisperModel
+
+        return WhisperModel(
+            size, device="cpu", compute_type=compute_type, cpu_threads=cpu_threads
+        )
+
+    return model_registry.use("ct2_whisper", size, "cpu", compute_type, loader)
+
+
+def use_sentiment_pipeline(model_path: str, device: str = None):
+    # usage: with use_sentiment_pipeline(path) as analyzer: analyzer(text)
+    device = device or get_default_device()
+
+    def loader():
+        from transformers import pipeline
+
+        return pipeline("sentiment-analysis", model=model_path, device=device)
+
+    return model_registry.use("sentiment", model_path, device, "fp32", loader)
@@ -0,0 +1,320 @@
+"""
+# NetworkGovernor.py
+# date: 18.10.2026
+# brief: coordinates all network I/O of the process (youtube downloads, channel
+#        listings, uploads through proxies):
+#        - global bandwidth limit: token bucket refilled with max_bytes_per_sec, every
+#          transferred block takes tokens from it;
+#        - concurrency caps: number of simultaneous transfers to one host and through
+#          one proxy;
+#        - priorities: while transfer of higher priority is active (upload for
+#          schedule slot), transfers of background priority (prefetch) are paused. Free
+#          connection slot of host/proxy is given to the waiter of the highest priority.
+#        Priority is taken from the calling thread, see NetworkGovernor.priority.
+#        Worker processes (see StagedPipeline) share governor of the main process:
+#        serve_network_governor in the main process, connect_network_governor in worker.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing.managers import BaseManager
+from urllib.parse import urlparse
+
+from configurations.config import (NETWORK_MAX_BYTES_PER_SEC,
+                                   NETWORK_MAX_CONNECTIONS_PER_HOST,
+                                   NETWORK_MAX_CONNECTIONS_PER_PROXY,
+                                   NETWORK_STATS_LOG_INTERVAL)
+
+from src.utils.Logger import logger
+
+# the lower value, the higher priority.
+PRIORITY_HIGH = 0  # uploads for schedule slots
+PRIORITY_NORMAL = 1  # downloads needed right now
+PRIORITY_LOW = 2  # background prefetch
+
+MB = 1024 * 1024
+
+
+def get_host(url: str) -> str:
+    return urlparse(url).hostname or url
+
+
+class NetworkGovernor:
+    def __init__(
+        self,
+        max_bytes_per_sec: int = NETWORK_MAX_BYTES_PER_SEC,
+        max_connections_per_host: int = NETWORK_MAX_CONNECTIONS_PER_HOST,
+        max_connections_per_proxy: int = NETWORK_MAX_CONNECTIONS_PER_PROXY,
+        stats_log_interval: int = NETWORK_STATS_LOG_INTERVAL,
+    ):
+        # max_bytes_per_sec - 0 means unlimited bandwidth.
+        self.max_bytes_per_sec = max_bytes_per_sec
+        self.max_connections_per_host = max(1, max_connections_per_host)
+        self.max_connections_per_proxy = max(1, max_connections_per_proxy)
+        self.stats_log_interval = stats_log_interval
+        self.__local = threading.local()
+        self.__condition = threading.Condition()
+        self.__remote = None  # governor of the main process, if this is worker process
+
+        # token bucket, one second of traffic can be sent at once.
+        self.__tokens = float(max_bytes_per_sec)
+        self.__refilled_at = time.monotonic()
+
+        self.__active_hosts = {}  # host -> number of active transfers
+        self.__active_proxies = {}  # proxy -> number of active transfers
+        self.__active_priorities = {}  # priority -> number of active transfers
+        self.__waiting = {}  # (priority, host, proxy) -> number of waiting transfers
+
+        # statistics
+        self.__transferred_bytes = {}  # priority -> bytes
+        self.__stats_started_at = time.monotonic()
+        self.__stats_bytes = 0
+        self.__throttled_time = 0.0
+
+    # priority of the calling thread
+    def get_priority(self) -> int:
+        return getattr(self.__local, "priority", PRIORITY_NORMAL)
+
+    @contextmanager
+    def priority(self, priority: int):
+        # all transfers started by the calling thread inside the block get priority.
+        previous = self.get_priority()
+        self.__local.priority = priority
+        try:
+            yield
+        finally:
+            self.__local.priority = previous
+
+    def __resolve_priority(self, priority: int) -> int:
+        return self.get_priority() if priority == None else priority
+
+    def __is_preempted(self, priority: int) -> bool:
+        # must be called under condition.
+        # background transfers wait while transfers of higher priority are active.
+        # If transfer of higher priority waits for connection slot, background transfers
+        # are not paused, so they can finish and free their slots.
+        if priority < PRIORITY_LOW:
+            return False
+        if any(
+            count > 0 and other_priority < priority
+            for (other_priority, _, _), count in self.__waiting.items()
+        ):
+            return False
+        return any(
+            count > 0
+            for other, count in self.__active_priorities.items()
+            if other < priority
+        )
+
+    def __has_higher_waiters(self, host: str, proxy: str, priority: int) -> bool:
+        # waiters of higher priority for the same host or proxy go first.
+        waiting = self.__waiting.items()
+        return any(
+            count > 0
+            and other_priority < priority
+            and (other_host == host or (proxy != None and other_proxy == proxy))
+            for (other_priority, other_host, other_proxy), count in waiting
+        )
+
+    def __can_start(self, host: str, proxy: str, priority: int) -> bool:
+        if self.__active_hosts.get(host, 0) >= self.max_connections_per_host:
+            return False
+        if (
+            proxy != None
+            and self.__active_proxies.get(proxy, 0) >= self.max_connections_per_proxy
+        ):
+            return False
+        if self.__is_preempted(priority):
+            return False
+        return self.__has_higher_waiters(host, proxy, priority) == False
+
+    def start_transfer(self, host: str, proxy: str, priority: int):
+        # takes connection slot of host (and proxy), see transfer.
+        key = (priority, host, proxy)
+        with self.__condition:
+            self.__waiting[key] = self.__waiting.get(key, 0) + 1
+            try:
+                while self.__can_start(host, proxy, priority) == False:
+                    self.__condition.wait()
+            finally:
+                self.__waiting[key] -= 1
+                if self.__waiting[key] == 0:
+                    del self.__waiting[key]
+            self.__active_hosts[host] = self.__active_hosts.get(host, 0) + 1
+            if proxy != None:
+                self.__active_proxies[proxy] = self.__active_proxies.get(proxy, 0) + 1
+            self.__active_priorities[priority] = (
+                self.__active_priorities.get(priority, 0) + 1
+            )
+            self.__condition.notify_all()
+
+    def finish_transfer(self, host: str, proxy: str, priority: int):
+        with self.__condition:
+            self.__active_hosts[host] -= 1
+            if proxy != None:
+                self.__active_proxies[proxy] -= 1
+            self.__active_priorities[priority] -= 1
+            self.__condition.notify_all()
+
+    @contextmanager
+    def transfer(self, host: str, proxy: str = None, priority: int = None):
+        """
+        Holds connection slot of host (and proxy) during the block.
+        Waits while host or proxy has max number of active transfers.
+
+        Parameters:
+        - host (str): host, data is transferred to/from (see get_host).
+        - proxy (str): proxy used for transfer, None - direct connection.
+        - priority (int): PRIORITY_*, None - priority of the calling thread.
+        """
+        priority = self.__resolve_priority(priority)
+        governor = self if self.__remote == None else self.__remote
+        governor.start_transfer(host, proxy, priority)
+        try:
+            yield
+        finally:
+            governor.finish_transfer(host, proxy, priority)
+
+    def __refill(self, now: float):
+        elapsed = now - self.__refilled_at
+        self.__refilled_at = now
+        self.__tokens = min(
+            float(self.max_bytes_per_sec),
+            self.__tokens + elapsed * self.max_bytes_per_sec,
+        )
+
+    def consume(self, nbytes: int, priority: int = None):
+        """
+        Takes nbytes from bandwidth budget, waits until budget allows it.
+        High priority transfers never wait: they take tokens in debt, so the rest
+        of the traffic is slowed down instead.
+        """
+        priority = self.__resolve_priority(priority)
+        if self.__remote != None:
+            self.__remote.consume(nbytes, priority)
+            return
+        started_at = time.monotonic()
+        with self.__condition:
+            while True:
+                now = time.monotonic()
+                if self.max_bytes_per_sec > 0:
+                    self.__refill(now)
+                if self.__is_preempted(priority):
+                    self.__condition.wait()  # notified when transfer is finished
+                    continue
+                if (
+                    self.max_bytes_per_sec <= 0
+                    or priority == PRIORITY_HIGH
+                    or self.__tokens > 0
+                ):
+                    break
+                # wait until bucket has tokens again.
+                self.__condition.wait(-self.__tokens / self.max_bytes_per_sec)
+            if self.max_bytes_per_sec > 0:
+                self.__tokens -= nbytes
+            self.__transferred_bytes[priority] = (
+                self.__transferred_bytes.get(priority, 0) + nbytes
+            )
+            self.__stats_bytes += nbytes
+            self.__throttled_time += now - started_at
+            self.__log_stats_if_needed(now)
+
+    def __log_stats_if_needed(self, now: float):
+        # must be called under condition.
+        if now - self.__stats_started_at < self.stats_log_interval:
+            return
+        logger.info(f"Network utilization: {self.__get_stats(now)}")
+        self.__stats_started_at = now
+        self.__stats_bytes = 0
+        self.__throttled_time = 0.0
+
+    def __get_stats(self, now: float):
+        elapsed = max(now - self.__stats_started_at, 1e-6)
+        throughput = self.__stats_bytes / elapsed
+        return {
+            "throughput_mb_per_sec": round(throughput / MB, 2),
+            "utilization": (
+                round(throughput / self.max_bytes_per_sec, 2)
+                if self.max_bytes_per_sec > 0
+                else None
+            ),
+            "throttled_sec": round(self.__throttled_time, 1),
+            "active_hosts": {k: v for k, v in self.__active_hosts.items() if v > 0},
+            "active_proxies": {k: v for k, v in self.__active_proxies.items() if v > 0},
+            "active_priorities": {
+                k: v for k, v in self.__active_priorities.items() if v > 0
+            },
+            "transferred_mb": {
+                k: round(v / MB, 1) for k, v in self.__transferred_bytes.items()
+            },
+        }
+
+    def get_stats(self):
+        # utilization since the last stats log.
+        if self.__remote != None:
+            return self.__remote.get_stats()
+        with self.__condition:
+            return self.__get_stats(time.monotonic())
+
+    def set_remote(self, remote):
+        # all transfers of this process are governed by remote governor (proxy).
+        self.__remote = remote
+
+    def __str__(self):
+        return f"NetworkGovernor(max_bytes_per_sec={self.max_bytes_per_sec})"
+
+    def __repr__(self):
+        return (
+            f"NetworkGovernor(max_bytes_per_sec={self.max_bytes_per_sec!r}, "
+            f"max_connections_per_host={self.max_connections_per_host!r}, "
+            f"max_connections_per_proxy={self.max_connections_per_proxy!r})"
+        )
+
+
+network_governor = NetworkGovernor()
+
+
+class _NetworkGovernorManager(BaseManager):
+    pass
+
+
+_NetworkGovernorManager.register(
+    "get_network_governor",
+    callable=lambda: network_governor,
+    exposed=("start_transfer", "finish_transfer", "consume", "get_stats"),
+)
+_served_address = None
+_served_address_lock = threading.Lock()
+
+
+def serve_network_governor():
+    """
+    Shares network_governor of this process with worker processes. Server runs in
+    thread of this process, so its own transfers and transfers of workers are
+    governed together.
+
+    Returns:
+    - tuple: (address, authkey) for connect_network_governor.
+    """
+    global _served_address
+    with _served_address_lock:
+        if _served_address == None:
+            authkey = os.urandom(32)
+            manager = _NetworkGovernorManager(address=("127.0.0.1", 0), authkey=authkey)
+            server = manager.get_server()
+            thread = threading.Thread(
+                target=server.serve_forever, name="network-governor", daemon=True
+            )
+            thread.start()
+            _served_address = (server.address, authkey)
+        return _served_address
+
+
+def connect_network_governor(address, authkey: bytes):
+    # initializer of worker process: network I/O of the process is governed by
+    # governor of the main process (see serve_network_governor).
+    manager = _NetworkGovernorManager(address=address, authkey=authkey)
+    manager.connect()
+    network_governor.set_remote(manager.get_network_governor())
@@ -0,0 +1,252 @@
+"""
+# SourceContentRegistry.py
+# date: 18.10.2026
+# brief: global registry of highlights extracted from source content (e.g. youtube video).
+#        Source content, which is subscribed by several accounts, is downloaded and
+#        analyzed only once: the first account claims it, extracts highlights and
+#        registers them; other accounts check out the registered highlights and apply
+#        their own filters. Highlights are hard-linked (copied only if it is not
+#        possible) and read-only, filters replace files instead of modifying them, so
+#        accounts do not affect each other. Entry is removed when every subscribed account
+#        consumed it or when it expires.
+#        Entries are shared between threads and processes, every modification is done
+#        under exclusive file lock (fcntl.flock) of the entry.
+"""
+
+import fcntl
+import hashlib
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from typing import List
+
+from configurations.config import (SOURCE_REGISTRY_CLAIM_TIMEOUT,
+                                   SOURCE_REGISTRY_PATH,
+                                   SOURCE_REGISTRY_TTL_HOURS)
+
+from src.entities.ContentToUpload import ContentToUpload
+from src.entities.MediaFile import MediaFile
+from src.entities.MediaType import MediaType
+from src.utils.fs_utils import (create_directory_if_not_exist, read_json,
+                                remove_directory, save_json)
+from src.utils.Logger import logger
+
+MANIFEST_NAME = "manifest.json"
+
+# results of claim
+CLAIM_READY = "ready"  # highlights are registered, they can be checked out.
+CLAIM_ACQUIRED = "acquired"  # caller has to process content and register highlights.
+CLAIM_BUSY = "busy"  # content is being processed for another account.
+
+STATE_PROCESSING = "processing"
+STATE_READY = "ready"
+
+
+def _link_or_copy(src: str, dst: str):
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _is_process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+
+class SourceContentRegistry:
+    def __init__(
+        self,
+        registry_path: str = SOURCE_REGISTRY_PATH,
+        ttl_hours: float = SOURCE_REGISTRY_TTL_HOURS,
+        claim_timeout: float = SOURCE_REGISTRY_CLAIM_TIMEOUT,
+    ):
+        self.registry_path = registry_path
+        self.ttl_hours = ttl_hours
+        self.claim_timeout = claim_timeout
+
+    def __get_entry_path(self, url: str) -> str:
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.registry_path, key)
+
+    @contextmanager
+    def __lock_entry(self, url: str):
+        create_directory_if_not_exist(self.registry_path)
+        lock_path = f"{self.__get_entry_path(url)}.lock"
+        with open(lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield self.__get_entry_path(url)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def __read_manifest(self, entry_path: str):
+        return read_json(os.path.join(entry_path, MANIFEST_NAME))
+
+    def __write_manifest(self, entry_path: str, manifest) -> bool:
+        path = os.path.join(entry_path, MANIFEST_NAME)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        if save_json(manifest, tmp_path) == False:
+            return False
+        os.replace(tmp_path, path)
+        return True
+
+    def __is_claim_alive(self, manifest) -> bool:
+        if time.time() - manifest.get("claimed_at", 0) > self.claim_timeout:
+            return False
+        return _is_process_alive(manifest.get("owner_pid", -1))
+
+    def __is_expired(self, manifest) -> bool:
+        return time.time() - manifest.get("created_at", 0) > self.ttl_hours * 3600
+
+    def claim(self, url: str, subscribers: List[str]) -> str:
+        """
+        Returns CLAIM_READY, CLAIM_ACQUIRED or CLAIM_BUSY (see constants above).
+
+        Parameters:
+        - subscribers (list): keys of accounts, which are subscribed to the source.
+        """
+        self.collect_garbage()
+        with self.__lock_entry(url) as entry_path:
+            manifest = self.__read_manifest(entry_path)
+            if manifest != None and manifest.get("state") == STATE_READY:
+                return CLAIM_READY
+            if manifest != None and self.__is_claim_alive(manifest):
+                return CLAIM_BUSY
+
+            # nobody processes content or previous owner died => content is ours.
+            remove_directory(entry_path)
+            create_directory_if_not_exist(entry_path)
+            manifest = {
+                "url": url,
+                "state": STATE_PROCESSING,
+                "owner_pid": os.getpid(),
+                "claimed_at": time.time(),
+                "created_at": time.time(),
+                "subscribers": sorted(set(subscribers)),
+                "consumed_by": [],
+                "highlights": [],
+            }
+            self.__write_manifest(entry_path, manifest)
+            return CLAIM_ACQUIRED
+
+    def release(self, url: str):
+        # processing of claimed content failed => other accounts can claim it.
+        with self.__lock_entry(url) as entry_path:
+            manifest = self.__read_manifest(entry_path)
+            if manifest != None and manifest.get("state") == STATE_PROCESSING:
+                remove_directory(entry_path)
+
+    def register(self, url: str, content_to_upload: List[ContentToUpload]) -> bool:
+        # links highlights into registry, so they can be checked out by other accounts.
+        with self.__lock_entry(url) as entry_path:
+            manifest = self.__read_manifest(entry_path)
+            if manifest == None or manifest.get("state") != STATE_PROCESSING:
+                logger.error(f"SourceContentRegistry: content is not claimed: {url}")
+                return False
+            highlights = []
+            for content in content_to_upload:
+                files = []
+                for media_file in content.mediaFiles:
+                    file_name = f"{content.cid}_{os.path.basename(media_file.path)}"
+                    path = os.path.join(entry_path, file_name)
+                    _link_or_copy(media_file.path, path)
+                    os.chmod(path, 0o444)  # shared by all subscribers.
+                    files.append({"name": file_name, "mtype": media_file.mtype.value})
+                highlights.append(
+                    {
+                        "cid": content.cid,
+                        "text": content.text,
+                        "files": files,
+                        "source_segment": content.source_segment,
+                    }
+                )
+            manifest["highlights"] = highlights
+            manifest["state"] = STATE_READY
+            manifest["created_at"] = time.time()
+            res = self.__write_manifest(entry_path, manifest)
+        logger.info(
+            f"SourceContentRegistry: registered {len(highlights)} highlights of {url}"
+        )
+        return res
+
+    def checkout(self, url: str, destination: str) -> List[ContentToUpload]:
+        # returns registered highlights linked into destination or None if there are no.
+        with self.__lock_entry(url) as entry_path:
+            manifest = self.__read_manifest(entry_path)
+            if manifest == None or manifest.get("state") != STATE_READY:
+                return None
+            content_to_upload = []
+            for highlight in manifest["highlights"]:
+                media_files = []
+                for file in highlight["files"]:
+                    path = os.path.join(destination, file["name"])
+                    _link_or_copy(os.path.join(entry_path, file["name"]), path)
+                    media_files.append(MediaFile(path, MediaType(file["mtype"])))
+                content_to_upload.append(
+                    ContentToUpload(
+                        media_files,
+                        highlight["text"],
+                        highlight["cid"],
+                        source_segment=highlight["source_segment"],
+                    )
+                )
+        logger.info(
+            f"SourceContentRegistry: checked out {len(content_to_upload)} highlights of {url}"
+        )
+        return content_to_upload
+
+    def mark_consumed(self, url: str, account_key: str):
+        # entry is removed, when every subscribed account consumed it.
+        with self.__lock_entry(url) as entry_path:
+            manifest = self.__read_manifest(entry_path)
+            if manifest == None or manifest.get("state") != STATE_READY:
+                return
+            consumed_by = set(manifest["consumed_by"])
+            consumed_by.add(account_key)
+            manifest["consumed_by"] = sorted(consumed_by)
+            if set(manifest["subscribers"]).issubset(consumed_by):
+                logger.info(
+                    f"SourceContentRegistry: all subscribers consumed {url} => removing"
+                )
+                remove_directory(entry_path)
+            else:
+                self.__write_manifest(entry_path, manifest)
+
+    def collect_garbage(self):
+        # removes expired entries, which are not being processed.
+        # Lock files are kept: process can wait for the lock right now.
+        if os.path.isdir(self.registry_path) == False:
+            return
+        for name in os.listdir(self.registry_path):
+            entry_path = os.path.join(self.registry_path, name)
+            manifest = self.__read_manifest(entry_path)
+            if manifest == None or self.__is_expired(manifest) == False:
+                continue
+            with self.__lock_entry(manifest["url"]):
+                manifest = self.__read_manifest(entry_path)
+                if manifest == None or self.__is_expired(manifest) == False:
+                    continue
+                if manifest.get("state") == STATE_PROCESSING and self.__is_claim_alive(
+                    manifest
+                ):
+                    continue
+                logger.info(
+                    f"SourceContentRegistry: removing expired entry of {manifest['url']}"
+                )
+                remove_directory(entry_path)
+
+    def __str__(self):
+        return f"SourceContentRegistry(registry_path={self.registry_path})"
+
+    def __repr__(self):
+        return f"SourceContentRegistry(registry_path={self.registry_path!r}, ttl_hours={self.ttl_hours!r})"
+
+
+source_content_registry = SourceContentRegistry()
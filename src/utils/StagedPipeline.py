@@ -0,0 +1,189 @@
+"""
+# StagedPipeline.py
+# date: 18.10.2026
+# brief: runs items through a sequence of stages. Each stage has its own pool of
+#        workers and stages are connected by bounded queues, so network-bound stages
+#        of one item overlap with cpu-bound stages of another item.
+#        Process pools of cpu-bound stages are created on the first run and reused by
+#        the next runs, so models loaded by worker processes stay loaded between runs.
+"""
+
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List
+
+from src.utils.Logger import logger
+
+# marker, which tells stage worker that there are no more items.
+_STOP = object()
+
+
+class PipelineStage:
+    def __init__(
+        self, name: str, func: Callable, workers: int = 1, use_processes=False
+    ):
+        # func - takes item and returns item for the next stage or None
+        #        if item should not go further.
+        # use_processes - run func in process pool (for cpu-bound stages).
+        #                 func and items must be picklable in this case.
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.use_processes = use_processes
+
+    def __str__(self):
+        return f"PipelineStage(name={self.name}, workers={self.workers}, use_processes={self.use_processes})"
+
+    def __repr__(self):
+        return f"PipelineStage(name={self.name!r}, workers={self.workers}, use_processes={self.use_processes})"
+
+
+class StagedPipeline:
+    def __init__(
+        self,
+        stages: List[PipelineStage],
+        queue_size: int = 1,
+        on_drop: Callable = None,
+        process_initializer: Callable = None,
+        process_initargs=(),
+    ):
+        # queue_size - max number of items waiting in front of each stage.
+        # on_drop - called with item, which failed or was rejected by a stage.
+        # process_initializer - called with process_initargs in every worker process.
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+        self.on_drop = on_drop
+        self.process_initializer = process_initializer
+        self.process_initargs = process_initargs
+        self.__executors = {}  # stage index -> process pool, shared by all runs
+        self.__executors_lock = threading.Lock()
+
+    def is_sequential(self):
+        return all(stage.workers == 1 for stage in self.stages)
+
+    def __drop(self, item):
+        if self.on_drop != None:
+            try:
+                self.on_drop(item)
+            except Exception as e:
+                logger.error(f"StagedPipeline: on_drop failed for item={item}: {e}")
+
+    def __run_sequential(self, items):
+        # the same as processing items one by one without any pipeline.
+        results = []
+        for item in items:
+            for stage in self.stages:
+                try:
+                    next_item = stage.func(item)
+                except Exception:
+                    self.__drop(item)
+                    raise
+                if next_item == None:
+                    self.__drop(item)
+                    break
+                item = next_item
+            else:
+                results.append(item)
+        return results
+
+    def __run_concurrent(self, items):
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        results = []
+        results_lock = threading.Lock()
+        alive_workers = [stage.workers for stage in self.stages]
+        alive_lock = threading.Lock()
+
+        executors = self.__get_executors()
+
+        def call_stage(idx, item):
+            stage = self.stages[idx]
+            if idx in executors:
+                return executors[idx].submit(stage.func, item).result()
+            return stage.func(item)
+
+        def worker(idx):
+            stage = self.stages[idx]
+            is_last = idx == len(self.stages) - 1
+            while True:
+                item = queues[idx].get()
+                if item is _STOP:
+                    break
+                try:
+                    next_item = call_stage(idx, item)
+                except Exception as e:
+                    logger.error(f"StagedPipeline: stage={stage.name} failed: {e}")
+                    next_item = None
+
+                if next_item == None:
+                    self.__drop(item)
+                elif is_last:
+                    with results_lock:
+                        results.append(next_item)
+                else:
+                    queues[idx + 1].put(next_item)
+
+            # the last finished worker of the stage stops the next stage.
+            with alive_lock:
+                alive_workers[idx] -= 1
+                is_stage_finished = alive_workers[idx] == 0
+            if is_stage_finished and not is_last:
+                for _ in range(self.stages[idx + 1].workers):
+                    queues[idx + 1].put(_STOP)
+
+        threads = []
+        for idx, stage in enumerate(self.stages):
+            for worker_idx in range(stage.workers):
+                thread = threading.Thread(
+                    target=worker,
+                    args=(idx,),
+                    name=f"pipeline-{stage.name}-{worker_idx}",
+                    daemon=True,
+                )
+                thread.start()
+                threads.append(thread)
+
+        for item in items:
+            queues[0].put(item)
+        for _ in range(self.stages[0].workers):
+            queues[0].put(_STOP)
+        for thread in threads:
+            thread.join()
+        return results
+
+    def __get_executors(self):
+        # processes are spawned, not forked, because pipeline threads are already running.
+        with self.__executors_lock:
+            for idx, stage in enumerate(self.stages):
+                if stage.use_processes and idx not in self.__executors:
+                    self.__executors[idx] = ProcessPoolExecutor(
+                        max_workers=stage.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=self.process_initializer,
+                        initargs=self.process_initargs,
+                    )
+            return dict(self.__executors)
+
+    def shutdown(self):
+        # stops worker processes of stages, the next run starts new ones.
+        with self.__executors_lock:
+            executors = list(self.__executors.values())
+            self.__executors = {}
+        for executor in executors:
+            executor.shutdown()
+
+    def run(self, items) -> List:
+        # returns items, which passed through all stages.
+        if len(self.stages) == 0:
+            return list(items)
+        if self.is_sequential():
+            return self.__run_sequential(items)
+        logger.info(f"StagedPipeline: running stages={self.stages}")
+        return self.__run_concurrent(items)
+
+    def __str__(self):
+        return f"StagedPipeline(stages={self.stages})"
+
+    def __repr__(self):
+        return f"StagedPipeline(stages={self.stages!r})"
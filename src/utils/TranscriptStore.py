@@ -0,0 +1,294 @@
+"""
+# TranscriptStore.py
+# date: 18.10.2026
+# brief: persistent store of audio transcripts. Transcripts are keyed by hash of media
+#        content and transcription settings, so the same audio is transcribed only once.
+#        Highlights cut from the source media can take their captions from the source
+#        transcript using slice_transcript instead of running speech recognition again.
+"""
+
+import hashlib
+import os
+import threading
+import time
+
+from configurations.config import (DEFAULT_ASR_BACKEND,
+                                   TRANSCRIPT_STORE_MAX_SIZE_MB,
+                                   TRANSCRIPT_STORE_PATH,
+                                   TRANSCRIPT_STORE_TTL_DAYS,
+                                   VAD_MIN_SKIPPED_RATIO)
+
+from src.utils.asr_utils import get_asr_backend
+from src.utils.ffmpeg_utils import decode_audio
+from src.utils.fs_utils import (create_directory_if_not_exist, read_json,
+                                save_json)
+from src.utils.Logger import logger
+from src.utils.VoiceActivityDetector import (SpeechTimeline, to_float_audio,
+                                             voice_activity_detector)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+ASR_SAMPLE_RATE = 16000  # sample rate of audio expected by ASR backends
+MB = 1024 * 1024
+DAY = 24 * 3600
+
+
+class TranscriptStore:
+    def __init__(
+        self,
+        store_path: str,
+        max_size: int = TRANSCRIPT_STORE_MAX_SIZE_MB * MB,
+        ttl: float = TRANSCRIPT_STORE_TTL_DAYS * DAY,
+    ):
+        self.store_path = store_path
+        self.max_size = max_size
+        self.ttl = ttl  # seconds
+        self.__hash_cache = {}  # (path, size, mtime) -> content hash
+        self.__lock = threading.Lock()
+
+    def get_content_hash(self, media_path: str):
+        stat = os.stat(media_path)
+        cache_key = (os.path.abspath(media_path), stat.st_size, stat.st_mtime_ns)
+        with self.__lock:
+            if cache_key in self.__hash_cache:
+                return self.__hash_cache[cache_key]
+
+        sha256 = hashlib.sha256()
+        with open(media_path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                sha256.update(chunk)
+        content_hash = sha256.hexdigest()
+
+        with self.__lock:
+            self.__hash_cache[cache_key] = content_hash
+        return content_hash
+
+    def __get_path(self, content_hash: str, model_name: str, word_timestamps: bool):
+        words = "words" if word_timestamps else "segments"
+        return f"{self.store_path}/{content_hash}_{model_name}_{words}.json"
+
+    def get(self, content_hash: str, model_name: str, word_timestamps=False):
+        # transcript with word timestamps also satisfies request without them.
+        paths = [self.__get_path(content_hash, model_name, True)]
+        if word_timestamps == False:
+            paths.append(self.__get_path(content_hash, model_name, False))
+        for path in paths:
+            transcript = read_json(path)
+            if transcript != None:
+                # mtime is time of the last use => used transcripts are evicted last.
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass
+                return transcript
+        return None
+
+    def find(
+        self,
+        content_hash: str,
+        preferred_model: str,
+        word_timestamps=False,
+        accepted_models=None,
+    ):
+        # returns transcript made by preferred model or, if there is no such, by one of
+        # accepted_models (model ids, in order of preference). Other models are never
+        # used, so transcript is not silently downgraded to a smaller model.
+        for model_name in [preferred_model] + list(accepted_models or []):
+            transcript = self.get(content_hash, model_name, word_timestamps)
+            if transcript == None:
+                continue
+            if model_name != preferred_model:
+                logger.warning(
+                    f"TranscriptStore: transcript of {content_hash} by "
+                    f"model={model_name} is used instead of model={preferred_model}"
+                )
+            return transcript
+        return None
+
+    def put(self, content_hash: str, model_name: str, word_timestamps, transcript):
+        create_directory_if_not_exist(self.store_path)
+        path = self.__get_path(content_hash, model_name, word_timestamps)
+        # write into temporary file first, so readers never see half-written transcript.
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        if save_json(transcript, tmp_path) == False:
+            return False
+        os.replace(tmp_path, path)
+        self.collect_garbage()
+        return True
+
+    def collect_garbage(self):
+        # removes transcripts not used for ttl, then the least recently used ones
+        # until store fits max_size. Temporary files of running writers are kept.
+        entries = []
+        for name in os.listdir(self.store_path):
+            if name.endswith(".json") == False:
+                continue
+            path = os.path.join(self.store_path, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        total_size = sum(size for _, size, _ in entries)
+        now = time.time()
+        for mtime, size, path in entries:
+            if total_size <= self.max_size and now - mtime <= self.ttl:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total_size -= size
+            logger.info(f"TranscriptStore: evicted {path}")
+
+    @staticmethod
+    def __to_transcript(result):
+        # keeps only fields, which are used by extractors and filters.
+        segments = []
+        for segment in result["segments"]:
+            tmp_segment = {
+                "start": segment["start"],
+                "end": segment["end"],
+                "text": segment["text"],
+            }
+            if "words" in segment:
+                tmp_segment["words"] = [
+                    {"word": word["word"], "start": word["start"], "end": word["end"]}
+                    for word in segment["words"]
+                ]
+            segments.append(tmp_segment)
+        return {
+            "text": result.get("text", ""),
+            "language": result.get("language"),
+            "segments": segments,
+        }
+
+    def __transcribe_speech(self, backend, media_path, language, word_timestamps):
+        # transcribes only speech intervals of audio,
+        # timestamps are mapped to source timeline.
+        # returns None if audio can not be decoded.
+        started_at = time.perf_counter()
+        samples = decode_audio(media_path, ASR_SAMPLE_RATE)
+        if (
+            samples is None or len(samples) == 0
+        ):  # numpy array can not be compared with ==
+            logger.warning(
+                f"TranscriptStore: can not decode audio of {media_path} for VAD"
+            )
+            return None
+        timeline = SpeechTimeline(
+            voice_activity_detector.detect(samples, ASR_SAMPLE_RATE)
+        )
+        duration = len(samples) / ASR_SAMPLE_RATE
+        speech_duration = timeline.get_speech_duration()
+        skipped_ratio = 1 - speech_duration / duration
+        logger.info(
+            f"TranscriptStore: VAD found {speech_duration:.0f}s of speech in "
+            f"{duration:.0f}s ({len(timeline.intervals)} intervals, "
+            f"{skipped_ratio:.0%} skipped) "
+            f"in {time.perf_counter() - started_at:.1f}s"
+        )
+        if len(timeline.intervals) == 0:
+            return {"text": "", "language": language, "segments": []}
+        if skipped_ratio < VAD_MIN_SKIPPED_RATIO:
+            # almost everything is speech => transcribe already decoded audio as is.
+            return backend.transcribe(
+                to_float_audio(samples),
+                language=language,
+                word_timestamps=word_timestamps,
+            )
+        result = backend.transcribe(
+            timeline.get_speech_audio(samples, ASR_SAMPLE_RATE),
+            language=language,
+            word_timestamps=word_timestamps,
+        )
+        return timeline.map_transcript(result)
+
+    @staticmethod
+    def get_model_id(model_name: str, asr_backend=DEFAULT_ASR_BACKEND, vad=False):
+        # identifier of transcripts made by transcribe with the same settings.
+        model_id = get_asr_backend(asr_backend, model_name).get_model_id()
+        if vad:
+            model_id = f"{model_id}-vad"
+        return model_id
+
+    def transcribe(
+        self,
+        media_path: str,
+        model_name: str,
+        word_timestamps=False,
+        language=None,
+        asr_backend=DEFAULT_ASR_BACKEND,
+        vad=False,
+    ):
+        # returns (content_hash, transcript).
+        # ASR is used only if transcript is not stored yet.
+        # asr_backend - name of speech recognition backend (see get_asr_backend).
+        # vad - only speech detected by voice activity detector is transcribed.
+        backend = get_asr_backend(asr_backend, model_name)
+        model_id = self.get_model_id(model_name, asr_backend, vad)
+        content_hash = self.get_content_hash(media_path)
+        transcript = self.get(content_hash, model_id, word_timestamps)
+        if transcript != None:
+            logger.info(f"TranscriptStore: cache hit for {media_path}")
+            return content_hash, transcript
+
+        logger.info(
+            f"TranscriptStore: transcribing {media_path} backend={backend} vad={vad}"
+        )
+        result = None
+        if vad:
+            result = self.__transcribe_speech(
+                backend, media_path, language, word_timestamps
+            )
+        if result == None:
+            result = backend.transcribe(
+                media_path, language=language, word_timestamps=word_timestamps
+            )
+        transcript = self.__to_transcript(result)
+        self.put(content_hash, model_id, word_timestamps, transcript)
+        return content_hash, transcript
+
+    def __str__(self):
+        return f"TranscriptStore(store_path={self.store_path})"
+
+    def __repr__(self):
+        return f"TranscriptStore(store_path={self.store_path!r}, max_size={self.max_size!r}, ttl={self.ttl!r})"
+
+
+def slice_transcript(transcript, start: float, end: float):
+    # returns part of transcript in [start, end) with timestamps shifted, so start => 0.
+    segments = []
+    for segment in transcript["segments"]:
+        if segment["end"] <= start or segment["start"] >= end:
+            continue
+        tmp_segment = {
+            "start": max(segment["start"], start) - start,
+            "end": min(segment["end"], end) - start,
+            "text": segment["text"],
+        }
+        if "words" in segment:
+            words = [
+                {
+                    "word": word["word"],
+                    "start": max(word["start"], start) - start,
+                    "end": min(word["end"], end) - start,
+                }
+                for word in segment["words"]
+                if word["start"] >= start and word["start"] < end
+            ]
+            if len(words) == 0:
+                continue
+            tmp_segment["words"] = words
+            # segment is cut by range => its text consists only of words in range.
+            tmp_segment["text"] = "".join(word["word"] for word in words)
+        segments.append(tmp_segment)
+    return {
+        "text": "".join(segment["text"] for segment in segments),
+        "language": transcript.get("language"),
+        "segments": segments,
+    }
+
+
+transcript_store = TranscriptStore(TRANSCRIPT_STORE_PATH)
@@ -0,0 +1,216 @@
+"""
+# VoiceActivityDetector.py
+# date: 18.10.2026
+# brief: energy-based voice activity detection (VAD) on decoded audio.
+#        Frame is speech if its energy is above noise floor of the audio by margin and
+#        energy around it varies like speech does (syllables and pauses), so silence,
+#        steady music and hum are skipped. Speech frames are merged into intervals.
+#        SpeechTimeline glues speech intervals into one audio for speech recognition
+#        and maps timestamps of its transcript back to the source timeline.
+#
+# usage:
+#        intervals = voice_activity_detector.detect(samples, sample_rate)
+#        timeline = SpeechTimeline(intervals)
+#        result = backend.transcribe(timeline.get_speech_audio(samples, sample_rate))
+#        transcript = timeline.map_transcript(result)
+"""
+
+from bisect import bisect_right
+from typing import List, Tuple
+
+import numpy as np
+from configurations.config import (VAD_ENERGY_MARGIN_DB, VAD_FRAME_MS,
+                                   VAD_MIN_ENERGY_DB, VAD_MIN_ENERGY_STD_DB,
+                                   VAD_MIN_SILENCE_SECONDS,
+                                   VAD_MIN_SPEECH_SECONDS, VAD_PADDING_SECONDS)
+
+NOISE_FLOOR_PERCENTILE = 10
+ENERGY_STD_WINDOW_SECONDS = 1.0
+INT16_MAX = 32768.0
+FRAMES_PER_BLOCK = (
+    100000  # frames processed at once, so long audio is not copied as a whole
+)
+SPEECH_GAP_SECONDS = (
+    0.3  # silence between glued speech intervals, so words of them do not merge
+)
+
+
+def to_float_audio(samples):
+    # int16 samples => float32 samples in [-1, 1] (format accepted by ASR backends).
+    return samples.astype(np.float32) / INT16_MAX
+
+
+class VoiceActivityDetector:
+    def __init__(
+        self,
+        frame_ms: int = VAD_FRAME_MS,
+        energy_margin_db: float = VAD_ENERGY_MARGIN_DB,
+        min_energy_db: float = VAD_MIN_ENERGY_DB,
+        min_energy_std_db: float = VAD_MIN_ENERGY_STD_DB,
+        min_speech: float = VAD_MIN_SPEECH_SECONDS,
+        min_silence: float = VAD_MIN_SILENCE_SECONDS,
+        padding: float = VAD_PADDING_SECONDS,
+    ):
+        self.frame_ms = frame_ms
+        self.energy_margin_db = energy_margin_db
+        self.min_energy_db = min_energy_db
+        self.min_energy_std_db = min_energy_std_db
+        self.min_speech = min_speech
+        self.min_silence = min_silence
+        self.padding = padding
+
+    def __get_frame_energy(self, samples, frame_size):
+        # dBFS of every frame.
+        frames_count = len(samples) // frame_size
+        frames = samples[: frames_count * frame_size].reshape(frames_count, frame_size)
+        energy = np.empty(frames_count, dtype=np.float32)
+        for first in range(0, frames_count, FRAMES_PER_BLOCK):
+            block = to_float_audio(frames[first : first + FRAMES_PER_BLOCK])
+            energy[first : first + len(block)] = np.mean(block * block, axis=1)
+        return 10 * np.log10(energy + 1e-10)
+
+    @staticmethod
+    def __get_rolling_std(values, window):
+        # edges are padded by edge values,
+        # so start and end of audio do not look like speech onset.
+        kernel = np.ones(window, dtype=np.float64) / window
+        padded = np.pad(
+            values.astype(np.float64),
+            (window // 2, window - 1 - window // 2),
+            mode="edge",
+        )
+        mean = np.convolve(padded, kernel, mode="valid")
+        mean_sq = np.convolve(padded**2, kernel, mode="valid")
+        return np.sqrt(np.maximum(mean_sq - mean * mean, 0))
+
+    @staticmethod
+    def __get_runs(mask):
+        # (first, last + 1) of every run of True.
+        edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+        return list(zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)))
+
+    def __merge_intervals(self, runs, frame_seconds, duration):
+        intervals = []
+        for first, last in runs:
+            start, end = int(first) * frame_seconds, int(last) * frame_seconds
+            if len(intervals) > 0 and start - intervals[-1][1] < self.min_silence:
+                intervals[-1][1] = end
+            else:
+                intervals.append([start, end])
+
+        padded = []
+        for start, end in intervals:
+            if end - start < self.min_speech:
+                continue
+            start = max(start - self.padding, 0.0)
+            end = min(end + self.padding, duration)
+            if len(padded) > 0 and start <= padded[-1][1]:
+                padded[-1] = (padded[-1][0], end)
+            else:
+                padded.append((start, end))
+        return padded
+
+    def detect(self, samples, sample_rate: int) -> List[Tuple[float, float]]:
+        """
+        Finds speech in audio.
+
+        Parameters:
+        - samples (numpy.ndarray): mono int16 samples (see decode_audio).
+
+        Returns:
+        - list: (start, end) seconds of speech intervals, sorted.
+        """
+        frame_size = int(sample_rate * self.frame_ms / 1000)
+        duration = len(samples) / sample_rate
+        if len(samples) < frame_size:
+            return []
+        energy = self.__get_frame_energy(samples, frame_size)
+        noise_floor = np.percentile(energy, NOISE_FLOOR_PERCENTILE)
+        threshold = max(noise_floor + self.energy_margin_db, self.min_energy_db)
+        is_speech = energy > threshold
+        if self.min_energy_std_db > 0:
+            window = max(int(ENERGY_STD_WINDOW_SECONDS * 1000 / self.frame_ms), 1)
+            is_speech &= (
+                self.__get_rolling_std(energy, window) >= self.min_energy_std_db
+            )
+        return self.__merge_intervals(
+            self.__get_runs(is_speech), frame_size / sample_rate, duration
+        )
+
+    def __str__(self):
+        return (
+            f"VoiceActivityDetector(frame_ms={self.frame_ms}, "
+            f"energy_margin_db={self.energy_margin_db})"
+        )
+
+    def __repr__(self):
+        return (
+            f"VoiceActivityDetector(frame_ms={self.frame_ms!r}, "
+            f"energy_margin_db={self.energy_margin_db!r}, "
+            f"min_energy_db={self.min_energy_db!r}, "
+            f"min_energy_std_db={self.min_energy_std_db!r}, "
+            f"min_speech={self.min_speech!r}, min_silence={self.min_silence!r}, "
+            f"padding={self.padding!r})"
+        )
+
+
+class SpeechTimeline:
+    def __init__(
+        self, intervals: List[Tuple[float, float]], gap: float = SPEECH_GAP_SECONDS
+    ):
+        # intervals - speech intervals of source.
+        # gap - silence between intervals in speech audio.
+        self.intervals = intervals
+        self.gap = gap
+        self.__speech_starts = []  # start of every interval in speech audio
+        position = 0.0
+        for start, end in intervals:
+            self.__speech_starts.append(position)
+            position += end - start + gap
+
+    def get_speech_duration(self) -> float:
+        return sum(end - start for start, end in self.intervals)
+
+    def get_speech_audio(self, samples, sample_rate: int):
+        # float32 audio of speech intervals (format accepted by ASR backends).
+        gap = np.zeros(int(self.gap * sample_rate), dtype=np.float32)
+        parts = []
+        for start, end in self.intervals:
+            part = samples[int(start * sample_rate) : int(end * sample_rate)]
+            parts.append(to_float_audio(part))
+            parts.append(gap)
+        if len(parts) == 0:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(parts)
+
+    def to_source_time(self, speech_time: float) -> float:
+        # time in gap after interval => end of the interval.
+        idx = max(bisect_right(self.__speech_starts, speech_time) - 1, 0)
+        start, end = self.intervals[idx]
+        offset = max(speech_time - self.__speech_starts[idx], 0.0)
+        return start + min(offset, end - start)
+
+    def map_transcript(self, result):
+        # shifts timestamps of transcript (whisper format) of speech audio
+        # to source timeline.
+        if len(self.intervals) == 0:
+            return result
+        for segment in result["segments"]:
+            segment["start"] = self.to_source_time(segment["start"])
+            segment["end"] = self.to_source_time(segment["end"])
+            for word in segment.get("words", []):
+                word["start"] = self.to_source_time(word["start"])
+                word["end"] = self.to_source_time(word["end"])
+        return result
+
+    def __str__(self):
+        return (
+            f"SpeechTimeline(intervals={len(self.intervals)}, "
+            f"speech={self.get_speech_duration():.1f}s)"
+        )
+
+    def __repr__(self):
+        return f"SpeechTimeline(intervals={self.intervals!r}, gap={self.gap!r})"
+
+
+voice_activity_detector = VoiceActivityDetector()
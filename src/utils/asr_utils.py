@@ -0,0 +1,56 @@
+"""
+# asr_utils.py
+# date: 18.10.2026
+# brief: creates speech recognition backend by its name and chooses backend of content:
+#        backend of account has priority over backend of content type.
+"""
+
+from configurations.config import (ASR_BACKEND_BY_CONTENT_TYPE,
+                                   DEFAULT_ASR_BACKEND)
+
+from src.AsrBackend.AsrBackend import AsrBackend
+from src.AsrBackend.CTranslate2AsrBackend import CTranslate2AsrBackend
+from src.AsrBackend.WhisperAsrBackend import WhisperAsrBackend
+from src.utils.Logger import logger
+
+ASR_BACKENDS = {
+    backend_cls.name: backend_cls
+    for backend_cls in (WhisperAsrBackend, CTranslate2AsrBackend)
+}
+
+
+def get_asr_backend(name: str, model_name: str) -> AsrBackend:
+    """
+    Creates speech recognition backend by its name.
+
+    Parameters:
+    - name (str): name of backend (see ASR_BACKENDS), unknown name => default backend.
+    - model_name (str): size of whisper model.
+
+    Returns:
+    - AsrBackend
+    """
+    backend_cls = ASR_BACKENDS.get(name)
+    if backend_cls == None:
+        logger.warning(
+            f"Unknown ASR backend={name} => using default backend={DEFAULT_ASR_BACKEND}"
+        )
+        backend_cls = ASR_BACKENDS[DEFAULT_ASR_BACKEND]
+    return backend_cls(model_name)
+
+
+def get_asr_backend_name(content_type: str, account_asr_backend: str = None) -> str:
+    """
+    Determines speech recognition backend of content.
+
+    Parameters:
+    - content_type (str): value of ContentType.
+    - account_asr_backend (str): backend chosen in account config,
+                                 it has priority over content type.
+
+    Returns:
+    - str: name of backend.
+    """
+    if account_asr_backend != None:
+        return account_asr_backend
+    return ASR_BACKEND_BY_CONTENT_TYPE.get(content_type, DEFAULT_ASR_BACKEND)
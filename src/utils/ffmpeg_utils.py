@@ -0,0 +1,160 @@
+import json
+import os
+import subprocess
+from typing import List
+
+
+def run_ffprobe(args: List[str]) -> str:
+    """
+    Runs ffprobe with given arguments and returns its stdout.
+
+    Raises:
+    - subprocess.CalledProcessError: if ffprobe failed.
+    """
+    result = subprocess.run(
+        ["ffprobe", "-v", "error"] + args,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return result.stdout
+
+
+def get_media_duration(path: str) -> float:
+    """
+    Returns duration of media file in seconds or None if it can not be determined.
+    """
+    try:
+        output = run_ffprobe(
+            [
+                "-show_entries",
+                "format=duration",
+                "-of",
+                "default=noprint_wrappers=1:nokey=1",
+                path,
+            ]
+        )
+        return float(output.strip())
+    except Exception:
+        return None
+
+
+def get_keyframe_times(path: str) -> List[float]:
+    """
+    Returns sorted presentation times (seconds) of video keyframes.
+    Only packet headers are read, frames are not decoded.
+    """
+    output = run_ffprobe(
+        [
+            "-select_streams",
+            "v:0",
+            "-show_entries",
+            "packet=pts_time,flags",
+            "-of",
+            "csv=print_section=0",
+            path,
+        ]
+    )
+    keyframes = []
+    for line in output.splitlines():
+        parts = line.strip().split(",")
+        if len(parts) < 2 or "K" not in parts[1]:
+            continue
+        try:
+            keyframes.append(float(parts[0]))
+        except ValueError:
+            continue
+    keyframes.sort()
+    return keyframes
+
+
+def get_video_stream_info(path: str) -> dict:
+    """
+    Returns parameters of the first video stream (codec_name, profile, pix_fmt, width,
+    height) or empty dict if they can not be determined.
+    """
+    try:
+        output = run_ffprobe(
+            [
+                "-select_streams",
+                "v:0",
+                "-show_entries",
+                "stream=codec_name,profile,pix_fmt,width,height",
+                "-of",
+                "json",
+                path,
+            ]
+        )
+        streams = json.loads(output).get("streams", [])
+        return streams[0] if len(streams) > 0 else {}
+    except Exception:
+        return {}
+
+
+def is_valid_media(path: str) -> bool:
+    """
+    Checks that media file can be opened by ffprobe and has positive duration.
+    """
+    duration = get_media_duration(path)
+    return duration != None and duration > 0
+
+
+def get_mux_command(
+    video_path: str, audio_path: str, output_path: str, audio_codec: str = "aac"
+) -> List[str]:
+    # video is not re-encoded. Inputs can be pipes (FIFO).
+    return [
+        "ffmpeg",
+        "-y",
+        "-loglevel",
+        "error",
+        "-i",
+        video_path,
+        "-i",
+        audio_path,
+        "-map",
+        "0:v:0",
+        "-map",
+        "1:a:0",
+        "-c:v",
+        "copy",
+        "-c:a",
+        audio_codec,
+        output_path,
+    ]
+
+
+def mux_audio_video(
+    video_path: str, audio_path: str, output_path: str, audio_codec: str = "aac"
+):
+    """
+    Combines video stream of video_path with audio stream of audio_path without
+    re-encoding video.
+
+    Raises:
+    - subprocess.CalledProcessError: if ffmpeg failed.
+    """
+    ffmpeg_command = get_mux_command(video_path, audio_path, output_path, audio_codec)
+    with open(os.devnull, "w") as devnull:
+        subprocess.run(ffmpeg_command, check=True, stdout=devnull, stderr=devnull)
+
+
+def decode_audio(path: str, sample_rate: int = 16000):
+    """
+    Decodes audio of media file into mono 16-bit PCM samples.
+
+    Returns:
+    - numpy.ndarray: int16 samples or None if audio can not be decoded.
+    """
+    import numpy as np
+
+    try:
+        result = subprocess.run(
+            ["ffmpeg", "-nostdin", "-loglevel", "error", "-i", path]
+            + ["-vn", "-ac", "1", "-ar", str(sample_rate), "-f", "s16le", "-"],
+            check=True,
+            capture_output=True,
+        )
+        return np.frombuffer(result.stdout, dtype=np.int16)
+    except Exception:
+        return None
@@ -2,6 +2,7 @@ import glob
 import json
 import os
 import shutil
+import threading
 from typing import Dict
 
 
@@ -196,12 +197,16 @@ def read_json(file_path):
 
 
 def save_json(data, file_path: str) -> bool:
+    # json is written into temporary file and then replaces file_path,
+    # so readers never see half-written file.
+    tmp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
     try:
-        with open(file_path, "w", encoding="utf-8") as json_file:
+        with open(tmp_path, "w", encoding="utf-8") as json_file:
             json.dump(data, json_file, ensure_ascii=False, indent=4)
+        os.replace(tmp_path, file_path)
         return True
     except Exception as e:
-        pass
+        remove_file(tmp_path)
     return False
 
 
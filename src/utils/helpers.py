@@ -1,10 +1,11 @@
 import os
 import re
+import threading
 
 from configurations.config import (
     CACHE_DIR_NAME, CONTENT_DIR_NAME, CONTENT_TO_UPLOAD_CONFIG_FILENAME,
-    CREDS_DIR_NAME, DOWNLOADED_CONTENT_CACHE_PATH, HIGHLIGHT_NAME,
-    MANAGABLE_ACCOUNT_DATA_PATH,
+    CREDS_DIR_NAME, HIGHLIGHT_NAME, MANAGABLE_ACCOUNT_DATA_PATH,
+    MANAGABLE_ACCOUNTS_CONFIG_PATH,
     NOT_PROCESSED_RAW_DOWNLOADED_CONTENT_FILE_NAME, TMP_DIR_PATH)
 
 from src.adaptors.ContentToUploadAdaptor import \
@@ -25,12 +26,27 @@ from src.entities.SourceType import SourceType
 from src.HighlightsExtractor.TextualHighlightsVideoExtractor import \
     TextualHighlightsVideoExtractor
 from src.ManagableAccount.ManagableAccount import ManagableAccount
+from src.utils.asr_utils import get_asr_backend_name
+from src.utils.DownloadedContentStore import downloaded_content_store
 from src.utils.fs_utils import (create_directory_if_not_exist,
                                 create_file_if_not_exists, get_file_extension,
                                 move, read_json, read_json_file, remove_file,
                                 save_json)
 from src.utils.Logger import logger
 
+# locks, which protect account`s contentToUpload config from concurrent modification
+# by uploading and prefetching jobs.
+_config_locks = {}
+_config_locks_guard = threading.Lock()
+
+
+def get_config_lock(config_path: str):
+    key = os.path.normpath(config_path)
+    with _config_locks_guard:
+        if key not in _config_locks:
+            _config_locks[key] = threading.Lock()
+        return _config_locks[key]
+
 
 def construct_managable_accounts(managable_accounts_config_path):
     # reads json with information about managable accounts and
@@ -85,15 +101,16 @@ def remove_uploaded_content(
         logger.info(f"removing mediaFile={media_file.path} | result={rm_res}")
 
     # update contentToUpload config, so to remove already uploaded content
-    content_to_upload_requests = read_json(upload_requests_config_path)
-    if len(content_to_upload_requests) > 0:
+    with get_config_lock(upload_requests_config_path):
+        content_to_upload_requests = read_json(upload_requests_config_path)
+        if len(content_to_upload_requests) > 0:
 
-        # remove first sorted request because it was already handled.
-        sorted_requests = sorted(content_to_upload_requests, key=lambda x: x["cid"])
-        contentToUpload_json = sorted_requests.pop(0)
+            # remove first sorted request because it was already handled.
+            sorted_requests = sorted(content_to_upload_requests, key=lambda x: x["cid"])
+            contentToUpload_json = sorted_requests.pop(0)
 
-        upd_cnfg_res = save_json(sorted_requests, upload_requests_config_path)
-        logger.info(f"removing mediaFile={media_file.path} | result={upd_cnfg_res}")
+            upd_cnfg_res = save_json(sorted_requests, upload_requests_config_path)
+            logger.info(f"removing mediaFile={media_file.path} | result={upd_cnfg_res}")
 
 
 def get_content_downloader(content_to_download: ContentToDownload):
@@ -112,24 +129,36 @@ def get_content_download_definer(source: Source):
     return definer
 
 
-def get_highlights_video_extractor(content_type: ContentType):
+def get_highlights_video_extractor(
+    content_type: ContentType, account: ManagableAccount = None
+):
+    # account - account, which extracts highlights, it may choose speech recognition backend.
     extractor = None
     if content_type == ContentType.YOUTUBE_VIDEO_INTERVIEW.value:
-        extractor = TextualHighlightsVideoExtractor()
+        account_asr_backend = account.asr_backend if account != None else None
+        extractor = TextualHighlightsVideoExtractor(
+            asr_backend=get_asr_backend_name(content_type, account_asr_backend)
+        )
     logger.info(f"Determined content extractor {extractor}")
     return extractor
 
 
-def check_if_there_is_content_to_upload(account: ManagableAccount):
+def get_content_to_upload_count(account: ManagableAccount):
+    # returns number of content items, which are ready to be uploaded into account.
     content_to_upload_config_path = (
         account.get_account_dir_path() + CONTENT_TO_UPLOAD_CONFIG_FILENAME
     )
     content_to_upload_requests = read_json(content_to_upload_config_path)
+    if content_to_upload_requests == None:
+        return 0
+    return len(content_to_upload_requests)
 
+
+def check_if_there_is_content_to_upload(account: ManagableAccount):
     logger.info(
-        f"Handling account={account.name} | uploadingConfig={content_to_upload_config_path}"
+        f"Handling account={account.name} | uploadingConfig={account.get_account_dir_path() + CONTENT_TO_UPLOAD_CONFIG_FILENAME}"
     )
-    if len(content_to_upload_requests) == 0:
+    if get_content_to_upload_count(account) == 0:
         return False
     return True
 
@@ -145,6 +174,21 @@ def get_account_sources(path: str, account: ManagableAccount):
     return filtered_sources
 
 
+def get_account_key(account: ManagableAccount) -> str:
+    # identifies account in global stores (registry of source content, etc.).
+    return os.path.normpath(account.get_account_dir_path())
+
+
+def get_sources_subscribers():
+    # returns source name -> keys of all managable accounts, which are subscribed to it.
+    # Accounts are constructed from config, so it is called once per run, not per source.
+    subscribers = {}
+    for account in construct_managable_accounts(MANAGABLE_ACCOUNTS_CONFIG_PATH):
+        for source_name in account.sources:
+            subscribers.setdefault(source_name, []).append(get_account_key(account))
+    return subscribers
+
+
 def sort_highlights_folder(self, folder_path):
     """
     Renames highlight files in the folder so that they are sequentially numbered
@@ -185,7 +229,7 @@ def update_uploading_config_with_new_content(account, new_content):
     #         modifies config, so to add new contentToUpload notes.
 
     def get_mediaFile_id(path: str):
-        match = re.search(r"mediaFile_(\d+)", filepath)
+        match = re.search(r"mediaFile_(\d+)", path)
         if match:
             return int(
                 match.group(1)
@@ -202,8 +246,8 @@ def update_uploading_config_with_new_content(account, new_content):
     def calculate_max_mediaFile_id(content_to_upload):
         max_id = 0
         for i in range(len(content_to_upload)):
-            for j in range(len(content_to_upload[i])):
-                tmp_media_file_path = content_to_upload[i][j].path
+            for j in range(len(content_to_upload[i].mediaFiles)):
+                tmp_media_file_path = content_to_upload[i].mediaFiles[j].path
                 tmp_id = get_mediaFile_id(tmp_media_file_path)
                 if tmp_id != None and tmp_id > max_id:
                     max_id = tmp_id
@@ -213,34 +257,32 @@ def update_uploading_config_with_new_content(account, new_content):
         f"{account.get_account_dir_path()}/{CONTENT_TO_UPLOAD_CONFIG_FILENAME}"
     )
     path_to_content_dir = f"{account.get_account_dir_path()}/{CONTENT_DIR_NAME}/"
-    config_json = read_json(path_to_config)
-    current_content_to_upload = json_list_to_ContentToUpload_list(config_json)
-
-    max_cid = calculate_max_cid(current_content_to_upload)
-    max_mediaFile_id = calculate_max_mediaFile_id(current_content_to_upload)
-    logger.info(f"Found max_cid={max_cid}, max_mediaFile_id={max_mediaFile_id}")
-
-    for i in range(len(new_content)):
-        new_content[i].cid = max_cid
-        for j in range(len(new_content[i].mediaFiles)):
-            extension = get_file_extension(new_content[i].mediaFiles[j].path)
-            new_name = f"mediaFile_{max_mediaFile_id}{extension}"
-            new_path = path_to_content_dir + new_name
-            move(new_content[i].mediaFiles[j].path, new_path)
-            new_content[i].mediaFiles[j].path = new_path
-            max_mediaFile_id += 1
-        max_cid += 1
-
-    current_content_to_upload.extend(new_content)
-    logger.info(f"Adding new content to uploading config: {new_content}")
-
-    json_data = [i.to_dict() for i in current_content_to_upload]
-    save_json(json_data, path_to_config)
+    with get_config_lock(path_to_config):
+        config_json = read_json(path_to_config)
+        current_content_to_upload = json_list_to_ContentToUpload_list(config_json)
+
+        max_cid = calculate_max_cid(current_content_to_upload)
+        max_mediaFile_id = calculate_max_mediaFile_id(current_content_to_upload)
+        logger.info(f"Found max_cid={max_cid}, max_mediaFile_id={max_mediaFile_id}")
+
+        for i in range(len(new_content)):
+            new_content[i].cid = max_cid
+            for j in range(len(new_content[i].mediaFiles)):
+                extension = get_file_extension(new_content[i].mediaFiles[j].path)
+                new_name = f"mediaFile_{max_mediaFile_id}{extension}"
+                new_path = path_to_content_dir + new_name
+                move(new_content[i].mediaFiles[j].path, new_path)
+                new_content[i].mediaFiles[j].path = new_path
+                max_mediaFile_id += 1
+            max_cid += 1
+
+        current_content_to_upload.extend(new_content)
+        logger.info(f"Adding new content to uploading config: {new_content}")
+
+        json_data = [i.to_dict() for i in current_content_to_upload]
+        save_json(json_data, path_to_config)
     logger.info("Uploading config is updated")
 
 
 def cache_downloaded_content(content: ContentToDownload, account: ManagableAccount):
-    cache_file_path = f"{account.get_account_dir_path()}/{CACHE_DIR_NAME}/{DOWNLOADED_CONTENT_CACHE_PATH}"
-    cached_downloaded_content = read_json(cache_file_path)
-    cached_downloaded_content.append(content.url)
-    save_json(cached_downloaded_content, cache_file_path)
+    downloaded_content_store.add(account, content.url)
@@ -0,0 +1,140 @@
+import struct
+from typing import Callable, List
+
+# bytes requested at once while looking for segment index at the beginning of the file.
+HEAD_PROBE_SIZE = 64 * 1024
+
+
+class DashFragment:
+    def __init__(self, first_byte: int, last_byte: int, start: float, end: float):
+        self.first_byte = first_byte
+        self.last_byte = last_byte
+        self.start = start  # seconds
+        self.end = end
+
+    def __str__(self):
+        return f"DashFragment(bytes={self.first_byte}-{self.last_byte}, time={self.start:.3f}-{self.end:.3f})"
+
+    def __repr__(self):
+        return f"DashFragment(first_byte={self.first_byte!r}, last_byte={self.last_byte!r}, start={self.start!r}, end={self.end!r})"
+
+
+def read_box_header(data: bytes, offset: int):
+    """
+    Reads header of mp4 box, which starts at offset.
+
+    Returns:
+    - tuple: (box type, box size, header size) or None if data has not enough bytes.
+             box size is None if box lasts till the end of the file.
+    """
+    if len(data) < offset + 8:
+        return None
+    size, box_type = struct.unpack(">I4s", data[offset : offset + 8])
+    header_size = 8
+    if size == 1:
+        if len(data) < offset + 16:
+            return None
+        size = struct.unpack(">Q", data[offset + 8 : offset + 16])[0]
+        header_size = 16
+    elif size == 0:
+        size = None
+    return box_type.decode("latin-1"), size, header_size
+
+
+def parse_sidx(box: bytes, box_offset: int) -> List[DashFragment]:
+    """
+    Parses segment index box (sidx) into fragments of the stream.
+
+    Parameters:
+    - box (bytes): whole sidx box including header.
+    - box_offset (int): offset of the box in the file.
+    """
+    _, box_size, header_size = read_box_header(box, 0)
+    position = header_size
+    version = box[position]
+    position += 4  # version and flags
+    position += 4  # reference_ID
+    timescale = struct.unpack(">I", box[position : position + 4])[0]
+    position += 4
+    if version == 0:
+        earliest_time, first_offset = struct.unpack(">II", box[position : position + 8])
+        position += 8
+    else:
+        earliest_time, first_offset = struct.unpack(
+            ">QQ", box[position : position + 16]
+        )
+        position += 16
+    position += 2  # reserved
+    reference_count = struct.unpack(">H", box[position : position + 2])[0]
+    position += 2
+
+    fragments = []
+    byte_offset = box_offset + box_size + first_offset
+    time = earliest_time
+    for _ in range(reference_count):
+        reference, duration, _ = struct.unpack(">III", box[position : position + 12])
+        position += 12
+        if reference & 0x80000000:
+            raise ValueError("hierarchical segment index is not supported")
+        size = reference & 0x7FFFFFFF
+        fragments.append(
+            DashFragment(
+                byte_offset,
+                byte_offset + size - 1,
+                time / timescale,
+                (time + duration) / timescale,
+            )
+        )
+        byte_offset += size
+        time += duration
+    return fragments
+
+
+def read_dash_index(fetch: Callable[[int, int], bytes]):
+    """
+    Finds initialization segment and fragments of fragmented mp4 (DASH) stream.
+    Only boxes at the beginning of the stream are fetched.
+
+    Parameters:
+    - fetch (callable): fetch(first_byte, last_byte) returns bytes of the stream.
+
+    Returns:
+    - tuple: ((first byte, last byte) of initialization segment, list of DashFragment).
+
+    Raises:
+    - ValueError: if stream has no segment index.
+    """
+    data = fetch(0, HEAD_PROBE_SIZE - 1)
+    offset = 0
+    init_end = 0
+    while True:
+        header = read_box_header(data, offset)
+        if header == None:
+            last_byte = max(offset + 16, len(data) + HEAD_PROBE_SIZE) - 1
+            more_data = fetch(len(data), last_byte)
+            if len(more_data) == 0:
+                raise ValueError("stream ended before segment index")
+            data += more_data
+            continue
+        box_type, box_size, _ = header
+        if box_type in ("moof", "mdat") or box_size == None:
+            raise ValueError(f"segment index is not found before '{box_type}' box")
+        if box_type == "sidx":
+            if len(data) < offset + box_size:
+                data += fetch(len(data), offset + box_size - 1)
+            sidx = data[offset : offset + box_size]
+            return (0, init_end - 1), parse_sidx(sidx, offset)
+        # boxes before index (ftyp, moov) form initialization segment.
+        offset += box_size
+        init_end = offset
+
+
+def select_fragments(fragments: List[DashFragment], windows) -> List[DashFragment]:
+    """
+    Returns fragments, which intersect at least one of windows [(start, end), ...] (seconds).
+    """
+    return [
+        fragment
+        for fragment in fragments
+        if any(fragment.start < end and start < fragment.end for start, end in windows)
+    ]
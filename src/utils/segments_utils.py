@@ -0,0 +1,83 @@
+import math
+
+
+def calculate_overlap(segment1, segment2):
+    """
+    Returns length of intersection of two segments divided by duration of the longer one.
+
+    Parameters:
+    - segment1, segment2 (dict): segments with "start" and "end" keys (seconds).
+    """
+    start1, end1 = segment1["start"], segment1["end"]
+    start2, end2 = segment2["start"], segment2["end"]
+    overlap = max(0, min(end1, end2) - max(start1, start2))
+    duration = max(end1 - start1, end2 - start2)
+    return overlap / duration
+
+
+def _get_bucket_width(segments):
+    # median duration => typical segment touches one or two buckets of the index.
+    durations = sorted(
+        segment["end"] - segment["start"]
+        for segment in segments
+        if segment["end"] > segment["start"]
+    )
+    if len(durations) == 0:
+        return 1.0
+    return durations[len(durations) // 2]
+
+
+def remove_overlapping_segments(scored_segments, overlap_threshold=0.5, max_count=None):
+    """
+    Goes through segments in the given order and keeps segment only if its overlap with
+    every already kept segment is not greater than overlap_threshold.
+
+    Kept segments are stored in a grid index: timeline is split into buckets and every
+    kept segment is added to buckets it covers. So only kept segments, which are near the
+    current one, are checked instead of all kept segments. Selection stops as soon as
+    max_count segments are kept.
+
+    Parameters:
+    - scored_segments (list): segments sorted by priority (the best first).
+    - overlap_threshold (float): max allowed overlap (see calculate_overlap).
+    - max_count (int): max number of segments to keep, None - no limit.
+
+    Returns:
+    - list: kept segments in the same order as in scored_segments.
+    """
+    if max_count != None and max_count <= 0:
+        return []
+    if overlap_threshold < 0:
+        # any pair of segments overlaps more than negative threshold.
+        return scored_segments[:1]
+
+    bucket_width = _get_bucket_width(scored_segments)
+    buckets = {}  # bucket index -> kept segments, which cover this bucket
+    unique_segments = []
+
+    for current in scored_segments:
+        start, end = current["start"], current["end"]
+        first_bucket = math.floor(start / bucket_width)
+        last_bucket = max(first_bucket, math.floor(end / bucket_width))
+
+        # Non-negative threshold => only intersecting segments can be duplicates and
+        # every kept segment, which intersects current one, is in one of its buckets.
+        is_duplicate = False
+        for bucket in range(first_bucket, last_bucket + 1):
+            for existing in buckets.get(bucket, ()):
+                if existing["end"] <= start or existing["start"] >= end:
+                    continue
+                if calculate_overlap(current, existing) > overlap_threshold:
+                    is_duplicate = True
+                    break
+            if is_duplicate:
+                break
+        if is_duplicate:
+            continue
+
+        unique_segments.append(current)
+        if max_count != None and len(unique_segments) >= max_count:
+            break
+        for bucket in range(first_bucket, last_bucket + 1):
+            buckets.setdefault(bucket, []).append(current)
+    return unique_segments
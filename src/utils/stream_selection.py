@@ -0,0 +1,93 @@
+"""
+# stream_selection.py
+# date: 18.10.2026
+# brief: chooses youtube video stream for account output profile: the smallest stream,
+#        which gives output of profile size without upscaling, so bigger streams are not
+#        downloaded only to be downscaled. Codecs, fps and bitrate of profile are preferred.
+"""
+
+import re
+
+from src.entities.OutputProfile import OutputProfile
+
+# aspect ratio of youtube video, if stream does not report its size.
+DEFAULT_SOURCE_ASPECT_RATIO = 16 / 9
+
+
+def get_stream_height(stream) -> int:
+    # resolution of adaptive stream is like "720p" or "1080p60".
+    match = re.match(r"(\d+)p", stream.resolution or "")
+    return int(match.group(1)) if match else 0
+
+
+def get_stream_aspect_ratio(stream) -> float:
+    width = getattr(stream, "width", None)
+    height = getattr(stream, "height", None)
+    if width and height:
+        return width / height
+    return DEFAULT_SOURCE_ASPECT_RATIO
+
+
+def get_codec_rank(stream, profile: OutputProfile) -> int:
+    # the lower, the more preferred. Codecs, which are not in profile, go last.
+    codec = (stream.video_codec or "").split(".")[0]
+    if codec in profile.codecs:
+        return profile.codecs.index(codec)
+    return len(profile.codecs)
+
+
+def get_stream_size(stream) -> int:
+    try:
+        return stream.filesize or 0
+    except Exception:
+        return 0  # size of some streams can not be requested.
+
+
+def select_video_stream(streams, profile: OutputProfile):
+    """
+    Selects the smallest video stream, which gives output of profile size without
+    upscaling. Streams with preferred codec, fps and bitrate within profile go first.
+    If no stream is big enough, the biggest one is selected.
+
+    Parameters:
+    - streams (list): adaptive video streams.
+    - profile (OutputProfile): output profile of account.
+
+    Returns:
+    - stream or None if streams are empty.
+    """
+    if len(streams) == 0:
+        return None
+
+    def fits_limits(stream):
+        if profile.fps != None and (stream.fps or 0) > profile.fps:
+            return False
+        if profile.max_bitrate != None and (stream.bitrate or 0) > profile.max_bitrate:
+            return False
+        return True
+
+    # limits are soft: if no stream fits them, they are ignored.
+    candidates = [stream for stream in streams if fits_limits(stream)] or list(streams)
+    meeting = [
+        stream
+        for stream in candidates
+        if get_stream_height(stream)
+        >= profile.get_required_source_height(get_stream_aspect_ratio(stream))
+    ]
+    if len(meeting) > 0:
+        return min(
+            meeting,
+            key=lambda stream: (
+                get_codec_rank(stream, profile),
+                get_stream_height(stream),
+                get_stream_size(stream),
+            ),
+        )
+    return min(
+        candidates,
+        key=lambda stream: (
+            -get_stream_height(stream),
+            get_codec_rank(stream, profile),
+            get_stream_size(stream),
+        ),
+    )
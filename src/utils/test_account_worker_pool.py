@@ -0,0 +1,94 @@
+"""
+# test_account_worker_pool.py
+# date: 18.10.2026
+# brief: checks that AccountWorkerPool runs jobs of the same account one by one in
+#        order they were submitted and jobs of different accounts in parallel.
+# usage: python -m pytest src/utils/test_account_worker_pool.py
+"""
+
+import threading
+import time
+
+from src.utils.AccountWorkerPool import AccountWorkerPool
+
+TIMEOUT_SECONDS = 5
+
+
+class FakeAccount:
+    # pool needs only name and directory of account (key of its job queue).
+    def __init__(self, name: str):
+        self.name = name
+
+    def get_account_dir_path(self):
+        return f"accounts/{self.name}"
+
+
+def wait_until(condition):
+    deadline = time.monotonic() + TIMEOUT_SECONDS
+    while condition() == False:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_jobs_of_same_account_run_one_by_one_in_order():
+    pool = AccountWorkerPool(workers=4, name="test-pool")
+    pool.start()
+    account = FakeAccount("account")
+    lock = threading.Lock()
+    running = []
+    max_running = [0]
+    order = []
+
+    def make_job(idx):
+        def job(_):
+            with lock:
+                running.append(idx)
+                max_running[0] = max(max_running[0], len(running))
+            time.sleep(0.02)
+            with lock:
+                running.remove(idx)
+                order.append(idx)
+
+        return job
+
+    for idx in range(6):
+        pool.submit(account, make_job(idx), f"job-{idx}")
+    wait_until(lambda: len(order) == 6)
+
+    assert order == list(range(6))
+    assert max_running[0] == 1
+    wait_until(lambda: pool.get_stats()["finished_jobs"] == 6)
+    assert pool.get_queue_depth() == 0
+
+
+def test_jobs_of_different_accounts_run_in_parallel():
+    pool = AccountWorkerPool(workers=2, name="test-pool")
+    pool.start()
+    # every job waits for the other one => passes only if both run at the same time.
+    barrier = threading.Barrier(2, timeout=TIMEOUT_SECONDS)
+    met = []
+
+    def job(account):
+        barrier.wait()
+        met.append(account.name)
+
+    pool.submit(FakeAccount("first"), job)
+    pool.submit(FakeAccount("second"), job)
+    wait_until(lambda: len(met) == 2)
+    assert sorted(met) == ["first", "second"]
+
+
+def test_failed_job_does_not_block_account():
+    pool = AccountWorkerPool(workers=1, name="test-pool")
+    pool.start()
+    account = FakeAccount("account")
+    done = threading.Event()
+
+    def failing_job(_):
+        raise RuntimeError("upload failed")
+
+    pool.submit(account, failing_job, "failing")
+    pool.submit(account, lambda _: done.set(), "next")
+    assert done.wait(TIMEOUT_SECONDS)
+    wait_until(lambda: pool.get_stats()["finished_jobs"] == 2)
+    assert pool.get_stats()["running_jobs"] == 0
@@ -0,0 +1,104 @@
+"""
+# test_heap_scheduler.py
+# date: 18.10.2026
+# brief: checks order in which HeapScheduler fires jobs, catching up of missed slots
+#        and stopping of run_forever. Wall clock is replaced by a fake one, so tests
+#        do not wait for real fire times.
+# usage: python -m pytest src/utils/test_heap_scheduler.py
+"""
+
+import threading
+from datetime import datetime
+
+import pytest
+
+import src.utils.HeapScheduler as heap_scheduler_module
+from src.utils.fs_utils import read_json, save_json
+from src.utils.HeapScheduler import (MISSED_SLOTS_RUN_ALL,
+                                     MISSED_SLOTS_RUN_ONCE, MISSED_SLOTS_SKIP,
+                                     HeapScheduler)
+
+
+class FakeClock:
+    def __init__(self, now: datetime):
+        self.now = now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock(datetime(2026, 10, 18, 8, 0))
+
+    class FakeDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return clock.now
+
+    monkeypatch.setattr(heap_scheduler_module, "datetime", FakeDatetime)
+    return clock
+
+
+def run_in_thread(scheduler):
+    thread = threading.Thread(target=scheduler.run_forever, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_jobs_fire_in_order_of_fire_time(clock):
+    scheduler = HeapScheduler()
+    fired = []
+
+    def fire(name, is_last=False):
+        fired.append(name)
+        if is_last:
+            scheduler.stop()
+
+    assert scheduler.add_job("c", 1, "11:00", fire, "c", True)
+    assert scheduler.add_job("a", 1, "09:00", fire, "a")
+    assert scheduler.add_job("b", 1, "10:00:30", fire, "b")
+    # jobs with the same fire time keep order in which they were added.
+    assert scheduler.add_job("a2", 1, "09:00", fire, "a2")
+    assert scheduler.get_jobs_count() == 4
+
+    clock.now = datetime(2026, 10, 18, 12, 0)
+    thread = run_in_thread(scheduler)
+    thread.join(timeout=5)
+    assert thread.is_alive() == False
+    assert fired == ["a", "a2", "b", "c"]
+    # fired jobs are rescheduled for the next day.
+    assert scheduler.get_jobs_count() == 4
+
+
+def test_invalid_time_is_rejected(clock):
+    scheduler = HeapScheduler()
+    assert scheduler.add_job("job", 1, "25:00", print) == False
+    assert scheduler.add_job("job", 1, "9 am", print) == False
+    assert scheduler.get_jobs_count() == 0
+
+
+def test_stop_cancels_waiting_jobs(clock):
+    scheduler = HeapScheduler()
+    fired = []
+    scheduler.add_job("job", 1, "09:00", fired.append, "job")
+
+    thread = run_in_thread(scheduler)
+    scheduler.stop()
+    thread.join(timeout=5)
+    assert thread.is_alive() == False
+    assert fired == []
+
+
+@pytest.mark.parametrize(
+    "policy, expected_runs",
+    [(MISSED_SLOTS_SKIP, 0), (MISSED_SLOTS_RUN_ONCE, 1), (MISSED_SLOTS_RUN_ALL, 2)],
+)
+def test_missed_slots_policy(clock, tmp_path, policy, expected_runs):
+    # the last run was 3 days ago at 09:00 => slots of 16.10 and 17.10 were missed,
+    # slot of 18.10 is still ahead.
+    state_path = str(tmp_path / "scheduler_state.json")
+    save_json({"job": datetime(2026, 10, 15, 9, 0).isoformat()}, state_path)
+    scheduler = HeapScheduler(state_path, policy)
+    fired = []
+
+    assert scheduler.add_job("job", 1, "09:00", fired.append, "job")
+    assert fired == ["job"] * expected_runs
+    assert read_json(state_path) == {"job": datetime(2026, 10, 17, 9, 0).isoformat()}
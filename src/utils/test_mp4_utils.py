@@ -0,0 +1,127 @@
+"""
+# test_mp4_utils.py
+# date: 18.10.2026
+# brief: checks parsing of segment index (sidx) of synthesized DASH streams.
+# usage: python -m pytest src/utils/test_mp4_utils.py
+"""
+
+import struct
+
+import pytest
+
+from src.utils.mp4_utils import (HEAD_PROBE_SIZE, DashFragment, parse_sidx,
+                                 read_dash_index, select_fragments)
+
+TIMESCALE = 1000
+
+
+def make_box(box_type: str, payload: bytes) -> bytes:
+    return struct.pack(">I4s", 8 + len(payload), box_type.encode("latin-1")) + payload
+
+
+def make_sidx(references, version=0, earliest_time=0, first_offset=0) -> bytes:
+    # references - [(size of fragment in bytes, duration in timescale units), ...]
+    payload = struct.pack(">B3xII", version, 1, TIMESCALE)
+    if version == 0:
+        payload += struct.pack(">II", earliest_time, first_offset)
+    else:
+        payload += struct.pack(">QQ", earliest_time, first_offset)
+    payload += struct.pack(">HH", 0, len(references))
+    for size, duration in references:
+        payload += struct.pack(">III", size, duration, 0x90000000)
+    return make_box("sidx", payload)
+
+
+def make_stream(references, moov_size=100, **sidx_options):
+    head = make_box("ftyp", b"dash" + bytes(4)) + make_box("moov", bytes(moov_size))
+    sidx = make_sidx(references, **sidx_options)
+    fragments = b"".join(
+        make_box("moof", bytes(8)) + make_box("mdat", bytes(size - 24))
+        for size, _ in references
+    )
+    return head, sidx, head + sidx + fragments
+
+
+class RangeFetcher:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.requests = []
+
+    def __call__(self, first_byte: int, last_byte: int) -> bytes:
+        self.requests.append((first_byte, last_byte))
+        return self.data[first_byte : last_byte + 1]
+
+
+def as_tuple(fragment: DashFragment):
+    return (fragment.first_byte, fragment.last_byte, fragment.start, fragment.end)
+
+
+@pytest.mark.parametrize("version", [0, 1])
+def test_read_dash_index(version):
+    references = [(1000, 2000), (1500, 2500), (500, 1000)]
+    head, sidx, stream = make_stream(references, version=version, earliest_time=500)
+    fetch = RangeFetcher(stream)
+
+    init_range, fragments = read_dash_index(fetch)
+
+    assert init_range == (0, len(head) - 1)
+    first = len(head) + len(sidx)
+    assert [as_tuple(fragment) for fragment in fragments] == [
+        (first, first + 999, 0.5, 2.5),
+        (first + 1000, first + 2499, 2.5, 5.0),
+        (first + 2500, first + 2999, 5.0, 6.0),
+    ]
+    # fragments point to moof boxes.
+    for fragment in fragments:
+        assert stream[fragment.first_byte + 4 : fragment.first_byte + 8] == b"moof"
+    assert fetch.requests == [(0, HEAD_PROBE_SIZE - 1)]
+
+
+def test_read_dash_index_fetches_more_when_index_is_beyond_probe():
+    references = [(100, 1000)] * 4
+    head, _, stream = make_stream(references, moov_size=HEAD_PROBE_SIZE)
+    fetch = RangeFetcher(stream)
+
+    init_range, fragments = read_dash_index(fetch)
+
+    assert init_range == (0, len(head) - 1)
+    assert len(fragments) == 4
+    assert fragments[-1].last_byte == len(stream) - 1
+    assert len(fetch.requests) > 1
+
+
+def test_first_offset_shifts_fragments():
+    _, sidx, _ = make_stream([(100, 1000)], first_offset=50)
+    fragments = parse_sidx(sidx, 200)
+    assert as_tuple(fragments[0]) == (
+        200 + len(sidx) + 50,
+        200 + len(sidx) + 149,
+        0,
+        1,
+    )
+
+
+def test_hierarchical_index_is_rejected():
+    sidx = bytearray(make_sidx([(100, 1000)]))
+    sidx[32] |= 0x80  # reference_type of the first reference => sidx
+    with pytest.raises(ValueError):
+        parse_sidx(bytes(sidx), 0)
+
+
+def test_stream_without_index_is_rejected():
+    stream = make_box("ftyp", bytes(8)) + make_box("moof", bytes(8))
+    with pytest.raises(ValueError):
+        read_dash_index(RangeFetcher(stream))
+    with pytest.raises(ValueError):
+        read_dash_index(RangeFetcher(make_box("ftyp", bytes(8))))
+
+
+def test_select_fragments():
+    fragments = [
+        DashFragment(i * 10, i * 10 + 9, i * 2.0, i * 2.0 + 2) for i in range(5)
+    ]
+    selected = select_fragments(fragments, [(1.0, 3.0), (8.0, 9.5)])
+    assert selected == [fragments[0], fragments[1], fragments[4]]
+    # window, which ends at the start of fragment, does not need it.
+    assert select_fragments(fragments, [(4.0, 6.0)]) == fragments[2:3]
+    assert select_fragments(fragments, []) == []
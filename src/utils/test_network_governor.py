@@ -0,0 +1,55 @@
+"""
+# test_network_governor.py
+# date: 18.10.2026
+# brief: checks that worker process connected to governor of the main process shares
+#        its connection slots and bandwidth statistics.
+# usage: python -m pytest src/utils/test_network_governor.py
+"""
+
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.utils.NetworkGovernor import (PRIORITY_NORMAL,
+                                       connect_network_governor,
+                                       network_governor,
+                                       serve_network_governor)
+
+HOST = "test-host.example"
+MB = 1024 * 1024
+
+
+def transfer_in_worker(nbytes):
+    # returns time, when worker got connection slot.
+    with network_governor.transfer(HOST):
+        started_at = time.time()
+        network_governor.consume(nbytes)
+    return started_at
+
+
+def test_worker_process_uses_governor_of_main_process(monkeypatch):
+    monkeypatch.setattr(network_governor, "max_connections_per_host", 1)
+    executor = ProcessPoolExecutor(
+        max_workers=1,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=connect_network_governor,
+        initargs=serve_network_governor(),
+    )
+    try:
+        # worker process is started and connected before the slot is taken.
+        executor.submit(transfer_in_worker, 0).result(timeout=30)
+        bytes_before = network_governor.get_stats()["transferred_mb"]
+        with network_governor.transfer(HOST):
+            future = executor.submit(transfer_in_worker, MB)
+            time.sleep(0.5)
+            assert future.done() == False  # the only slot of host is taken here
+            released_at = time.time()
+        assert future.result(timeout=30) >= released_at
+    finally:
+        executor.shutdown()
+
+    bytes_after = network_governor.get_stats()["transferred_mb"]
+    transferred = bytes_after.get(PRIORITY_NORMAL, 0) - bytes_before.get(
+        PRIORITY_NORMAL, 0
+    )
+    assert transferred == 1.0
@@ -0,0 +1,65 @@
+"""
+# test_segments_utils.py
+# date: 18.10.2026
+# brief: checks that grid index of remove_overlapping_segments selects the same
+#        segments as comparing every candidate with every kept segment.
+# usage: python -m pytest src/utils/test_segments_utils.py
+"""
+
+import random
+
+from src.utils.segments_utils import (calculate_overlap,
+                                      remove_overlapping_segments)
+
+
+def pairwise_remove_overlapping_segments(scored_segments, overlap_threshold=0.5):
+    unique_segments = []
+    for current in scored_segments:
+        if all(
+            calculate_overlap(current, existing) <= overlap_threshold
+            for existing in unique_segments
+        ):
+            unique_segments.append(current)
+    return unique_segments
+
+
+def generate_segments(rnd, count):
+    # random intervals of very different lengths, so segments span many buckets.
+    segments = []
+    for _ in range(count):
+        start = rnd.uniform(0, 300)
+        duration = rnd.choice(
+            [rnd.uniform(0.5, 3), rnd.uniform(2, 15), rnd.uniform(20, 90)]
+        )
+        segments.append({"start": start, "end": start + duration})
+    return segments
+
+
+def test_same_as_pairwise_on_random_intervals():
+    rnd = random.Random(0)
+    for _ in range(200):
+        segments = generate_segments(rnd, rnd.randint(1, 80))
+        threshold = rnd.choice([0.0, 0.1, 0.5, 0.9, 1.0])
+        expected = pairwise_remove_overlapping_segments(segments, threshold)
+        assert remove_overlapping_segments(segments, threshold) == expected
+
+
+def test_max_count_keeps_prefix_of_selection():
+    rnd = random.Random(1)
+    segments = generate_segments(rnd, 100)
+    expected = pairwise_remove_overlapping_segments(segments)
+    for max_count in (1, 3, len(expected), len(expected) + 5):
+        result = remove_overlapping_segments(segments, max_count=max_count)
+        assert result == expected[:max_count]
+    assert remove_overlapping_segments(segments, max_count=0) == []
+
+
+def test_touching_segments_are_not_duplicates():
+    segments = [{"start": 0, "end": 10}, {"start": 10, "end": 20}]
+    assert remove_overlapping_segments(segments, 0.0) == segments
+
+
+def test_negative_threshold_keeps_only_the_best():
+    segments = [{"start": 0, "end": 10}, {"start": 50, "end": 60}]
+    assert remove_overlapping_segments(segments, -0.1) == segments[:1]
+    assert remove_overlapping_segments([], -0.1) == []
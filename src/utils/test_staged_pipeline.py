@@ -0,0 +1,118 @@
+"""
+# test_staged_pipeline.py
+# date: 18.10.2026
+# brief: checks that StagedPipeline drops rejected and failed items in sequential and
+#        concurrent mode and that every worker of every stage is stopped.
+# usage: python -m pytest src/utils/test_staged_pipeline.py
+"""
+
+import os
+import threading
+
+import pytest
+
+from src.utils.StagedPipeline import PipelineStage, StagedPipeline
+
+
+def double(item):
+    return item * 2
+
+
+def reject_odd(item):
+    return item if item % 2 == 0 else None
+
+
+def get_worker_pid(item):
+    return item, os.getpid()
+
+
+def fail_on_three(item):
+    if item == 3:
+        raise RuntimeError("stage failed")
+    return item
+
+
+def test_sequential_run_drops_rejected_items():
+    dropped = []
+    pipeline = StagedPipeline(
+        [PipelineStage("reject", reject_odd), PipelineStage("double", double)],
+        on_drop=dropped.append,
+    )
+    assert pipeline.is_sequential()
+    assert pipeline.run([1, 2, 3, 4]) == [4, 8]
+    assert dropped == [1, 3]
+
+
+def test_sequential_run_drops_failed_item_and_reraises():
+    # the same as processing items one by one without pipeline.
+    dropped = []
+    processed = []
+    pipeline = StagedPipeline(
+        [PipelineStage("fail", fail_on_three), PipelineStage("save", processed.append)],
+        on_drop=dropped.append,
+    )
+    with pytest.raises(RuntimeError):
+        pipeline.run([1, 2, 3, 4])
+    assert processed == [1, 2]
+    assert dropped == [1, 2, 3]  # save stage returns None => 1 and 2 are dropped too
+
+
+def test_concurrent_run_stops_all_workers():
+    threads_before = threading.active_count()
+    dropped = []
+    dropped_lock = threading.Lock()
+
+    def on_drop(item):
+        with dropped_lock:
+            dropped.append(item)
+
+    pipeline = StagedPipeline(
+        [
+            PipelineStage("double", double, workers=3),
+            PipelineStage("fail", fail_on_three, workers=2),
+            PipelineStage("reject", reject_odd, workers=4),
+            PipelineStage("last", double, workers=1),
+        ],
+        queue_size=2,
+        on_drop=on_drop,
+    )
+    assert pipeline.is_sequential() == False
+    items = list(range(50))
+    results = pipeline.run(items)
+
+    # every item is doubled => even => nothing is rejected or failed.
+    assert sorted(results) == [item * 4 for item in items]
+    assert dropped == []
+    assert threading.active_count() == threads_before
+
+
+def test_concurrent_run_drops_failed_items_without_stopping():
+    dropped = []
+    pipeline = StagedPipeline(
+        [
+            PipelineStage("fail", fail_on_three, workers=2),
+            PipelineStage("reject", reject_odd, workers=2),
+        ],
+        on_drop=dropped.append,
+    )
+    results = pipeline.run([1, 2, 3, 4, 5, 6])
+    assert sorted(results) == [2, 4, 6]
+    assert sorted(dropped) == [1, 3, 5]
+
+
+def test_process_stage_is_reused_by_next_runs():
+    pipeline = StagedPipeline(
+        [
+            PipelineStage("double", double, workers=2),
+            PipelineStage("pid", get_worker_pid, workers=1, use_processes=True),
+        ]
+    )
+    try:
+        first_run = pipeline.run([1, 2, 3])
+        second_run = pipeline.run([4])
+    finally:
+        pipeline.shutdown()
+    assert sorted(item for item, _ in first_run + second_run) == [2, 4, 6, 8]
+    pids = set(pid for _, pid in first_run + second_run)
+    assert len(pids) == 1
+    assert os.getpid() not in pids